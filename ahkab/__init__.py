@@ -38,12 +38,14 @@ except ImportError:
     # plotting.py will complain about this later on.
     pass
 
-from .ahkab import new_op, new_dc, new_tran, new_ac, new_pss, new_pz
-from .ahkab import new_symbolic, queue, run, new_x0, icmodified_x0
+from .ahkab import new_op, new_dc, new_tran, new_ac, new_pss, new_pz, new_noise
+from .ahkab import new_tf, new_sens
+from .ahkab import new_symbolic, queue, run, iter_tran, new_x0, icmodified_x0
 from .ahkab import get_op_x0, set_temperature, process_postproc, main
 from .__version__ import __version__
 from .circuit import Circuit
 
 __all__ = ['new_op', 'new_dc', 'new_tran', 'new_ac', 'new_pss',
-           'new_symbolic', 'new_pz', 'queue', 'run', 'new_x0',
-           'get_op_x0', 'set_temperature', 'main', 'Circuit']
+           'new_symbolic', 'new_pz', 'new_noise', 'new_tf', 'queue', 'run',
+           'new_sens', 'iter_tran', 'new_x0', 'get_op_x0', 'set_temperature',
+           'main', 'Circuit']
@@ -54,11 +54,15 @@ def _cli():
                       help="Method to be used in transient analysis: " +
                       transient.IMPLICIT_EULER.lower() + ", " +
                       transient.TRAP.lower() + ", " +
+                      transient.TRAP_AUTO.lower() + ", " +
                       transient.GEAR2.lower() + ", " +
                       transient.GEAR3.lower() + ", " +
                       transient.GEAR4.lower() + ", " +
-                      transient.GEAR5.lower() + " or " +
-                      transient.GEAR6.lower() + ". Defaults to TRAP.")
+                      transient.GEAR5.lower() + ", " +
+                      transient.GEAR6.lower() + ", " +
+                      transient.GEAR.lower() + " (variable order), " +
+                      transient.EXPONENTIAL.lower() + " (linear circuits) or " +
+                      transient.WR.lower() + " (waveform relaxation). Defaults to TRAP.")
     parser.add_option("", "--t-fixed-step", action="store_true",
                       dest="no_step_control", default=False, help="Disables" +
                       " the step control in transient analysis.")
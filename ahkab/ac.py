@@ -91,8 +91,32 @@ Solving
 For each angular frequency :math:`\\omega`, the simulator solves the matrix
 equation described.
 
-Since the equation is linear, solving is performed with a single matrix
-inversion and multiplication for each step.
+Since the equation is linear, solving is performed with a single
+factorization of :math:`MNA + J + j\\omega AC` for each step, without any
+Newton-Raphson iteration. The frequencies are solved and stored in blocks of
+up to ``options.ac_block_size`` points: the dense systems of a block are
+solved together, while the sparse ones, used when the :math:`MNA` matrix is
+bigger than ``options.dense_matrix_limit``, are factorized one at a time.
+
+Alternatively, with the ``schur`` method, the matrices are reduced once,
+either to a diagonal form or to their generalized Schur form, after which
+each frequency costs :math:`O(n^2)` operations instead of :math:`O(n^3)`,
+see :func:`_reduce_pencil`. This pays off for sweeps with many points.
+
+For large circuits, the ``prima`` method replaces the circuit with a model
+of much lower order, matching the moments of its response around a few
+frequencies, see :func:`_reduce_krylov` and :mod:`ahkab.prima`. The model is
+accurate as long as the response is dominated by a limited number of poles,
+as it is in RC and RLC interconnects.
+
+With the adaptive sweep type, the frequency grid given by the user is only
+a starting point: it is refined where the response of the saved variables
+is not smooth, which resolves narrow resonances with far fewer points than
+a uniform grid, see :func:`_adaptive_sweep`.
+
+The frequencies are independent of each other: setting ``workers``, or
+``options.ac_workers``, splits them among a pool of processes, which share
+the matrices.
 
 Module reference
 ----------------
@@ -102,10 +126,16 @@ Module reference
 from __future__ import (unicode_literals, absolute_import,
                         division, print_function)
 
+import functools
+import multiprocessing
+
 import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
 
-from . import (circuit, dc_analysis, components, options, printing, results,
-               utilities)
+from . import (circuit, dc_analysis, components, options, prima, printing,
+               results, utilities)
 
 specs = {'ac': {'tokens': ({
                            'label': 'type',
@@ -138,6 +168,14 @@ specs = {'ac': {'tokens': ({
                            'needed': True,
                            'dest': 'stop',
                            'default': None
+                          },
+                          {
+                           'label': 'method',
+                           'pos': None,
+                           'type': str,
+                           'needed': False,
+                           'dest': 'method',
+                           'default': None
                           })
                }
         }
@@ -145,7 +183,8 @@ specs = {'ac': {'tokens': ({
 
 def ac_analysis(circ, start, points, stop, sweep_type=None,
                 x0=None, mna=None, AC=None, Nac=None, J=None,
-                outfile="stdout", verbose=3):
+                outfile="stdout", save=None, measures=None, method=None,
+                workers=None, verbose=3):
     """Performs an AC analysis.
 
     **Parameters:**
@@ -164,9 +203,12 @@ def ac_analysis(circ, start, points, stop, sweep_type=None,
         The stop frequency, in Hz.
 
     sweep_type : string, optional
-        Either ``options.ac_log_step`` (ie ``'LOG'``) or ``options.ac_lin_step``
-        (ie ``'LIN'``), defaults to ``options.ac_log_step``, resulting in a
-        logarithmic sweep.
+        Either ``options.ac_log_step`` (ie ``'LOG'``), ``options.ac_lin_step``
+        (ie ``'LIN'``) or ``options.ac_adaptive_step`` (ie ``'ADAPTIVE'``),
+        defaults to ``options.ac_log_step``, resulting in a logarithmic
+        sweep. The adaptive sweep starts from a logarithmic one, which is
+        then refined where the magnitude or the phase of the saved variables
+        are not smooth, see :func:`_adaptive_sweep`.
 
     x0 : OP results instance, optional
         The linearization point. If not set, it will be computed
@@ -183,6 +225,29 @@ def ac_analysis(circ, start, points, stop, sweep_type=None,
         ``'stdout'`` to write to the standard output.  If unset, or set to
         ``None``, defaults to the standard output.
 
+    save : list of strings, optional
+        The node voltages and currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted.
+        If unset, all of them are stored.
+
+    measures : list of measurements, optional
+        Measurements to be evaluated on the frequency response, see
+        :mod:`ahkab.measure`. The magnitude of the variables is measured.
+
+    method : string, optional
+        Either ``options.ACDIRECT`` (ie ``'direct'``), the default, which
+        factorizes the system matrix at every frequency,
+        ``options.ACSCHUR`` (ie ``'schur'``), which reduces it once, see
+        :func:`_reduce_pencil`, or ``options.ACPRIMA`` (ie ``'prima'``),
+        which replaces the circuit with a reduced order model, see
+        :func:`_reduce_krylov`. The Schur method is faster for sweeps with
+        many points of circuits small enough for dense matrices, PRIMA for
+        large circuits whose response is dominated by a few poles.
+
+    workers : int, optional
+        The number of processes among which the frequencies are split,
+        defaults to ``options.ac_workers``. If set to 0, one per CPU.
+
     verbose : int, optional
         The verbosity level, from 0 (silent) to 6 (debug).
 
@@ -206,17 +271,16 @@ def ac_analysis(circ, start, points, stop, sweep_type=None,
         raise ValueError("AC analysis has start > stop")
     if points < 2 and not start == stop:
         raise ValueError("AC analysis has number of points < 2 & start != stop")
-    if sweep_type.upper() == options.ac_log_step or sweep_type is None:
+    sweep_type = (sweep_type or options.ac_log_step).upper()
+    if sweep_type in (options.ac_log_step, options.ac_adaptive_step):
         omega_iter = utilities.log_axis_iterator(2*np.pi*start, 2*np.pi*stop, points)
-    elif sweep_type.upper() == options.ac_lin_step:
+    elif sweep_type == options.ac_lin_step:
         omega_iter = utilities.lin_axis_iterator(2*np.pi*start, 2*np.pi*stop, points)
     else:
         raise ValueError("Unknown sweep type %s" % sweep_type)
-
-    tmpstr = "Vea =", options.vea, "Ver =", options.ver, "Iea =", options.iea, "Ier =", \
-        options.ier, "max_ac_nr_iter =", options.ac_max_nr_iter
-    printing.print_info_line((tmpstr, 5), verbose)
-    del tmpstr
+    method = method.lower() if method is not None else options.ACDIRECT
+    if method not in (options.ACDIRECT, options.ACSCHUR, options.ACPRIMA):
+        raise ValueError("Unknown AC method %s" % method)
 
     printing.print_info_line(("Starting AC analysis: ", 1), verbose)
     tmpstr = "w: start = %g Hz, stop = %g Hz, %d points" % (start, stop, points)
@@ -277,38 +341,78 @@ def ac_analysis(circ, start, points, stop, sweep_type=None,
     printing.print_info_line((Nac, 5), verbose)
 
     sol = results.ac_solution(circ, start=start, stop=stop, points=points,
-                              stype=sweep_type, op=x0, outfile=outfile)
-
-    # setup the initial values to start the iteration:
-    j = np.complex('j')
+                              stype=sweep_type, op=x0, outfile=outfile,
+                              save=save)
+    if measures:
+        sol.add_measures(measures)
 
     Gmin_matrix = dc_analysis.build_gmin_matrix(
         circ, options.gmin, mna.shape[0], verbose)
 
-    iter_n = 0  # contatore d'iterazione
     printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
 
-    x = x0
-    for omega in omega_iter:
-        x, _, solved, _ = dc_analysis.dc_solve(
-            mna=(mna + np.multiply(j * omega, AC) + J),
-            Ndc = Nac,
-            Ntran = 0,
-            circ = circuit.Circuit(
-                title="Dummy circuit for AC", filename=None),
-            Gmin = Gmin_matrix,
-            x0 = x,
-            time = None,
-            locked_nodes = None,
-            MAXIT = options.ac_max_nr_iter,
-            skip_Tt = True,
-            verbose = 0)
-        if solved:
-            iter_n = iter_n + 1
-            # hooray!
-            sol.add_line(omega/np.pi/2, x)
+    # the problem is linear: a single complex solve per frequency, and the
+    # frequencies are solved and stored in blocks
+    omegas = np.array(list(omega_iter))
+    A0 = mna + Gmin_matrix + J
+    if method == options.ACSCHUR:
+        printing.print_info_line(("reducing the pencil... ", 3), verbose,
+                                 print_nl=False)
+        solve = _reduce_pencil(A0, AC, Nac, omegas)
+        block_size = options.ac_block_size
+    elif method == options.ACPRIMA:
+        printing.print_info_line(("reducing the circuit... ", 3), verbose,
+                                 print_nl=False)
+        try:
+            solve = _reduce_krylov(A0, AC, Nac, omegas, verbose)
+        except (np.linalg.LinAlgError, RuntimeError):
+            printing.print_general_error("The AC matrix is singular at " +
+                                         "an expansion point.")
+            printing.print_info_line(("failed.", 1), verbose)
+            return None
+        block_size = options.ac_block_size
+    else:
+        solve = functools.partial(_solve_block, A0, AC, Nac)
+        block_size = _get_block_size(A0.shape[0])
+    workers = workers if workers is not None else options.ac_workers
+    if not workers:
+        workers = multiprocessing.cpu_count()
+    if workers > 1:
+        # enough blocks to keep all the processes busy
+        block_size = max(1, min(block_size, -(-len(omegas)//workers)))
+    workers = min(workers, -(-len(omegas)//block_size))
+    printing.print_info_line(("workers: %d... " % (workers,), 5), verbose,
+                             print_nl=False)
+    pool = None
+    if workers > 1:
+        # the matrices are shared, only the frequencies and the solutions
+        # are sent between processes
+        pool = multiprocessing.Pool(workers, _init_worker,
+                                    (solve.func, [_share(a) for a in solve.args]))
+    solved = True
+    try:
+        if sweep_type == options.ac_adaptive_step:
+            aerror = np.zeros((mna.shape[0], 1))
+            aerror[:circ.get_nodes_number() - 1] = options.vea
+            aerror[circ.get_nodes_number() - 1:] = options.iea
+            omegas, x = _adaptive_sweep(solve, pool, omegas, block_size,
+                                        sol._select_saved, aerror)
+            sol.opoints = len(omegas)
+            printing.print_info_line(("%d points... " % (len(omegas),), 3),
+                                     verbose, print_nl=False)
+            for i in range(0, len(omegas), options.ac_block_size):
+                sol.add_lines(omegas[i:i + options.ac_block_size]/np.pi/2,
+                              x[:, i:i + options.ac_block_size])
         else:
-            break
+            for block, x in _solve_sweep(solve, pool, omegas, block_size):
+                sol.add_lines(block/np.pi/2, x)
+    except np.linalg.LinAlgError as e:
+        printing.print_general_error(str(e))
+        solved = False
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
 
     if solved:
         printing.print_info_line(("done.", 1), verbose)
@@ -320,6 +424,344 @@ def ac_analysis(circ, start, points, stop, sweep_type=None,
     return ret_value
 
 
+def _solve_sweep(solve, pool, omegas, block_size):
+    """Generator solving the AC problem at several frequencies.
+
+    **Parameters:**
+
+    solve : callable
+        Called with an array of angular frequencies, it returns the
+        solutions, one column per frequency, see :func:`_solve_block`.
+
+    pool : multiprocessing.Pool or None
+        If set, the worker processes solving the frequencies, initialized
+        with :func:`_init_worker`. Otherwise, they are solved serially.
+
+    omegas : ndarray
+        The angular frequencies.
+
+    block_size : int
+        The number of frequencies solved at once.
+
+    **Yields:**
+
+    block, x : ndarrays
+        The angular frequencies of a block and their solutions, in order.
+
+    :raises np.linalg.LinAlgError: if the AC matrix is singular.
+    """
+    blocks = [omegas[i:i + block_size]
+              for i in range(0, len(omegas), block_size)]
+    if pool is not None:
+        xs = pool.imap(_solve_shared, blocks)
+    else:
+        xs = (solve(block) for block in blocks)
+    for block in blocks:
+        try:
+            x = next(xs)
+        except (np.linalg.LinAlgError, RuntimeError):
+            raise np.linalg.LinAlgError("The AC matrix is singular at " +
+                                        "f = %g Hz." % (block[0]/np.pi/2,))
+        yield block, x
+
+
+def _adaptive_sweep(solve, pool, omegas, block_size, select, aerror):
+    """Solve the AC problem on a frequency grid refined where needed.
+
+    Starting from ``omegas``, the intervals around each point that deviates
+    from the straight line through its neighbours, on a logarithmic
+    frequency axis, by more than ``options.ac_adaptive_db_tol`` dB in
+    magnitude or ``options.ac_adaptive_phase_tol`` degrees in phase, are
+    split in two, and the new points are solved. That is repeated until the
+    curve is smooth or ``options.ac_adaptive_max_points`` is reached.
+
+    **Parameters:**
+
+    solve, pool, block_size :
+        See :func:`_solve_sweep`.
+
+    omegas : ndarray
+        The initial angular frequencies.
+
+    select : callable
+        Called with the solutions, it returns the rows of the outputs whose
+        curvature is controlled.
+
+    aerror : ndarray
+        The absolute tolerance of each variable: smaller magnitudes are
+        considered noise.
+
+    **Returns:**
+
+    omegas, x : ndarrays
+        The sorted angular frequencies and their solutions, one column per
+        frequency.
+
+    :raises np.linalg.LinAlgError: if the AC matrix is singular.
+    """
+    x = np.hstack([xb for _, xb in _solve_sweep(solve, pool, omegas,
+                                                block_size)])
+    floor = select(aerror)
+    while len(omegas) < options.ac_adaptive_max_points:
+        new = _get_refinement(omegas, select(x), floor)
+        new = new[:options.ac_adaptive_max_points - len(omegas)]
+        if not len(new):
+            break
+        new = np.sort(new)
+        xn = np.hstack([xb for _, xb in _solve_sweep(solve, pool, new,
+                                                     block_size)])
+        omegas = np.concatenate((omegas, new))
+        x = np.hstack((x, xn))
+        order = np.argsort(omegas)
+        omegas, x = omegas[order], x[:, order]
+    return omegas, x
+
+
+def _get_refinement(omegas, y, floor):
+    # the midpoints of the intervals to be split, the worst ones first
+    if len(omegas) < 3:
+        return np.array([])
+    u = np.log(omegas)
+    w = (u[1:-1] - u[:-2])/(u[2:] - u[:-2])
+    above = abs(y) > floor
+    mag = 20*np.log10(np.maximum(abs(y), floor))
+    phase = np.unwrap(np.angle(y), axis=1)*180/np.pi
+
+    def deviation(v):
+        return abs(v[:, 1:-1] - (v[:, :-2]*(1 - w) + v[:, 2:]*w))
+
+    valid = above[:, :-2] & above[:, 1:-1] & above[:, 2:]
+    err = np.maximum(deviation(mag)/options.ac_adaptive_db_tol,
+                     valid*deviation(phase)/options.ac_adaptive_phase_tol)
+    err = err.max(axis=0)
+    # each point flags the intervals on both of its sides
+    interval_err = np.zeros((len(omegas) - 1,))
+    interval_err[:-1] = err
+    interval_err[1:] = np.maximum(interval_err[1:], err)
+    split = np.nonzero(interval_err > 1)[0]
+    split = split[np.argsort(-interval_err[split], kind='mergesort')]
+    return np.sqrt(omegas[split]*omegas[split + 1])
+
+
+_solver = []
+
+
+def _init_worker(func, shared_args):
+    del _solver[:]
+    _solver.append(functools.partial(func, *[_unshare(a) for a in shared_args]))
+
+
+def _solve_shared(omegas):
+    return _solver[0](omegas)
+
+
+def _share(a):
+    # copy an array to shared memory
+    a = np.ascontiguousarray(a)
+    raw = multiprocessing.RawArray('b', max(a.nbytes, 1))
+    np.frombuffer(raw, dtype=a.dtype, count=a.size).reshape(a.shape)[...] = a
+    return raw, a.shape, a.dtype.str
+
+
+def _unshare(shared):
+    raw, shape, dtype = shared
+    return np.frombuffer(raw, dtype=np.dtype(dtype),
+                         count=int(np.prod(shape))).reshape(shape)
+
+
+def _get_block_size(size):
+    # keep the stacked dense matrices of a block within a few MB
+    return max(1, min(options.ac_block_size, 2**18 // size**2))
+
+
+def _solve_block(A0, AC, Nac, omegas, trans=False):
+    """Solve :math:`(A_0 + j\\omega AC) x = -N_{ac}` for several frequencies.
+
+    **Parameters:**
+
+    A0 : ndarray
+        The frequency-independent part of the system matrix, ie
+        :math:`MNA + G_{min} + J`.
+
+    AC : ndarray
+        The :math:`AC` matrix.
+
+    Nac : ndarray
+        The AC sources contribution.
+
+    omegas : ndarray
+        The angular frequencies.
+
+    trans : bool, optional
+        If set, the transposed -- adjoint -- system
+        :math:`(A_0 + j\\omega AC)^T x = -N_{ac}` is solved instead, with the
+        same factorization.
+
+    **Returns:**
+
+    x : ndarray
+        The solutions, one column per frequency.
+
+    :raises np.linalg.LinAlgError, RuntimeError: if the matrix is singular.
+    """
+    size = A0.shape[0]
+    if size > options.dense_matrix_limit:
+        A0 = scipy.sparse.csc_matrix(A0)
+        AC = scipy.sparse.csc_matrix(AC)
+        x = np.zeros((size, len(omegas)), dtype=complex)
+        for k, omega in enumerate(omegas):
+            lu = scipy.sparse.linalg.splu(A0 + 1j*omega*AC)
+            x[:, k] = lu.solve(-Nac.astype(complex),
+                               trans='T' if trans else 'N')[:, 0]
+        return x
+    A = A0[np.newaxis, :, :] + 1j*omegas[:, np.newaxis, np.newaxis]*AC
+    if trans:
+        A = A.transpose((0, 2, 1))
+    b = np.tile(-Nac, (len(omegas), 1, 1)).astype(complex)
+    return np.linalg.solve(A, b)[:, :, 0].T
+
+
+def _reduce_pencil(A0, AC, Nac, omegas):
+    """Reduce the pencil :math:`(A_0, AC)` for a fast frequency sweep.
+
+    If :math:`A_0` is not singular and :math:`A_0^{-1} AC` is diagonalizable,
+    the system is solved in the eigenvector basis, where it is diagonal,
+    providing the solutions found that way are accurate. Otherwise, the pencil is
+    reduced to its generalized Schur form with the QZ decomposition,
+    :math:`A_0 = Q S Z^H` and :math:`AC = Q T Z^H`, with :math:`S` and
+    :math:`T` upper triangular.
+
+    Either way, solving for a frequency costs then :math:`O(n^2)` rather than
+    the :math:`O(n^3)` of a factorization.
+
+    **Parameters:**
+
+    A0 : ndarray
+        The frequency-independent part of the system matrix, ie
+        :math:`MNA + G_{min} + J`.
+
+    AC : ndarray
+        The :math:`AC` matrix.
+
+    Nac : ndarray
+        The AC sources contribution.
+
+    omegas : ndarray
+        The angular frequencies of the sweep.
+
+    **Returns:**
+
+    solve : callable
+        Called with an array of angular frequencies, it returns the
+        solutions, one column per frequency, as :func:`_solve_block`.
+    """
+    try:
+        A0inv_AC = np.linalg.solve(A0, np.hstack((AC, -Nac)))
+        mu, V = np.linalg.eig(A0inv_AC[:, :-1])
+        c = np.linalg.solve(V, A0inv_AC[:, -1:])
+        solve = functools.partial(_solve_block_eig, V, mu, c)
+        # A0 and V may be ill-conditioned: check the residuals on the sweep
+        probes = omegas[[0, len(omegas)//2, -1]]
+        x = solve(probes)
+        for k, omega in enumerate(probes):
+            residual = (A0 + 1j*omega*AC).dot(x[:, k:k+1]) + Nac
+            if np.linalg.norm(residual) > \
+               np.sqrt(np.finfo(float).eps)*np.linalg.norm(Nac):
+                break
+        else:
+            return solve
+    except np.linalg.LinAlgError:
+        pass
+    S, T, Q, Z = scipy.linalg.qz(A0, AC, output='complex')
+    return functools.partial(_solve_block_qz, S, T, Z, -Q.conj().T.dot(Nac))
+
+
+def _reduce_krylov(A0, AC, Nac, omegas, verbose=3):
+    """Reduce the circuit with PRIMA for a fast frequency sweep.
+
+    The circuit is projected on the Krylov subspaces matching
+    ``options.ac_krylov_order`` moments of its response in a few expansion
+    points, see :mod:`ahkab.prima`. The first is the geometric mean of the
+    sweep, then the expansion point with the worst residual among a set of
+    probe frequencies is added, until all the residuals are below
+    ``options.ac_krylov_tol``, relative to :math:`N_{ac}`, or
+    ``options.ac_krylov_max_points`` expansion points are used.
+
+    **Parameters:**
+
+    A0, AC, Nac :
+        The matrices of the problem, see :func:`_solve_block`.
+
+    omegas : ndarray
+        The angular frequencies of the sweep.
+
+    verbose : int, optional
+        The verbosity level.
+
+    **Returns:**
+
+    solve : callable
+        Called with an array of angular frequencies, it returns the
+        solutions of the reduced model, one column per frequency, as
+        :func:`_solve_block`.
+
+    :raises np.linalg.LinAlgError, RuntimeError: if the AC matrix is
+        singular at an expansion point.
+    """
+    norm = np.linalg.norm(Nac)
+    probes = np.unique(np.concatenate((omegas[[0, -1]],
+                                       np.geomspace(omegas.min(), omegas.max(),
+                                                    41))))
+    points = [np.sqrt(omegas.min()*omegas.max())]
+    V = None
+    while True:
+        V = prima.get_basis(A0, AC, -Nac, 1j*points[-1],
+                            options.ac_krylov_order, V)
+        solve = functools.partial(_solve_block_reduced, V,
+                                  *prima.project(A0, AC, -Nac, V))
+        x = solve(probes)
+        residuals = np.linalg.norm(A0.dot(x) + 1j*probes*AC.dot(x) + Nac,
+                                   axis=0)
+        worst = np.argmax(residuals)
+        if residuals[worst] <= options.ac_krylov_tol*norm or \
+           len(points) >= options.ac_krylov_max_points:
+            break
+        points.append(probes[worst])
+    printing.print_info_line(("%d expansion points, order %d... " %
+                              (len(points), V.shape[1]), 5), verbose,
+                             print_nl=False)
+    if residuals[worst] > options.ac_krylov_tol*norm:
+        printing.print_warning("The reduced model is inaccurate, the worst " +
+                               "relative residual is %g, at f = %g Hz." %
+                               (residuals[worst]/norm, probes[worst]/np.pi/2))
+    return solve
+
+
+def _solve_block_reduced(V, Gr, Cr, br, omegas):
+    # (Gr + jw Cr) y = br and x = V y
+    if not V.shape[1]:
+        return np.zeros((V.shape[0], len(omegas)), dtype=complex)
+    A = Gr[np.newaxis, :, :] + 1j*omegas[:, np.newaxis, np.newaxis]*Cr
+    b = np.tile(br, (len(omegas), 1, 1)).astype(complex)
+    return V.dot(np.linalg.solve(A, b)[:, :, 0].T)
+
+
+def _solve_block_eig(V, mu, c, omegas):
+    # (I + jw A0^-1 AC) x = -A0^-1 Nac is diagonal in the eigenvector basis
+    y = c/(1. + 1j*mu[:, np.newaxis]*omegas[np.newaxis, :])
+    if not np.all(np.isfinite(y)):
+        raise np.linalg.LinAlgError("Singular matrix")
+    return V.dot(y)
+
+
+def _solve_block_qz(S, T, Z, b, omegas):
+    # (S + jw T) y = -Q^H Nac, a triangular system, and x = Z y
+    y = np.zeros((S.shape[0], len(omegas)), dtype=complex)
+    for k, omega in enumerate(omegas):
+        y[:, k] = scipy.linalg.solve_triangular(S + 1j*omega*T, b)[:, 0]
+    return Z.dot(y)
+
+
 def _generate_AC(circ, shape):
     """Generates the AC coefficients matrix.
 
@@ -350,6 +792,9 @@ def _generate_AC(circ, shape):
             AC[n1, n2] = AC[n1, n2] - elem.value
             AC[n2, n2] = AC[n2, n2] + elem.value
             AC[n2, n1] = AC[n2, n1] - elem.value
+        elif isinstance(elem, components.Macromodel):
+            ix = np.ix_(elem.nodes, elem.nodes)
+            AC[ix] = AC[ix] + elem.C
         elif isinstance(elem, components.Inductor):
             AC[nv + i_eq, nv + i_eq] = -1 * elem.value
             if len(elem.coupling_devices):
@@ -83,10 +83,13 @@ The following functions are available to quickly create a simulation object:
 .. autosummary::
     new_ac
     new_dc
+    new_noise
     new_op
     new_pss
     new_pz
+    new_sens
     new_symbolic
+    new_tf
     new_tran
 
 Click on one of the above hyperlinks to be taken to the corresponding
@@ -171,6 +174,9 @@ from . import ac
 from . import pss
 from . import symbolic
 from . import pz
+from . import noise
+from . import tf
+from . import sens
 
 # parser
 from . import netlist_parser
@@ -179,6 +185,7 @@ from . import netlist_parser
 from . import options
 from . import constants
 from . import utilities
+from . import prima
 
 # post-processing
 from . import fourier
@@ -192,11 +199,13 @@ from .py3compat import text_type
 
 from .__version__ import __version__
 
-global _queue, _x0s, _print
+global _queue, _x0s, _reduced_x0s, _print
 
 _queue = []
 _print = False
 _x0s = {None: None}
+# the OPs computed on the circuits reduced by prima, see run()
+_reduced_x0s = {}
 
 def new_op(guess=None, x0=None, outfile=None, verbose=0):
     """Assembles an OP analysis and returns the analysis object.
@@ -250,7 +259,7 @@ def new_op(guess=None, x0=None, outfile=None, verbose=0):
 
 
 def new_dc(start, stop, points, source, sweep_type='LINEAR', guess=True, x0=None,
-        outfile=None, verbose=0):
+        outfile=None, save=None, measures=None, verbose=0):
     """Assembles a DC sweep analysis and returns the analysis object.
 
     The analysis itself can be run with: ``ahkab.run(...)``
@@ -293,6 +302,16 @@ def new_dc(start, stop, points, source, sweep_type='LINEAR', guess=True, x0=None
         from an interactive session, a temporary file will be used to store the
         data.
 
+    save : list of strings, optional
+        the node voltages and branch currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted, as in
+        ``'V(n*)'``. If unset, all the variables are stored.
+
+    measures : list of measurements, optional
+        the measurements to be evaluated while the analysis runs, see
+        :mod:`ahkab.measure`. The measured values are available from the
+        results set as ``res.measures``.
+
     verbose : int, optional
         the verbosity level, from 0 (silent, default) to 6 (debug).
 
@@ -316,11 +335,13 @@ def new_dc(start, stop, points, source, sweep_type='LINEAR', guess=True, x0=None
     return {
         'type': 'dc', 'start': float(start), 'stop': float(stop), 'step': float(stop - start) / float(points - 1),
         'source': source, 'x0': x0, 'outfile': outfile, 'guess': guess, 'sweep_type': sweep_type,
-        'verbose': verbose}
+        'save': save, 'measures': measures, 'verbose': verbose}
 
 
 def new_tran(tstart, tstop, tstep, x0='op', method=transient.TRAP,
-        use_step_control=True, outfile=None, verbose=0):
+        use_step_control=True, outfile=None, save=None, output_times=None,
+        checkpoint=None, resume_from=None, measures=None, steady_state=False,
+        period=None, sens_outputs=None, sens_type='final', verbose=0):
     """Assembles a TRAN analysis and returns the analysis object.
 
     The analysis itself can be run with ``ahkab.run(...)``
@@ -343,7 +364,17 @@ def new_tran(tstart, tstop, tstep, x0='op', method=transient.TRAP,
 
     method : string , optional
         the differentiation method to be used. Can be set to
-        'IMPLICIT_EULER', 'TRAP', 'GEAR4', 'GEAR5' or 'GEAR6'.
+        'IMPLICIT_EULER', 'TRAP', 'TRAP_AUTO', 'GEAR4', 'GEAR5', 'GEAR6' or
+        'GEAR'. 'TRAP_AUTO' switches from TRAP to Gear's second order method
+        for a few steps (``options.transient_trap_damping_steps``) after
+        discontinuities and where point-to-point ringing is detected.
+        'GEAR' selects the order of Gear's method automatically at each
+        step, up to ``options.transient_gear_max_order``.
+        'EXPONENTIAL' is available for linear circuits only: it solves the
+        circuit exactly between the breakpoints of piecewise linear sources,
+        whatever its time constants, see :mod:`ahkab.expint`.
+        'WR' solves the subcircuit instances in parallel, with a fixed step,
+        iterating on the waveforms at their boundaries, see :mod:`ahkab.wr`.
         It defaults to 'TRAP'.
 
     use_step_control : boolean, optional
@@ -359,6 +390,60 @@ def new_tran(tstart, tstop, tstep, x0='op', method=transient.TRAP,
         from an interactive session, a temporary file will be used to store the
         data.
 
+    save : list of strings, optional
+        the node voltages and branch currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted, as in
+        ``'V(n*)'``. If unset, all the variables are stored.
+
+    measures : list of measurements, optional
+        the measurements to be evaluated while the analysis runs, see
+        :mod:`ahkab.measure`. The measured values are available from the
+        results set as ``res.measures``.
+
+    output_times : float or sequence of floats, optional
+        if set to a float, the results are written on a uniform grid with
+        this print step, starting from ``tstart`` (like the SPICE ``TSTEP``
+        parameter). If set to a sequence, the results are written at the
+        times it contains. In both cases, the solution is interpolated
+        between the internal time points, which are still chosen by the step
+        control. If unset, the results are written at every internal time
+        point.
+
+    checkpoint : string, optional
+        the filename of a checkpoint file. If set, the state of the
+        analysis is saved to it every
+        ``options.transient_checkpoint_interval`` seconds and when the
+        analysis fails, so that it can be resumed later.
+
+    resume_from : string, optional
+        the filename of a checkpoint file, written by a previous run of the
+        same analysis with ``checkpoint`` set. The analysis resumes from the
+        saved state and the results already computed are restored from the
+        previous output file, as are the partial values of the
+        measurements, which must be the same as in the interrupted run.
+
+    steady_state : boolean, optional
+        if set, the analysis stops as soon as the circuit reaches its
+        periodic steady state, before ``tstop``, see
+        :mod:`ahkab.steady_state`. The settling time and the period are
+        available from the results set as ``res.steady_state``.
+
+    period : float, optional
+        the period used to detect the steady state. If unset, it is the
+        common period of the time-dependent sources or, if none of them is
+        periodic, it is estimated from the solution.
+
+    sens_outputs : list of strings, optional
+        the outputs, eg. ``['V(out)', 'I(V1)']``, whose sensitivities to
+        the circuit parameters are computed with a backward adjoint pass,
+        see :class:`ahkab.sens.TransientSensitivity`. They are available
+        from the results set as ``res.sensitivities``.
+
+    sens_type : string, optional
+        either ``'final'``, the default, for the sensitivities of the
+        values of the outputs at the end of the analysis, or ``'integ'``,
+        for those of their integrals over time.
+
     verbose : int, optional
         the verbosity level, from 0 (silent, default) to 6 (debug).
 
@@ -381,10 +466,15 @@ def new_tran(tstart, tstop, tstep, x0='op', method=transient.TRAP,
         outfile += '.tran'
     return {"type": "tran", "tstart": tstart, "tstop": tstop, "tstep": tstep,
             "method": method, "use_step_control": use_step_control, 'x0': x0,
-            'outfile': outfile, 'verbose': verbose}
+            'outfile': outfile, 'save': save, 'output_times': output_times,
+            'checkpoint': checkpoint, 'resume_from': resume_from,
+            'measures': measures, 'steady_state': steady_state,
+            'period': period, 'sens_outputs': sens_outputs,
+            'sens_type': sens_type, 'verbose': verbose}
 
 
-def new_ac(start, stop, points, x0='op', sweep_type='LOG', outfile=None, verbose=0):
+def new_ac(start, stop, points, x0='op', sweep_type='LOG', outfile=None, save=None,
+           measures=None, method=None, workers=None, verbose=0):
     """Assembles an AC analysis and returns the analysis object.
 
     The analysis itself can be run with ``ahkab.run(...)``
@@ -409,9 +499,11 @@ def new_ac(start, stop, points, x0='op', sweep_type='LOG', outfile=None, verbose
         supply your own linearization point in ndarray format.
 
     sweep_type : string, optional
-        It can be set to either ``options.ac_lin_step`` (linear stepping) or
-        ``options.ac_log_step`` (log10 stepping). Defaults to logarithmic
-        stepping.
+        It can be set to either ``options.ac_lin_step`` (linear stepping),
+        ``options.ac_log_step`` (log10 stepping) or
+        ``options.ac_adaptive_step`` (log10 stepping, refined where the
+        response is not smooth, in which case ``points`` sets the initial
+        grid). Defaults to logarithmic stepping.
 
     outfile : string, optional
         the filename of the output file where the results will be written.
@@ -422,6 +514,27 @@ def new_ac(start, stop, points, x0='op', sweep_type='LOG', outfile=None, verbose
         from an interactive session, a temporary file will be used to store the
         data.
 
+    save : list of strings, optional
+        the node voltages and branch currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted, as in
+        ``'V(n*)'``. If unset, all the variables are stored.
+
+    measures : list of measurements, optional
+        the measurements to be evaluated while the analysis runs, see
+        :mod:`ahkab.measure`. The measured values are available from the
+        results set as ``res.measures``.
+
+    method : string, optional
+        the solution method, ``options.ACDIRECT`` (``'direct'``, default),
+        ``options.ACSCHUR`` (``'schur'``), which reduces the circuit matrices
+        once and then solves each frequency at a fraction of the cost, or
+        ``options.ACPRIMA`` (``'prima'``), which replaces the circuit with a
+        reduced order model. See :func:`ahkab.ac.ac_analysis`.
+
+    workers : int, optional
+        the number of processes among which the frequencies are split. If
+        unset, ``options.ac_workers`` is used, 0 means one process per CPU.
+
     verbose : int, optional
         the verbosity level, from 0 (silent, default) to 6 (debug).
 
@@ -445,11 +558,82 @@ def new_ac(start, stop, points, x0='op', sweep_type='LOG', outfile=None, verbose
     return {
         'type': 'ac', 'start': start, 'stop': stop, 'points': points,
         'sweep_type': sweep_type, 'x0': x0, 'outfile': outfile,
-        'verbose': verbose}
+        'save': save, 'measures': measures, 'method': method,
+        'workers': workers, 'verbose': verbose}
+
+
+def new_noise(output, start, stop, points, source=None, sweep_type='LOG',
+              x0='op', outfile=None, verbose=0):
+    """Assembles a noise analysis and returns the analysis object.
+
+    The analysis itself can be run with: ``ahkab.run(...)`` or queued with
+    ``ahkab.queue(...)`` and then run subsequently.
+
+    **Parameters:**
+
+    output : str or tuple
+        the output port. If it is composed of only one node, then the
+        second node is assumed to be GND.
+
+    start : float
+        the start frequency for the noise sweep, in Hz.
+
+    stop : float
+        the stop frequency for the noise sweep, in Hz.
+
+    points : int
+        the number of points to be used to discretize the
+        ``[start, stop]`` interval.
+
+    source : str, optional
+        the ``part_id`` of the input source the noise is referred to. If
+        unset, only the output noise is computed.
+
+    sweep_type : str, optional
+        Either ``'LOG'`` or ``'LIN'``, defaults to ``'LOG'``.
+
+    x0 : ``numpy`` array or str, optional
+        the optional linearization point. If set to a string, it must be
+        the result of an .OP analysis (use ``'op'``) or an .IC condition
+        defined in the netlist. It has no effect on linear circuits.
+
+    outfile : string, optional
+        The filename of the output file where the results will be written.
+        '.noise' is automatically added at the end to prevent different
+        analyses from overwriting each-other's results.
+        If unset or set to ``None``, defaults to ``stdout``, if the simulator
+        was called from the command line, otherwise, if the simulator is run
+        from an interactive session, a temporary file will be used to store the
+        data.
+
+    verbose : int, optional
+        The verbosity level, from 0 (silent, default) to 6 (debug).
+
+    **Returns:**
+
+    an : dict
+        the analysis object (a dict)
+
+    .. seealso:: :func:`run`, :func:`queue`
+    """
+    if outfile is None or outfile == 'stdout':
+        if options.cli:
+            outfile = 'stdout'
+        else:
+            tmpfile = tempfile.NamedTemporaryFile(suffix='.noise', delete=False)
+            outfile = tmpfile.name
+            tmpfile.close()
+            atexit.register(os.remove, outfile)
+    else:
+        outfile += '.noise'
+    return {
+        'type': 'noise', 'output': output, 'start': start, 'stop': stop,
+        'points': points, 'source': source, 'sweep_type': sweep_type,
+        'x0': x0, 'outfile': outfile, 'verbose': verbose}
 
 
 def new_pss(period, x0=None, points=None, method=options.BFPSS, autonomous=False,
-            outfile=None, verbose=0):
+            outfile=None, save=None, verbose=0):
     """Assembles a Periodic Steady State (PSS) analysis and returns the analysis object.
 
     The analysis itself can be run with: ``ahkab.run(...)`` or queued with
@@ -489,6 +673,11 @@ def new_pss(period, x0=None, points=None, method=options.BFPSS, autonomous=False
         from an interactive session, a temporary file will be used to store the
         data.
 
+    save : list of strings, optional
+        The node voltages and branch currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted, as in
+        ``'V(n*)'``. If unset, all the variables are stored.
+
     verbose : int, optional
         The verbosity level, from 0 (silent, default) to 6 (debug).
 
@@ -511,7 +700,8 @@ def new_pss(period, x0=None, points=None, method=options.BFPSS, autonomous=False
         outfile += '.' + method.lower()
     return {
         'type': "pss", "method": method, 'period': period, 'points': points,
-        'autonomous': autonomous, 'x0': x0, 'outfile': outfile, 'verbose': verbose}
+        'autonomous': autonomous, 'x0': x0, 'outfile': outfile, 'save': save,
+        'verbose': verbose}
 
 
 def new_pz(input_source=None, output_port=None, shift=0.0, MNA=None, outfile=None,
@@ -657,6 +847,155 @@ def new_symbolic(source=None, ac_enable=True, r0s=False, subs=None, outfile=None
         'outfile': outfile, 'verbose': verbose}
 
 
+def new_sens(outputs, start=None, stop=None, points=None, sweep_type='LOG',
+             x0='op', outfile=None, verbose=0):
+    """Assembles a Sensitivity (SENS) analysis and returns the analysis
+    object.
+
+    The analysis computes the derivatives of the ``outputs`` with respect
+    to the parameters of all the elements in the circuit, at the Operating
+    Point or, if ``start``, ``stop`` and ``points`` are set, over an AC
+    frequency sweep. See :mod:`ahkab.sens` for the parameters considered.
+
+    The analysis itself can be run with: ``ahkab.run(...)`` or queued with
+    ``ahkab.queue(...)`` and then run subsequently.
+
+    **Parameters:**
+
+    outputs : str or list of str
+        the outputs: node voltages, such as ``'V(out)'``, ``'V(outp,outn)'``
+        or simply ``'out'``, or the currents in voltage-defined elements,
+        such as ``'I(V1)'``.
+
+    start : float, optional
+        the start frequency for the AC sweep, in Hz.
+
+    stop : float, optional
+        the stop frequency for the AC sweep, in Hz.
+
+    points : int, optional
+        the number of points to be used to discretize the
+        ``[start, stop]`` interval.
+
+    sweep_type : str, optional
+        Either ``'LOG'`` or ``'LIN'``, defaults to ``'LOG'``.
+
+    x0 : ``numpy`` array or str, optional
+        the optional linearization point. If set to a string, it must be
+        the result of an .OP analysis (use ``'op'``) or an .IC condition
+        defined in the netlist. It has no effect on linear circuits.
+
+    outfile : string, optional
+        The filename of the output file where the results will be written.
+        '.sens' is automatically added at the end to prevent different
+        analyses from overwriting each-other's results.
+        If unset or set to ``None``, defaults to ``stdout``, if the simulator
+        was called from the command line, otherwise, if the simulator is run
+        from an interactive session, a temporary file will be used to store the
+        data.
+
+    verbose : int, optional
+        The verbosity level, from 0 (silent, default) to 6 (debug).
+
+    **Returns:**
+
+    an : dict
+        the analysis object (a dict)
+
+    .. seealso:: :func:`run`, :func:`queue`
+    """
+    if outfile is None or outfile == 'stdout':
+        if options.cli:
+            outfile = 'stdout'
+        else:
+            tmpfile = tempfile.NamedTemporaryFile(suffix='.sens', delete=False)
+            outfile = tmpfile.name
+            tmpfile.close()
+            atexit.register(os.remove, outfile)
+    else:
+        outfile += '.sens'
+    return {
+        'type': 'sens', 'outputs': outputs, 'start': start, 'stop': stop,
+        'points': points, 'sweep_type': sweep_type, 'x0': x0,
+        'outfile': outfile, 'verbose': verbose}
+
+
+def new_tf(output, source=None, start=None, stop=None, points=None,
+           sweep_type='LOG', x0='op', outfile=None, verbose=0):
+    """Assembles a small-signal Transfer Function (TF) analysis and returns
+    the analysis object.
+
+    If ``start``, ``stop`` and ``points`` are not set, the analysis computes
+    the DC gain from ``source`` to ``output``, the input and the output
+    resistances. Otherwise, it computes the AC transfer functions from
+    every independent source in the circuit to ``output``.
+
+    The analysis itself can be run with: ``ahkab.run(...)`` or queued with
+    ``ahkab.queue(...)`` and then run subsequently.
+
+    **Parameters:**
+
+    output : str or tuple
+        the output port. If it is composed of only one node, then the
+        second node is assumed to be GND.
+
+    source : str, optional
+        the ``part_id`` of the input source, needed for the DC gain and the
+        input resistance.
+
+    start : float, optional
+        the start frequency for the AC sweep, in Hz.
+
+    stop : float, optional
+        the stop frequency for the AC sweep, in Hz.
+
+    points : int, optional
+        the number of points to be used to discretize the
+        ``[start, stop]`` interval.
+
+    sweep_type : str, optional
+        Either ``'LOG'`` or ``'LIN'``, defaults to ``'LOG'``.
+
+    x0 : ``numpy`` array or str, optional
+        the optional linearization point. If set to a string, it must be
+        the result of an .OP analysis (use ``'op'``) or an .IC condition
+        defined in the netlist. It has no effect on linear circuits.
+
+    outfile : string, optional
+        The filename of the output file where the results will be written.
+        '.tf' is automatically added at the end to prevent different
+        analyses from overwriting each-other's results.
+        If unset or set to ``None``, defaults to ``stdout``, if the simulator
+        was called from the command line, otherwise, if the simulator is run
+        from an interactive session, a temporary file will be used to store the
+        data.
+
+    verbose : int, optional
+        The verbosity level, from 0 (silent, default) to 6 (debug).
+
+    **Returns:**
+
+    an : dict
+        the analysis object (a dict)
+
+    .. seealso:: :func:`run`, :func:`queue`
+    """
+    if outfile is None or outfile == 'stdout':
+        if options.cli:
+            outfile = 'stdout'
+        else:
+            tmpfile = tempfile.NamedTemporaryFile(suffix='.tf', delete=False)
+            outfile = tmpfile.name
+            tmpfile.close()
+            atexit.register(os.remove, outfile)
+    else:
+        outfile += '.tf'
+    return {
+        'type': 'tf', 'output': output, 'source': source, 'start': start,
+        'stop': stop, 'points': points, 'sweep_type': sweep_type, 'x0': x0,
+        'outfile': outfile, 'verbose': verbose}
+
+
 def queue(*analysis):
     """Queue one or more analyses to execute them subsequently with :func:`run`.
 
@@ -677,6 +1016,12 @@ def queue(*analysis):
 def run(circ, an_list=None):
     """Run analyses on a circuit.
 
+    If ``options.prima_reduce`` is set, the OP, AC and TRAN analyses are run
+    on the circuit returned by :func:`ahkab.prima.reduce_circuit`, which
+    preserves the nodes listed in ``options.prima_outputs``. The analyses
+    run on the whole circuit do not take the OP of the reduced circuit as
+    ``x0``: they compute their own.
+
     **Parameters:**
 
     circ : circuit instance
@@ -704,22 +1049,97 @@ def run(circ, an_list=None):
         elif type(an_list) == dict:
             an_list = [an_list] # run(mycircuit, op1)
 
+    reduced = None
     while len(an_list):
         an_item = an_list.pop(0)
         an_type = an_item.pop('type')
         if 'x0' in an_item and isinstance(an_item['x0'], text_type):
-            printing.print_warning("%s has x0 set to %s, unavailable. Using 'None'." %
-                                   (an_type.upper(), an_item['x0']))
+            if an_item['x0'] in _reduced_x0s:
+                printing.print_warning("%s has x0 set to %s, computed on the " %
+                                       (an_type.upper(), an_item['x0']) +
+                                       "reduced circuit. Using 'None'.")
+            else:
+                printing.print_warning("%s has x0 set to %s, unavailable. Using 'None'." %
+                                       (an_type.upper(), an_item['x0']))
             an_item['x0'] = None
-        r = analysis[an_type](circ, **an_item)
+        an_circ = circ
+        if _is_reduced(an_type):
+            if reduced is None:
+                reduced = prima.reduce_circuit(circ, options.prima_outputs,
+                                               verbose=an_item.get('verbose', 0))
+            an_circ = reduced
+        r = analysis[an_type](an_circ, **an_item)
         results.update({an_type: r})
         if an_type == 'op':
-            _x0s.update({'op': r})
-            _x0s.update({'op+ic': icmodified_x0(circ, r)})
+            # the OP of the reduced circuit is not an x0 for the analyses
+            # run on the whole circuit, and vice versa
+            x0s, stale = (_reduced_x0s, _x0s) if an_circ is reduced else \
+                         (_x0s, _reduced_x0s)
+            x0s.update({'op': r})
+            x0s.update({'op+ic': icmodified_x0(an_circ, r)})
+            stale.pop('op', None)
+            stale.pop('op+ic', None)
             _handle_netlist_ics(circ, an_list, ic_list=[])
     return results
 
 
+def iter_tran(circ, tstart, tstop, tstep, x0=None, method=transient.TRAP,
+              use_step_control=True, outfile=None, output_times=None,
+              verbose=0):
+    """Run a TRAN analysis, yielding the results as soon as they are computed.
+
+    Unlike :func:`run`, which returns once the whole analysis is complete,
+    this function returns an iterator. Every time a time point is accepted,
+    the iterator yields the corresponding block of results. Breaking out of
+    the iteration stops the analysis.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit to be simulated.
+
+    tstart, tstop, tstep, method, use_step_control, output_times : optional
+        as in :func:`new_tran`.
+
+    x0 : ``numpy`` array or op_solution, optional
+        the initial conditions point, :math:`x0 = x(t=0)`. If unset, all
+        the node voltages and branch currents start from zero.
+
+    outfile : string, optional
+        the filename of the output file where the results will also be
+        written, '.tran' is automatically added at the end. If unset, no
+        results are written to disk.
+
+    verbose : int, optional
+        the verbosity level, from 0 (silent, default) to 6 (debug).
+
+    **Yields:**
+
+    t : ndarray
+        the times of the new results.
+    x : ndarray
+        the new results, one column for each time in ``t``. The rows are
+        the node voltages followed by the currents in the voltage-defined
+        elements, in the same order as the unknowns of the circuit.
+
+    **Example:**
+
+    ::
+
+        for t, x in ahkab.iter_tran(mycircuit, 0, 1e-3, 1e-6):
+            if (x[out_index, :] > 1.).any():
+                break  # spec failed, stop the simulation
+
+    .. seealso:: :func:`new_tran`
+    """
+    if outfile is not None:
+        outfile += '.tran'
+    return transient.iter_transient(circ, tstart, tstop, tstep, method=method,
+                                    use_step_control=use_step_control, x0=x0,
+                                    outfile=outfile, output_times=output_times,
+                                    verbose=verbose)
+
+
 def new_x0(circ, icdict):
     """Builds an ``x0`` matrix from user supplied values.
 
@@ -860,7 +1280,9 @@ def process_postproc(postproc_list, title, results, outfilename):
 analysis = {'op': dc_analysis.op_analysis, 'dc': dc_analysis.dc_analysis,
             'tran': transient.transient_analysis, 'ac': ac.ac_analysis,
             'pss': pss.pss_analysis, 'symbolic': symbolic.symbolic_analysis,
-            'temp': set_temperature, 'pz':pz.calculate_singularities}
+            'temp': set_temperature, 'pz':pz.calculate_singularities,
+            'noise': noise.noise_analysis, 'tf': tf.tf_analysis,
+            'sens': sens.sens_analysis}
 
 
 def main(filename, outfile="stdout", verbose=3):
@@ -885,11 +1307,14 @@ def main(filename, outfile="stdout", verbose=3):
 
     - Alternate Current (AC): ``.ac``
     - Direct Current (DC): ``.dc``
+    - Noise: ``.noise``
     - Operating Point (OP): ``.opinfo``
     - Periodic Steady State (PSS): ``.pss``
     - Pole-zero Analysis (PZ): ``.pz``
+    - Sensitivity (SENS): ``.sens``
     - TRANsient (TRAN): ``.tran``
     - Symbolic: ``.symbolic``
+    - Transfer Function (TF): ``.tf``
 
     **Returns:**
 
@@ -938,8 +1363,14 @@ def main(filename, outfile="stdout", verbose=3):
 
     ic_list = netlist_parser.parse_ics(directives)
     _handle_netlist_ics(circ, an_list=[], ic_list=ic_list)
+    save = netlist_parser.parse_saves(directives)
+    measures = netlist_parser.parse_measures(directives)
     results = {}
     for an in netlist_parser.parse_analysis(circ, directives):
+        if save is not None and an['type'] in ('dc', 'tran', 'ac', 'pss'):
+            an.update({'save': save})
+        if an['type'] in measures:
+            an.update({'measures': measures[an['type']]})
         if 'outfile' not in list(an.keys()) or not an['outfile']:
             an.update(
                 {'outfile': outfile + ("." + an['type']) * (outfile != 'stdout')})
@@ -951,6 +1382,9 @@ def main(filename, outfile="stdout", verbose=3):
             printing.print_info_line(("Requested an.:", 4), verbose)
             printing.print_analysis(an)
         results.update(run(circ, [an]))
+        if an['type'] in measures and results[an['type']] is not None:
+            printing.print_measures(an['type'].upper(),
+                                    results[an['type']].measures.items())
 
     postproc_list = netlist_parser.parse_postproc(circ, postproc_direct)
     if len(postproc_list) > 0 and len(results):
@@ -966,10 +1400,21 @@ def _handle_netlist_ics(circ, an_list, ic_list):
         _x0s.update({ic_label: new_x0(circ, icdict)})
     for an in an_list:
         if 'x0' in an and isinstance(an['x0'], text_type):
-            if an['x0'] in list(_x0s.keys()):
-                an['x0'] = _x0s[an['x0']]
+            x0s = _x0s
+            if _is_reduced(an.get('type')) and an['x0'] in ('op', 'op+ic'):
+                x0s = _reduced_x0s
+            if an['x0'] in list(x0s.keys()):
+                an['x0'] = x0s[an['x0']]
+            elif an['x0'] in _reduced_x0s:
+                # computed on the reduced circuit only: the analysis
+                # computes its own OP, see run()
+                pass
             elif an_list.index(an) == 0:
                 raise ValueError(("The x0 '%s' is not available." % an["x0"]) +\
                                  (an['x0'] == 'op' or an['x0'] == 'op+ic')*
                                  " Perhaps you forgot to define an .OP?")
 
+
+def _is_reduced(an_type):
+    # whether the analysis runs on the circuit reduced by prima, see run()
+    return options.prima_reduce and an_type in ('op', 'ac', 'tran')
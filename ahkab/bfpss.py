@@ -36,13 +36,14 @@ from . import options
 from . import printing
 from . import results
 from . import ticker
+from . import time_functions
 from . import transient
 from . import utilities
 
 
 def bfpss(circ, period, step=None, points=None, autonomous=False, x0=None,
           mna=None, Tf=None, D=None, outfile='stdout',
-          vector_norm=lambda v: max(abs(v)), verbose=3):
+          vector_norm=lambda v: max(abs(v)), save=None, verbose=3):
     """Performs a PSS analysis employing the 'brute-force' algorithm
 
     The time step is constant and IE will be used as DF.
@@ -84,6 +85,11 @@ def bfpss(circ, period, step=None, points=None, autonomous=False, x0=None,
     outfile : str, optional
         the output filename. Defaults to ``'stdout'``.
 
+    save : list of strings, optional
+        The node voltages and currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted.
+        If unset, all of them are stored.
+
     verbose : int, optional
         Verbosity level on a scale from 0 (silent) to 6 (very verbose).
         The ``verbose`` flag is automatically set is to zero
@@ -269,7 +275,8 @@ def bfpss(circ, period, step=None, points=None, autonomous=False, x0=None,
         t = t.reshape((1, points))
         x = x.reshape((points, n_of_var))
         sol = results.pss_solution(circ=circ, method="brute-force",
-                                   period=period, outfile=outfile)
+                                   period=period, outfile=outfile,
+                                   save=save)
         sol.set_results(t, x.T)
     else:
         print("failed.")
@@ -377,29 +384,25 @@ def _build_Tt(circ, points, step, tick, n_of_var, verbose=3):
     printing.print_info_line(("Building Tt...", 5), verbose, print_nl=False)
     tick.reset()
     tick.display(verbose > 2)
-    Tt = np.zeros((points * n_of_var, 1))
-    for index in range(1, points):
-        v_eq = 0
-        time = index * step
-        for elem in circ:
-            if (isinstance(elem, components.sources.VSource) or isinstance(elem, components.sources.ISource)) and elem.is_timedependent:
-                if isinstance(elem, components.sources.VSource):
-                    Tt[index * n_of_var + nv - 1 + v_eq, 0] = - \
-                        1.0 * elem.V(time)
-                elif isinstance(elem, components.sources.ISource):
-                    if elem.n1:
-                        Tt[index * n_of_var + elem.n1 - 1, 0] = \
-                            Tt[index * n_of_var + elem.n1 - 1, 0] + \
-                            elem.I(time)
-                    if elem.n2:
-                        Tt[index * n_of_var + elem.n2 - 1, 0] = \
-                            Tt[index * n_of_var + elem.n2 - 1, 0] - \
-                                elem.I(time)
-            if circuit.is_elem_voltage_defined(elem):
-                v_eq = v_eq + 1
-            # print Tt[index*n_of_var:(index+1)*n_of_var]
+    # one row per time point, all sources are sampled at once
+    # the first time point is left to zero
+    Tt = np.zeros((points, n_of_var))
+    times = np.arange(1, points) * step
+    v_eq = 0
+    for elem in circ:
+        if (isinstance(elem, components.sources.VSource) or isinstance(elem, components.sources.ISource)) and elem.is_timedependent:
+            if isinstance(elem, components.sources.VSource):
+                Tt[1:, nv - 1 + v_eq] = -1.0 * time_functions.sample(elem.V, times)
+            elif isinstance(elem, components.sources.ISource):
+                it = time_functions.sample(elem.I, times)
+                if elem.n1:
+                    Tt[1:, elem.n1 - 1] = Tt[1:, elem.n1 - 1] + it
+                if elem.n2:
+                    Tt[1:, elem.n2 - 1] = Tt[1:, elem.n2 - 1] - it
+        if circuit.is_elem_voltage_defined(elem):
+            v_eq = v_eq + 1
         tick.step()
     tick.hide(verbose > 2)
     printing.print_info_line(("done.", 5), verbose)
 
-    return Tt
+    return Tt.reshape((points * n_of_var, 1))
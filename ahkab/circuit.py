@@ -1169,6 +1169,28 @@ def is_elem_voltage_defined(elem):
         return False
 
 
+def get_subckt_instance(elem):
+    """Get the label of the subcircuit instance an element belongs to
+
+    The elements of a subcircuit instance have their ``part_id`` set to
+    ``<type>-<instance>-<subckt>-<name>`` by
+    :func:`ahkab.netlist_parser.parse_sub_instance`.
+
+    **Parameters:**
+
+    elem : Component
+        The element to be checked.
+
+    **Returns:**
+
+    label : string or None
+        The instance label, ``None`` if ``elem`` is a top level element.
+    """
+    if len(elem.part_id) > 1 and elem.part_id[1] == '-':
+        return elem.part_id.split('-')[1]
+    return None
+
+
 class NodeNotFoundError(Exception):
     """Circuit Node exception."""
     pass
@@ -0,0 +1,87 @@
+# -*- coding: iso-8859-1 -*-
+# Copyright 2015 Giuseppe Venturini
+
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+import numpy as np
+
+from .Component import Component
+
+
+class Macromodel(Component):
+    """A linear multiport macromodel, such as the reduced-order models of
+    :func:`ahkab.prima.reduce_circuit`.
+
+    The macromodel is described by the matrices :math:`G_r`, :math:`C_r`
+    and :math:`B_r` of
+
+    .. math::
+
+        (G_r + s C_r)\\ y = B_r\\ i_p, \\qquad v_p = B_r^T y,
+
+    where :math:`v_p` and :math:`i_p` are the voltages of its ports and the
+    currents flowing into them. Its state :math:`y` is made of the port
+    voltages, followed by its internal variables, ie :math:`B_r = [I\\ 0]^T`:
+    the internal variables are solved as the voltages of its internal nodes.
+
+    **Parameters:**
+
+    part_id : string
+        The unique identifier of this element.
+    port_nodes : list of ints
+        The *internal* nodes of the circuit connected to its ports, ground
+        excluded.
+    state_nodes : list of ints
+        The *internal* nodes holding its internal variables.
+    G, C : ndarrays
+        The matrices :math:`G_r` and :math:`C_r`, of size
+        ``len(port_nodes) + len(state_nodes)``.
+
+    """
+    def __init__(self, part_id, port_nodes, state_nodes, G, C):
+        self.part_id = part_id
+        self.port_nodes = tuple(port_nodes)
+        self.state_nodes = tuple(state_nodes)
+        self.nodes = self.port_nodes + self.state_nodes
+        self.n1 = self.nodes[0]
+        self.n2 = 0
+        self.G = np.asarray(G)
+        self.C = np.asarray(C)
+        self.value = None
+        self.is_nonlinear = False
+        self.is_symbolic = False
+
+    def __str__(self):
+        return "ports=%d states=%d" % (len(self.port_nodes),
+                                       len(self.state_nodes))
+
+    def get_netlist_elem_line(self, nodes_dict):
+        """A netlist comment describing the macromodel, which has no netlist
+        syntax.
+
+        **Parameters:**
+
+        nodes_dict : dict
+            The nodes dictionary of the circuit, so that the method
+            can convert its internal node IDs to the corresponding
+            external ones.
+
+        **Returns:**
+
+        ntlst_line : string
+            The netlist line.
+        """
+        return "* %s ports: %s states: %s" % (
+            self.part_id, " ".join(nodes_dict[n] for n in self.port_nodes),
+            " ".join(nodes_dict[n] for n in self.state_nodes))
@@ -21,5 +21,6 @@ This module contains different components
 from .Component import Component;
 from .Capacitor import *;
 from .Inductor import *;
+from .Macromodel import *;
 from .Resistor import *;
 from . import sources;
@@ -126,7 +126,7 @@ specs = {'op': {
 
 
 def dc_solve(mna, Ndc, circ, Ntran=None, Gmin=None, x0=None, time=None,
-             MAXIT=None, locked_nodes=None, skip_Tt=False, verbose=3):
+             MAXIT=None, locked_nodes=None, skip_Tt=False, bypass=None, verbose=3):
     """Low-level method to perform a DC solution of the circuit
 
     .. note::
@@ -189,6 +189,10 @@ def dc_solve(mna, Ndc, circ, Ntran=None, Gmin=None, x0=None, time=None,
         analysis), it's a good idea to generate it only once.
     skip_Tt : boolean, optional
         Do not build the :math:`T_t(t)` vector. Defaults to ``False``.
+    bypass : latency.LatencyBypass instance, optional
+        If set, it builds the contributions of the nonlinear elements,
+        bypassing the evaluation of the latent ones. See
+        :mod:`ahkab.latency`.
     verbose : int, optional
         The verbosity level. From 0 (silent) to 6 (debug). Defaults to 3.
 
@@ -274,7 +278,8 @@ def dc_solve(mna, Ndc, circ, Ntran=None, Gmin=None, x0=None, time=None,
             N_to_pass = source_stepping["factors"][source_stepping["index"]]*Ndc + Ntran*(Ntran is not None)
         try:
             (x, error, converged, n_iter, convergence_by_node) = mdn_solver(x, mna_to_pass, circ, T=N_to_pass,
-                                                                            nv=nv, print_steps=(verbose > 0), locked_nodes=locked_nodes, time=time, MAXIT=MAXIT, debug=(verbose == 6))
+                                                                            nv=nv, print_steps=(verbose > 0), locked_nodes=locked_nodes, time=time, MAXIT=MAXIT, debug=(verbose == 6),
+                                                                            bypass=bypass)
             tot_iterations += n_iter
         except np.linalg.linalg.LinAlgError:
             n_iter = 0
@@ -458,7 +463,8 @@ def get_solve_methods():
     return standard_solving, gmin_stepping, source_stepping
 
 
-def dc_analysis(circ, start, stop, step, source, sweep_type='LINEAR', guess=True, x0=None, outfile="stdout", verbose=3):
+def dc_analysis(circ, start, stop, step, source, sweep_type='LINEAR', guess=True, x0=None, outfile="stdout",
+                save=None, measures=None, verbose=3):
     """Performs a sweep of the value of V or I of a independent source from start
     value to stop value using the provided step.
 
@@ -485,6 +491,12 @@ def dc_analysis(circ, start, stop, step, source, sweep_type='LINEAR', guess=True
     outfile : string, optional
         Filename of the output file. If set to ``'stdout'`` (default), prints to
         screen.
+    save : list of strings, optional
+        The node voltages and currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted.
+        If unset, all of them are stored.
+    measures : list of measurements, optional
+        Measurements to be evaluated on the sweep, see :mod:`ahkab.measure`.
     verbose : int
         The verbosity level, from 0 (silent) to 6 (debug).
 
@@ -550,7 +562,10 @@ def dc_analysis(circ, start, stop, step, source, sweep_type='LINEAR', guess=True
     x = x0
 
     sol = results.dc_solution(
-        circ, start, stop, sweepvar=sweep_label, stype=sweep_type, outfile=outfile)
+        circ, start, stop, sweepvar=sweep_label, stype=sweep_type, outfile=outfile,
+        save=save)
+    if measures:
+        sol.add_measures(measures)
 
     printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
     tick = ticker.ticker(1)
@@ -689,7 +704,7 @@ def op_analysis(circ, x0=None, guess=True, outfile=None, verbose=3):
 
 def mdn_solver(x, mna, circ, T, MAXIT, nv, locked_nodes, time=None,
                print_steps=False, vector_norm=lambda v: max(abs(v)),
-               debug=True):
+               debug=True, bypass=None):
     """
     Solves a problem like F(x) = 0 using the Newton Algorithm with a variable
     damping.
@@ -747,6 +762,10 @@ def mdn_solver(x, mna, circ, T, MAXIT, nv, locked_nodes, time=None,
     debug : int, optional
         Debug flag that will result in an array being returned containing
         node-by-node convergence information.
+    bypass : latency.LatencyBypass instance, optional
+        If set, it builds the contributions of the nonlinear elements,
+        bypassing the evaluation of the latent ones. See
+        :mod:`ahkab.latency`.
 
     **Returns:**
 
@@ -810,9 +829,12 @@ def mdn_solver(x, mna, circ, T, MAXIT, nv, locked_nodes, time=None,
             # build dT(x)/dx (stored in J) and Tx(x)
             J[:, :] = 0.0
             Tx[:, 0] = 0.0
-            for elem in circ:
-                if elem.is_nonlinear:
-                    _update_J_and_Tx(J, Tx, x, elem, time)
+            if bypass is not None:
+                bypass.update_J_and_Tx(J, Tx, x, time)
+            else:
+                for elem in circ:
+                    if elem.is_nonlinear:
+                        _update_J_and_Tx(J, Tx, x, elem, time)
         residuo = mna.dot(x) + T + nonlinear_circuit*Tx
 
         if sparse:
@@ -1010,6 +1032,9 @@ def generate_mna_and_N(circ, verbose=3):
         elif isinstance(elem, components.InductorCoupling):
             pass
             # this is taken care of within the inductors
+        elif isinstance(elem, components.Macromodel):
+            ix = np.ix_(elem.nodes, elem.nodes)
+            mna[ix] = mna[ix] + elem.G
         elif circuit.is_elem_voltage_defined(elem):
             pass
             # we'll add its lines afterwards
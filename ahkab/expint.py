@@ -0,0 +1,414 @@
+# -*- coding: iso-8859-1 -*-
+# expint.py
+# Exponential integrator for linear circuits
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Exponential integrator for the transient analysis of linear circuits.
+
+The equations of a linear circuit,
+
+.. math::
+
+    D \\frac{dx}{dt} + MNA\\ x + N(t) = 0,
+
+are reduced to an ODE in the dynamic variables :math:`y` only:
+
+.. math::
+
+    \\frac{dy}{dt} = A y + B N(t).
+
+The dynamic variables are found from the structure of :math:`D`: they are
+the unknowns whose row or column is not zero, that is the voltages of the
+nodes connected to capacitors and the currents of the inductors. The others
+are algebraic and are eliminated through the Schur complement of
+:math:`MNA`. In a group of nodes connected to each other by capacitors, but
+not to ground, one node voltage is algebraic as well: the others are
+replaced by their voltages referred to it. See :class:`ReducedDAE`.
+
+The matrices are sparse and :math:`A` and :math:`B` are never built: they
+are applied through the sparse LU factorizations of the dynamic block of
+:math:`D` and of the algebraic block of :math:`MNA`, so that the cost of
+each product grows with the number of non-zero elements rather than with
+the square of the circuit size.
+
+Where the sources are linear in time, the ODE is solved exactly, computing
+the action of the matrix exponential with
+``scipy.sparse.linalg.expm_multiply``. No truncation error is made, so the
+time step is not limited by the time constants of the circuit:
+
+* if all the time-dependent sources are piecewise linear (``pulse`` and
+  ``pwl``), the solution is advanced from one breakpoint to the next in a
+  single step,
+* otherwise the sources are sampled every ``tstep`` and interpolated
+  linearly in between.
+
+This module is used by :func:`ahkab.transient.transient_analysis` when the
+``EXPONENTIAL`` method is selected.
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+from scipy.sparse.linalg import expm_multiply
+
+from . import circuit
+from . import components
+from . import options
+from . import printing
+from . import time_functions
+
+
+class ReducedDAE(object):
+    """The circuit equations reduced to an ODE in the dynamic variables.
+
+    The algebraic unknowns, whose rows and columns of :math:`D` are zero,
+    are eliminated. This requires the equations to be of index one, which
+    is not the case, for example, in circuits with loops made of
+    capacitors and voltage sources only.
+
+    Before that, for each group of unknowns coupled to each other in
+    :math:`D` whose rows of :math:`D` sum up to zero, ie for each group of
+    nodes connected by capacitors but not to ground, the first unknown
+    :math:`x_r` of the group is kept and the others are replaced by
+    :math:`x_i - x_r`. That is a congruence transformation,
+    :math:`x = T w`, of the equations, after which :math:`x_r` is
+    algebraic.
+
+    The minimum capacitance added to each node, ``options.cmin``, is not
+    considered dynamic.
+
+    **Parameters:**
+
+    mna : ndarray or sparse matrix
+        The (reduced) MNA matrix.
+    D : ndarray or sparse matrix
+        The (reduced) matrix of the dynamic elements.
+
+    :raises ValueError: if the equations are of index higher than one.
+    """
+    def __init__(self, mna, D):
+        n = mna.shape[0]
+        D = scipy.sparse.csc_matrix(D, dtype=float)
+        D.data[abs(D.data) <= options.cmin*(1 + 1e-6)] = 0.
+        D.eliminate_zeros()
+        self._T, ref = _get_floating_transform(D)
+        if len(ref):
+            keep = np.ones(n)
+            keep[ref] = 0.
+            keep = scipy.sparse.diags(keep)
+            D = keep.dot(D).dot(keep).tocsc()
+            D.eliminate_zeros()
+        G = self._T.T.dot(scipy.sparse.csc_matrix(mna, dtype=float)).dot(self._T).tocsc()
+        is_dynamic = (abs(D).sum(axis=0).A1 + abs(D).sum(axis=1).A1) > 0
+        self._d = np.flatnonzero(is_dynamic)
+        self._a = np.flatnonzero(~is_dynamic)
+        #: The number of dynamic variables.
+        self.size = len(self._d)
+        Gdd = G[self._d, :][:, self._d]
+        self._Gda = G[self._d, :][:, self._a].tocsc()
+        Gad = G[self._a, :][:, self._d].tocsc()
+        self._Gad = Gad
+        self._Gaa_lu = self._Ddd_lu = None
+        try:
+            if len(self._a):
+                Gaa = G[self._a, :][:, self._a].tocsc()
+                self._Gaa_lu = scipy.sparse.linalg.splu(Gaa)
+                # the Schur complement of the algebraic block
+                Gdd = Gdd - self._Gda.dot(_sparse_solve(Gaa, Gad))
+        except RuntimeError:
+            raise ValueError("The circuit equations are of index higher than " +
+                             "one (eg. a loop of capacitors and voltage " +
+                             "sources): the exponential integrator can't be used.")
+        try:
+            if self.size:
+                Ddd = D[self._d, :][:, self._d].tocsc()
+                self._Ddd_lu = scipy.sparse.linalg.splu(Ddd)
+                #: The matrix :math:`A`, sparse.
+                self.A = -_sparse_solve(Ddd, Gdd.tocsc())
+            else:
+                self.A = scipy.sparse.csc_matrix((0, 0))
+        except RuntimeError:
+            raise ValueError("The matrix of the dynamic elements is singular " +
+                             "(eg. perfectly coupled inductors): the " +
+                             "exponential integrator can't be used.")
+
+    def _solve_Gaa(self, v):
+        if self._Gaa_lu is None:
+            return np.zeros((0,))
+        return self._Gaa_lu.solve(v)
+
+    def get_input(self, N):
+        """Compute :math:`B N`.
+
+        **Parameters:**
+
+        N : ndarray
+            A source vector, with the size of the MNA matrix.
+
+        **Returns:**
+
+        BN : ndarray
+            The input to the ODE, as a 1D array.
+        """
+        if self._Ddd_lu is None:
+            return np.zeros((0,))
+        w = self._T.T.dot(np.ravel(N))
+        return -self._Ddd_lu.solve(w[self._d] - self._Gda.dot(self._solve_Gaa(w[self._a])))
+
+    def get_y(self, x):
+        """Get the dynamic variables from the solution ``x``.
+
+        **Returns:**
+
+        y : ndarray
+            The dynamic variables, as a 1D array.
+        """
+        # T is unit triangular, T^-1 = 2 I - T
+        x = np.ravel(x)
+        return (2*x - self._T.dot(x))[self._d]
+
+    def get_x(self, y, N):
+        """Get the solution from the dynamic variables and the source
+        vector.
+
+        **Returns:**
+
+        x : ndarray
+            The solution, as a column vector.
+        """
+        n = self._T.shape[0]
+        w = np.zeros((n,))
+        w[self._d] = y
+        Na = self._T.T.dot(np.ravel(N))[self._a]
+        w[self._a] = -self._solve_Gaa(self._Gad.dot(y) + Na)
+        return self._T.dot(w).reshape((-1, 1))
+
+    def get_augmented_matrix(self, b1, b0):
+        """Get the matrix :math:`M` of :math:`dz/dt = M z`, the ODE
+        :math:`dy/dt = A y + b_1 (t - t_a) + b_0` augmented with
+        :math:`z = [y, t - t_a, 1]`.
+
+        **Returns:**
+
+        M : sparse matrix or ndarray
+            The augmented matrix, dense if it is not bigger than
+            ``options.dense_matrix_limit``: ``expm_multiply`` estimates the
+            norms of the powers of sparse matrices, which costs more than
+            the exponential itself for small circuits.
+        """
+        inputs = scipy.sparse.csc_matrix(np.column_stack((b1, b0)).reshape((-1, 2)))
+        time = scipy.sparse.csc_matrix(np.array([[0., 1.], [0., 0.]]))
+        M = scipy.sparse.bmat([[self.A, inputs], [None, time]], format='csc')
+        if M.shape[0] <= options.dense_matrix_limit:
+            return M.toarray()
+        return M
+
+
+def _sparse_solve(A, B):
+    """Solve :math:`A X = B`, ``B`` and ``X`` sparse."""
+    X = scipy.sparse.linalg.spsolve(A, B)
+    if not scipy.sparse.issparse(X):
+        # single column
+        X = scipy.sparse.csc_matrix(X.reshape((A.shape[0], -1)))
+    return X.tocsc()
+
+
+def _get_floating_transform(D):
+    """Find the groups of unknowns coupled in ``D`` whose rows sum up to
+    zero, and the transformation making the first unknown of each group
+    algebraic, see :class:`ReducedDAE`.
+
+    **Returns:**
+
+    (T, ref) : tuple
+        The transformation, as a sparse matrix, and the indices of the
+        unknowns made algebraic.
+    """
+    n = D.shape[0]
+    absD = abs(D)
+    ncomp, labels = scipy.sparse.csgraph.connected_components(absD, directed=False)
+    row_sums = abs(D.dot(np.ones((n,))))
+    scale = absD.dot(np.ones((n,)))
+    # the largest element and the first unknown of each group
+    group_scale = np.zeros((ncomp,))
+    np.maximum.at(group_scale, labels, scale)
+    first = np.full((ncomp,), n)
+    np.minimum.at(first, labels, np.arange(n))
+    # allow for the minimum capacitance on each node
+    nonzero_sum = row_sums > 1e-12*group_scale[labels] + options.cmin*(1 + 1e-6)
+    floating = (group_scale > 0) & \
+               (np.bincount(labels, weights=nonzero_sum, minlength=ncomp) == 0)
+    rows = np.flatnonzero(floating[labels] & (np.arange(n) != first[labels]))
+    cols = first[labels[rows]]
+    T = scipy.sparse.identity(n, format='csc') + \
+        scipy.sparse.csc_matrix((np.ones((len(rows),)), (rows, cols)), shape=(n, n))
+    return T.tocsc(), first[floating]
+
+
+def get_source_vectors(circ, times, size):
+    """Sample the contribution of the time-dependent sources to :math:`N(t)`.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit.
+    times : array-like
+        The time instants, in seconds.
+    size : int
+        The number of variables, ie the size of the reduced MNA matrix.
+
+    **Returns:**
+
+    Tt : ndarray
+        The source vectors, one column per time instant.
+    """
+    nv = circ.get_nodes_number()
+    Tt = np.zeros((size, len(times)))
+    v_eq = 0
+    for elem in circ:
+        if (isinstance(elem, components.sources.VSource) or isinstance(elem, components.sources.ISource)) and elem.is_timedependent:
+            if isinstance(elem, components.sources.VSource):
+                Tt[nv - 1 + v_eq, :] = -1.0 * time_functions.sample(elem.V, times)
+            elif isinstance(elem, components.sources.ISource):
+                it = time_functions.sample(elem.I, times)
+                if elem.n1:
+                    Tt[elem.n1 - 1, :] = Tt[elem.n1 - 1, :] + it
+                if elem.n2:
+                    Tt[elem.n2 - 1, :] = Tt[elem.n2 - 1, :] - it
+        if circuit.is_elem_voltage_defined(elem):
+            v_eq = v_eq + 1
+    return Tt
+
+
+def is_piecewise_linear(circ):
+    """Check whether all the time-dependent sources are piecewise linear.
+
+    Sources driven by ``pulse`` and ``pwl`` time functions are linear
+    between their breakpoints.
+
+    **Returns:**
+
+    pwl : boolean
+        The result of the check.
+    """
+    for elem in circ:
+        if (isinstance(elem, components.sources.VSource) or isinstance(elem, components.sources.ISource)) and elem.is_timedependent and \
+           not isinstance(elem._time_function, (time_functions.pulse, time_functions.pwl)):
+            return False
+    return True
+
+
+def expint_steps(circ, tstart, tstep, tstop, mna, N, D, x0, breakpoints,
+                 output_times=None, verbose=3):
+    """Generator solving a linear circuit with the exponential integrator.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit, it has to be linear.
+    tstart, tstep, tstop : floats
+        The start time, the time step and the stop time. The time step sets
+        the spacing of the results, if ``output_times`` is not set, and the
+        sampling of the sources that are not piecewise linear.
+    mna, N, D : ndarrays
+        The (reduced) circuit matrices.
+    x0 : ndarray
+        The solution at ``tstart``.
+    breakpoints : array-like
+        The breakpoints of the sources, in ``]tstart, tstop[``, see
+        :func:`ahkab.transient.get_breakpoints`.
+    output_times : array-like, optional
+        The sorted times at which the solution is to be computed. Defaults to
+        every ``tstep`` and the breakpoints.
+    verbose : int, optional
+        The verbosity level.
+
+    **Yields:**
+
+    points : list
+        The new results, as ``(t, x)`` tuples, after every step.
+
+    :raises ValueError: if the circuit equations are of index higher than
+        one, see :class:`ReducedDAE`.
+    """
+    dae = ReducedDAE(mna, D)
+    r = dae.size
+    printing.print_info_line(("Dynamic variables: %d" % (r,), 5), verbose)
+    steps = np.concatenate(([tstart], breakpoints, [tstop]))
+    if output_times is None:
+        output_times = _subdivide(steps, tstep)[1:]
+    else:
+        output_times = np.asarray(output_times, dtype=float)
+        output_times = output_times[output_times > tstart]
+    if not is_piecewise_linear(circ):
+        steps = _subdivide(steps, tstep)
+    printing.print_info_line(("Exponential integrator steps: %d" % (len(steps) - 1,), 3),
+                             verbose)
+    Ns = N + get_source_vectors(circ, steps, mna.shape[0])
+    y = dae.get_y(x0)
+    out_index = 0
+    for i in range(len(steps) - 1):
+        ta, tb = steps[i], steps[i + 1]
+        h = tb - ta
+        # on ]ta, tb]: dy/dt = A y + b0 + b1 (t - ta), augmented to
+        # dz/dt = M z with z = [y, t - ta, 1]
+        dN = (Ns[:, i + 1:i + 2] - Ns[:, i:i + 1])/h
+        M = dae.get_augmented_matrix(dae.get_input(dN), dae.get_input(Ns[:, i]))
+        z = np.concatenate((y, [0., 1.]))
+        last = out_index
+        while last < len(output_times) and output_times[last] <= tb:
+            last += 1
+        taus = output_times[out_index:last] - ta
+        n_out = len(taus)
+        if not n_out or taus[-1] < h:
+            taus = np.concatenate((taus, [h]))
+        zs = _advance(M, z, taus)
+        points = []
+        for tau, zk in zip(taus[:n_out], zs[:n_out]):
+            x = dae.get_x(zk[:r], Ns[:, i:i + 1] + dN*tau)
+            points.append((ta + tau, x))
+        out_index = last
+        y = zs[-1][:r]
+        yield points
+
+
+def _subdivide(times, tstep):
+    # split each interval in equal parts no longer than tstep
+    ret = [times[:1]]
+    for ta, tb in zip(times[:-1], times[1:]):
+        m = max(int(np.ceil((tb - ta)/tstep*(1 - 1e-9))), 1)
+        ret.append(np.linspace(ta, tb, m + 1)[1:])
+    return np.concatenate(ret)
+
+
+def _advance(M, z, taus):
+    # the solution of dz/dt = M z, z(0) = z, at the (increasing) times taus
+    steps = np.diff(np.concatenate(([0.], taus)))
+    if len(taus) > 1 and np.allclose(steps, steps[0], rtol=1e-9, atol=0):
+        return expm_multiply(M, z, start=0, stop=taus[-1], num=len(taus) + 1,
+                             endpoint=True)[1:]
+    zs = []
+    for step in steps:
+        z = expm_multiply(step*M, z) if step > 0 else z
+        zs.append(z)
+    return zs
@@ -220,7 +220,9 @@ def spicefft(label, tran_results, freq=None, **args):
     :func:`ahkab.fourier.fourier` function.
 
     The function uses a variable amount of time data, resampled with a fixed
-    time step.
+    time step. If the transient results were already written on the same
+    time grid (see the ``output_times`` parameter of
+    :func:`ahkab.ahkab.new_tran`), they are used as they are.
     The time interval is specified through the ``start`` and ``stop``
     parameters, if they are not set, all the available data is used.
 
@@ -393,8 +395,16 @@ def spicefft(label, tran_results, freq=None, **args):
     else:
         sampling = (stop-start)/np2
         t = np.linspace(start, stop, np2, endpoint=False)
-    idata = InterpolatedUnivariateSpline(tran_results.get_x(),
-                                         data, k=2)
+    tdata = tran_results.get_x()
+    on_grid = np.logical_and(tdata >= t[0] - sampling*1e-6,
+                             tdata < stop - sampling*1e-6)
+    if on_grid.sum() == len(t) and \
+       np.allclose(tdata[on_grid], t, rtol=0, atol=sampling*1e-6):
+        # the data was written on the FFT time grid (see the output_times
+        # option of the transient analysis), no need to resample it.
+        sampled = data[on_grid]
+    else:
+        sampled = InterpolatedUnivariateSpline(tdata, data, k=2)(t)
     window = {options.RECT_WINDOW: lambda x: 1.,
               options.BART_WINDOW: bartlett,
               options.HANN_WINDOW: hann,
@@ -405,7 +415,7 @@ def spicefft(label, tran_results, freq=None, **args):
               options.KAISER_WINDOW: lambda x: kaiser(x, beta=alpha)}
     f = fft.fftfreq(len(t), sampling)
     f = f[:len(f)/2]
-    F = fft.rfft(idata(t)*window[window_type](len(t)))[:-1]
+    F = fft.rfft(sampled*window[window_type](len(t)))[:-1]
     if freq:
         # downsample
         f = f[::nperiods]
@@ -82,10 +82,10 @@
 from __future__ import (unicode_literals, absolute_import,
                         division, print_function)
 
-import numpy as np
 import sys
+from math import factorial
 
-from scipy.misc import factorial
+import numpy as np
 
 from . import printing
 
@@ -113,6 +113,11 @@ def get_required_values():
 
     The first array has to be used if no prediction is required, the second are the values needed for prediction.
     """
+    return get_required_values_order(order)
+
+
+def get_required_values_order(order):
+    """Same as get_required_values(), with the order given explicitly."""
     # notice that: it returns the same values, it should be order-1 if no prediction is required BUT
     # we build the required values in a (hopefully) fast way, that requires
     # one point more.
@@ -146,6 +151,20 @@ def get_df(pv_array, suggested_step, predict=False):
             "You must set Gear's order before using it! e.g. gear.order = 5")
         sys.exit(1)
 
+    return get_df_order(pv_array, suggested_step, order, predict)
+
+
+def get_df_order(pv_array, suggested_step, order, predict=False):
+    """Same as get_df(), with the order given explicitly.
+
+    The module-level ``order`` is not used nor modified: :mod:`ahkab.transient`
+    keeps the order of the analysis, which changes from step to step with
+    the variable-order method, and calls this function. The LTE coefficient
+    is returned even if predict == False.
+
+    pv_array has to hold at least order+1 points if predict == True,
+    order points otherwise."""
+
     s = []
     s.append(0)
     for index in range(1, order + 2):
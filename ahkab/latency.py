@@ -0,0 +1,188 @@
+# -*- coding: iso-8859-1 -*-
+# latency.py
+# Latency exploitation for the nonlinear elements
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Latency exploitation for the nonlinear elements.
+
+In large circuits, most sub-circuits are idle at any given time. Their
+nonlinear elements are evaluated nonetheless at every Newton iteration of
+every time step, which is where most of the time goes.
+
+The nonlinear elements are grouped in partitions, see
+:func:`get_partitions`. Every time the Jacobian is built, a partition whose
+node voltages moved less than ``options.transient_latency_vtol`` since its
+last evaluation is *latent*: its evaluation is bypassed and its last
+conductance stamp is reused, while its currents are extrapolated linearly.
+As soon as any of its node voltages moves further, the partition is
+evaluated again.
+
+This is enabled in transient analyses by ``options.transient_use_latency``.
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import numpy as np
+import scipy.sparse
+
+from . import circuit
+from . import dc_analysis
+from . import options
+from . import switch
+
+
+def get_partitions(circ):
+    """Group the nonlinear elements of a circuit in partitions.
+
+    The elements of a subcircuit instance form a partition, the ones at the
+    top level are grouped in the sets connected to each other through their
+    terminals (ground excluded).
+
+    Switches, whose state depends on their history, and time-dependent
+    elements are not returned, they always need to be evaluated.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit.
+
+    **Returns:**
+
+    partitions : list of lists
+        The elements of each partition.
+    """
+    partitions = {}
+    top = []
+    for elem in circ:
+        if not elem.is_nonlinear or _needs_evaluation(elem):
+            continue
+        label = circuit.get_subckt_instance(elem)
+        if label is not None:
+            partitions.setdefault(label, []).append(elem)
+        else:
+            top.append(elem)
+    # connected components of the top level elements
+    parent = {}
+    def find(n):
+        while parent.setdefault(n, n) != n:
+            n = parent[n]
+        return n
+    for elem in top:
+        nodes = _get_nodes(elem)
+        for n in nodes[1:]:
+            parent[find(n)] = find(nodes[0])
+    for elem in top:
+        nodes = _get_nodes(elem)
+        key = ('top', find(nodes[0]) if nodes else elem.part_id)
+        partitions.setdefault(key, []).append(elem)
+    return list(partitions.values())
+
+
+class LatencyBypass(object):
+    """Build the nonlinear contributions to the Jacobian, bypassing the
+    evaluation of the latent partitions.
+
+    An instance holds the last stamps of each partition, it is meant to be
+    used for all the time steps of an analysis.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit.
+    vtol : float, optional
+        The voltage tolerance, defaults to
+        ``options.transient_latency_vtol``.
+    """
+    def __init__(self, circ, vtol=None):
+        self.vtol = vtol if vtol is not None else options.transient_latency_vtol
+        self.partitions = []
+        for elems in get_partitions(circ):
+            nodes = sorted(set(n for elem in elems for n in _get_nodes(elem)))
+            self.partitions.append({'elems': elems,
+                                    'index': np.array(nodes, dtype=int) - 1,
+                                    'v': None, 'G': None, 'i': None})
+        self.always = [elem for elem in circ
+                       if elem.is_nonlinear and _needs_evaluation(elem)]
+        self._J = None
+        self._Tx = None
+        #: number of partition evaluations performed and bypassed
+        self.evaluated = 0
+        self.bypassed = 0
+
+    def update_J_and_Tx(self, J, Tx, x, time):
+        """Add the nonlinear contributions to ``J`` and ``Tx``.
+
+        **Parameters:**
+
+        J : ndarray or sparse matrix
+            The Jacobian of :math:`T(x)`, updated in place.
+        Tx : ndarray
+            The vector :math:`T(x)`, updated in place.
+        x : ndarray
+            The current solution estimate.
+        time : float or None
+            The current time.
+        """
+        for elem in self.always:
+            dc_analysis._update_J_and_Tx(J, Tx, x, elem, time)
+        if self._J is None or self._J.shape != J.shape:
+            # scratch space, zero outside of the partitions being evaluated
+            if scipy.sparse.issparse(J):
+                self._J = scipy.sparse.lil_matrix(J.shape)
+            else:
+                self._J = np.zeros(J.shape)
+            self._Tx = np.zeros(Tx.shape)
+        for p in self.partitions:
+            index = p['index']
+            ix = np.ix_(index, index)
+            v = x[index, 0]
+            if p['v'] is not None and np.all(abs(v - p['v']) <= self.vtol):
+                self.bypassed += 1
+            else:
+                for elem in p['elems']:
+                    dc_analysis._update_J_and_Tx(self._J, self._Tx, x, elem, time)
+                p['v'] = v.copy()
+                p['G'] = self._to_array(self._J[ix])
+                p['i'] = self._Tx[index, 0].copy()
+                self._J[ix] = 0.
+                self._Tx[index, 0] = 0.
+                self.evaluated += 1
+            J[ix] = J[ix] + p['G']
+            Tx[index, 0] += p['i'] + p['G'].dot(v - p['v'])
+
+    @staticmethod
+    def _to_array(m):
+        return m.toarray() if hasattr(m, 'toarray') else np.array(m)
+
+
+def _needs_evaluation(elem):
+    return isinstance(elem, switch.switch_device) or \
+           getattr(elem, 'is_timedependent', False)
+
+
+def _get_nodes(elem):
+    # the (non-ground) nodes an element drives or is driven by
+    nodes = set()
+    for index, port in enumerate(elem.get_output_ports()):
+        nodes.update(port)
+        for dport in elem.get_drive_ports(index):
+            nodes.update(dport)
+    nodes.discard(0)
+    return sorted(nodes)
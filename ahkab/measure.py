@@ -0,0 +1,474 @@
+# -*- coding: iso-8859-1 -*-
+# measure.py
+# Measurements evaluated while the analyses run
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measurements evaluated while the analyses run.
+
+A measurement extracts a scalar value, such as the rise time or the RMS value
+of a waveform, from the results of a TRAN, DC or AC analysis. Measurements
+are updated every time a new point is added to the results set, so they do
+not need the whole waveform to be stored and read back.
+
+The waveform is assumed to be linear between consecutive points. In AC
+analyses, the magnitude of the variables is used.
+
+Measurements are instantiated in a netlist with the ``.MEASURE`` directive,
+see :func:`ahkab.netlist_parser.parse_measures`, or directly, as in::
+
+    trise = ahkab.measure.RiseTime('trise', 'V(out)', low=.1, high=.9)
+    tran = ahkab.new_tran(0, 1e-3, 1e-6, measures=[trise])
+    r = ahkab.run(mycircuit, tran)
+    print(r['tran'].measures['trise'])
+
+Available measurements
+----------------------
+
+.. autosummary::
+    Average
+    RMS
+    Integral
+    Minimum
+    Maximum
+    PeakToPeak
+    When
+    RiseTime
+    FallTime
+    Delay
+
+All measurements accept the optional ``start`` and ``stop`` parameters
+(``from`` and ``to`` in a netlist), restricting the measurement to a window
+of the independent variable (time, sweep value or frequency).
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import math
+
+import numpy as np
+
+from . import results
+
+
+class Measure(object):
+    """Base class for the measurements.
+
+    Subclasses implement :func:`_segment`, which is called with every
+    new segment of the waveform within the measurement window.
+
+    **Parameters:**
+
+    name : str
+        The measurement label.
+    variables : tuple of str
+        The variables to be measured, eg. ``('V(out)',)``.
+    start : float, optional
+        The beginning of the measurement window. Defaults to ``None``, no
+        limit.
+    stop : float, optional
+        The end of the measurement window. Defaults to ``None``, no limit.
+    """
+    def __init__(self, name, variables, start=None, stop=None):
+        self.name = name
+        self.variables = tuple(variables)
+        self.start = start
+        self.stop = stop
+        #: The measured value, ``None`` until it is available.
+        self.value = None
+        self._rows = None
+        self._last = None
+
+    def bind(self, variables):
+        """Find the measured variables among the unknowns of the circuit.
+
+        **Parameters:**
+
+        variables : list of str
+            The names of the unknowns, in the order of the solution vector.
+
+        :raises ValueError: if a variable is not found.
+        """
+        self._rows = []
+        for var in self.variables:
+            for i, varname in enumerate(variables):
+                if results.match_saved_variable(varname, [var]):
+                    self._rows.append(i)
+                    break
+            else:
+                raise ValueError("Measure %s: unknown variable %s" %
+                                 (self.name, var))
+        self.value = None
+        self._last = None
+
+    def update(self, x, sol):
+        """Update the measurement with a new point.
+
+        **Parameters:**
+
+        x : float
+            The value of the independent variable, eg. the time.
+        sol : ndarray
+            The solution vector at ``x``.
+        """
+        if np.iscomplexobj(sol):
+            values = [abs(sol[i, 0]) for i in self._rows]
+        else:
+            values = [float(sol[i, 0]) for i in self._rows]
+        if self._last is None:
+            if self._in_window(x):
+                self._segment(x, values, x, values)
+        else:
+            x0, values0 = self._last
+            self._clipped_segment(x0, values0, x, values)
+        self._last = (x, values)
+
+    def get_state(self):
+        """Get the state of the measurement, that is its value and the
+        quantities accumulated so far.
+
+        The state is saved in the checkpoints of the transient analysis and
+        restored with :func:`set_state`.
+
+        **Returns:**
+
+        state : dict
+            The state of the measurement.
+        """
+        return dict((k, v) for k, v in self.__dict__.items()
+                    if k == 'value' or k.startswith('_'))
+
+    def set_state(self, state):
+        """Restore the state saved by :func:`get_state`."""
+        self.__dict__.update(state)
+
+    def _in_window(self, x):
+        return (self.start is None or x >= self.start) and \
+               (self.stop is None or x <= self.stop)
+
+    def _clipped_segment(self, x0, values0, x1, values1):
+        """Clip the segment to the measurement window."""
+        a, b = x0, x1
+        if self.start is not None:
+            a = max(a, self.start)
+        if self.stop is not None:
+            b = min(b, self.stop)
+        if a > b or x1 <= x0:
+            return
+        va = _interpolate(a, x0, values0, x1, values1)
+        vb = _interpolate(b, x0, values0, x1, values1)
+        self._segment(a, va, b, vb)
+
+    def _segment(self, x0, values0, x1, values1):
+        raise NotImplementedError
+
+    def __str__(self):
+        return "%s = %s" % (self.name, "not found" if self.value is None
+                            else "%g" % self.value)
+
+
+class Average(Measure):
+    """Average value of a variable."""
+    def __init__(self, name, variable, start=None, stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+        self._integral = 0.
+        self._span = 0.
+
+    def bind(self, variables):
+        Measure.bind(self, variables)
+        self._integral, self._span = 0., 0.
+
+    def _segment(self, x0, values0, x1, values1):
+        self._integral += (x1 - x0)*(values0[0] + values1[0])/2.
+        self._span += x1 - x0
+        if self._span > 0:
+            self.value = self._integral/self._span
+        else:
+            self.value = values1[0]
+
+
+class RMS(Measure):
+    """Root mean square value of a variable."""
+    def __init__(self, name, variable, start=None, stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+        self._integral = 0.
+        self._span = 0.
+
+    def bind(self, variables):
+        Measure.bind(self, variables)
+        self._integral, self._span = 0., 0.
+
+    def _segment(self, x0, values0, x1, values1):
+        va, vb = values0[0], values1[0]
+        # exact for a piecewise-linear waveform
+        self._integral += (x1 - x0)*(va**2 + va*vb + vb**2)/3.
+        self._span += x1 - x0
+        if self._span > 0:
+            self.value = math.sqrt(self._integral/self._span)
+        else:
+            self.value = abs(vb)
+
+
+class Integral(Measure):
+    """Integral of a variable."""
+    def __init__(self, name, variable, start=None, stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+
+    def _segment(self, x0, values0, x1, values1):
+        if self.value is None:
+            self.value = 0.
+        self.value += (x1 - x0)*(values0[0] + values1[0])/2.
+
+
+class Minimum(Measure):
+    """Minimum value of a variable."""
+    def __init__(self, name, variable, start=None, stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+
+    def _segment(self, x0, values0, x1, values1):
+        v = min(values0[0], values1[0])
+        if self.value is None or v < self.value:
+            self.value = v
+
+
+class Maximum(Measure):
+    """Maximum value of a variable."""
+    def __init__(self, name, variable, start=None, stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+
+    def _segment(self, x0, values0, x1, values1):
+        v = max(values0[0], values1[0])
+        if self.value is None or v > self.value:
+            self.value = v
+
+
+class PeakToPeak(Measure):
+    """Difference between the maximum and the minimum of a variable."""
+    def __init__(self, name, variable, start=None, stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+        self._min, self._max = None, None
+
+    def bind(self, variables):
+        Measure.bind(self, variables)
+        self._min, self._max = None, None
+
+    def _segment(self, x0, values0, x1, values1):
+        vmin, vmax = min(values0[0], values1[0]), max(values0[0], values1[0])
+        if self._min is None or vmin < self._min:
+            self._min = vmin
+        if self._max is None or vmax > self._max:
+            self._max = vmax
+        self.value = self._max - self._min
+
+
+class When(Measure):
+    """Value of the independent variable when a variable crosses a threshold.
+
+    **Parameters:**
+
+    name : str
+        The measurement label.
+    variable : str
+        The variable to be measured.
+    val : float
+        The threshold.
+    edge : str, optional
+        ``'rise'``, ``'fall'`` or ``'cross'`` (default), for rising, falling
+        or any crossing.
+    n : int, optional
+        Measure the ``n``-th crossing, defaults to ``1``.
+    start, stop : float, optional
+        The measurement window.
+    """
+    def __init__(self, name, variable, val, edge='cross', n=1, start=None,
+                 stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+        self.val = val
+        self.edge = _check_edge(edge)
+        self.n = int(n)
+        self._count = 0
+
+    def bind(self, variables):
+        Measure.bind(self, variables)
+        self._count = 0
+
+    def _segment(self, x0, values0, x1, values1):
+        if self.value is not None:
+            return
+        xc = _crossing(x0, values0[0], x1, values1[0], self.val, self.edge)
+        if xc is not None:
+            self._count += 1
+            if self._count == self.n:
+                self.value = xc
+
+
+class RiseTime(Measure):
+    """Rise time of a variable between two levels.
+
+    The rise time is the interval between the variable rising above
+    ``low`` and rising above ``high``, without falling back below ``low`` in
+    between.
+
+    **Parameters:**
+
+    name : str
+        The measurement label.
+    variable : str
+        The variable to be measured.
+    low, high : float
+        The levels, eg. 10% and 90% of the swing.
+    n : int, optional
+        Measure the ``n``-th edge, defaults to ``1``.
+    start, stop : float, optional
+        The measurement window.
+    """
+    _edge = 'rise'
+
+    def __init__(self, name, variable, low, high, n=1, start=None, stop=None):
+        Measure.__init__(self, name, (variable,), start, stop)
+        if self._edge == 'rise':
+            self._first, self._second = low, high
+        else:
+            self._first, self._second = high, low
+        self.n = int(n)
+        self._count = 0
+        self._x_first = None
+
+    def bind(self, variables):
+        Measure.bind(self, variables)
+        self._count = 0
+        self._x_first = None
+
+    def _segment(self, x0, values0, x1, values1):
+        if self.value is not None:
+            return
+        other_edge = 'fall' if self._edge == 'rise' else 'rise'
+        xa = _crossing(x0, values0[0], x1, values1[0], self._first, self._edge)
+        xb = _crossing(x0, values0[0], x1, values1[0], self._first, other_edge)
+        if xb is not None and self._x_first is not None:
+            # back across the first level: start over
+            self._x_first = None
+        if xa is not None:
+            self._x_first = xa
+        xc = _crossing(x0, values0[0], x1, values1[0], self._second, self._edge)
+        if xc is not None and self._x_first is not None:
+            self._count += 1
+            if self._count == self.n:
+                self.value = xc - self._x_first
+            self._x_first = None
+
+
+class FallTime(RiseTime):
+    """Fall time of a variable between two levels.
+
+    The fall time is the interval between the variable falling below
+    ``high`` and falling below ``low``, without rising back above ``high``
+    in between. The parameters are the same as in :class:`RiseTime`.
+    """
+    _edge = 'fall'
+
+
+class Delay(Measure):
+    """Delay between the crossings of a threshold by two variables.
+
+    The delay is measured from the ``n``-th crossing of the threshold by the
+    trigger variable to the next crossing by the target variable.
+
+    **Parameters:**
+
+    name : str
+        The measurement label.
+    trig : str
+        The trigger variable, eg. the input.
+    targ : str
+        The target variable, eg. the output.
+    val : float
+        The threshold.
+    edge : str, optional
+        ``'rise'``, ``'fall'`` or ``'cross'`` (default), applied to both
+        variables.
+    n : int, optional
+        Measure from the ``n``-th crossing of the trigger, defaults to ``1``.
+    targ_val : float, optional
+        A different threshold for the target variable.
+    targ_edge : str, optional
+        A different edge type for the target variable.
+    start, stop : float, optional
+        The measurement window.
+    """
+    def __init__(self, name, trig, targ, val, edge='cross', n=1,
+                 targ_val=None, targ_edge=None, start=None, stop=None):
+        Measure.__init__(self, name, (trig, targ), start, stop)
+        self.val = val
+        self.edge = _check_edge(edge)
+        self.n = int(n)
+        self.targ_val = targ_val if targ_val is not None else val
+        self.targ_edge = _check_edge(targ_edge) if targ_edge is not None \
+                         else self.edge
+        self._count = 0
+        self._x_trig = None
+
+    def bind(self, variables):
+        Measure.bind(self, variables)
+        self._count = 0
+        self._x_trig = None
+
+    def _segment(self, x0, values0, x1, values1):
+        if self.value is not None:
+            return
+        if self._x_trig is None:
+            xc = _crossing(x0, values0[0], x1, values1[0], self.val, self.edge)
+            if xc is not None:
+                self._count += 1
+                if self._count == self.n:
+                    self._x_trig = xc
+        if self._x_trig is not None:
+            xc = _crossing(x0, values0[1], x1, values1[1], self.targ_val,
+                           self.targ_edge)
+            if xc is not None and xc >= self._x_trig:
+                self.value = xc - self._x_trig
+
+
+#: The measurements available in the netlist ``.MEASURE`` directive.
+kinds = {'avg': Average, 'rms': RMS, 'integ': Integral, 'min': Minimum,
+         'max': Maximum, 'pp': PeakToPeak, 'when': When, 'rise': RiseTime,
+         'fall': FallTime, 'delay': Delay}
+
+
+def _check_edge(edge):
+    edge = edge.lower()
+    if edge not in ('rise', 'fall', 'cross'):
+        raise ValueError("Unknown edge type %s, use rise, fall or cross." %
+                         edge)
+    return edge
+
+
+def _interpolate(x, x0, values0, x1, values1):
+    if x1 == x0:
+        return values1
+    s = (x - x0)/(x1 - x0)
+    return [v0 + s*(v1 - v0) for v0, v1 in zip(values0, values1)]
+
+
+def _crossing(x0, v0, x1, v1, val, edge):
+    """Locate the crossing of ``val`` in the segment, if any."""
+    if v0 < val <= v1 and edge in ('rise', 'cross') or \
+       v0 > val >= v1 and edge in ('fall', 'cross'):
+        return x0 + (val - v0)*(x1 - x0)/(v1 - v0)
+    return None
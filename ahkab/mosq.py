@@ -72,6 +72,9 @@ AKP_DEFAULT = 1.8e-2 * 1e-6
 TCV_DEFAULT = 1e-3
 BEX_DEFAULT = -1.5
 
+KF_DEFAULT = 0. # flicker noise coefficient
+AF_DEFAULT = 1. # flicker noise exponent
+
 ISMALL_GUESS_MIN = 1e-10
 
 
@@ -432,7 +435,8 @@ class mosq_mos_model(object):
     def __init__(self, name=None, TYPE='n', TNOM=None, COX=None,
                  GAMMA=None, NSUB=None, PHI=None, VTO=None, KP=None,
                  LAMBDA=None, AKP=None, AVT=None,
-                 TOX=None, VFB=None, U0=None, TCV=None, BEX=None):
+                 TOX=None, VFB=None, U0=None, TCV=None, BEX=None,
+                 KF=None, AF=None):
 
         self.name = "model_mosq0" if name is None else name
         self.TNOM = float(TNOM) if TNOM is not None else constants.Tref
@@ -498,6 +502,10 @@ class mosq_mos_model(object):
         self.AVT = AVT if AVT is not None else AVT_DEFAULT
         self.AKP = AKP if AKP is not None else AKP_DEFAULT
 
+        # Noise
+        self.KF = float(KF) if KF is not None else KF_DEFAULT
+        self.AF = float(AF) if AF is not None else AF_DEFAULT
+
         self.set_device_temperature(constants.T)
 
         sc, sc_reason = self._self_check()
@@ -547,6 +555,8 @@ class mosq_mos_model(object):
                     "NSUB", "[cm^-3]", self.NSUB,  "VFB", "[V]:", self.VFB])
         arr.append(["U0", "[cm^2/(V*s)]:", self.U0, "TCV", "[V/K]", self.TCV,
                     "BEX", "", self.BEX,  "", "", ""])
+        arr.append(["KF", "", self.KF, "AF", "", self.AF,
+                    "", "", "", "", "", ""])
         print(printing.table(arr))
 
     def get_voltages(self, vds, vgs, vbs):
@@ -70,6 +70,8 @@ Function for parsing
     parse_time_function
     parse_postproc
     parse_ics
+    parse_saves
+    parse_measures
     parse_analysis
     parse_single_analysis
     parse_temp_directive
@@ -120,6 +122,7 @@ from . import printing
 from . import utilities
 from . import plotting
 from . import options
+from . import measure
 
 # analyses syntax
 from .dc_analysis import specs as dc_spec
@@ -128,6 +131,9 @@ from .transient import specs as tran_spec
 from .pss import specs as pss_spec
 from .py3compat import StringIO
 from .pz import specs as pz_specs
+from .noise import specs as noise_specs
+from .tf import specs as tf_specs
+from .sens import specs as sens_specs
 from .symbolic import specs as symbolic_spec
 from .time_functions import time_fun_specs
 from .time_functions import sin, pulse, exp, sffm, am
@@ -135,7 +141,8 @@ from .time_functions import sin, pulse, exp, sffm, am
 from .fourier import specs as fft_specs
 
 specs = {}
-for i in dc_spec, ac_spec, tran_spec, pss_spec, symbolic_spec, pz_specs:
+for i in dc_spec, ac_spec, tran_spec, pss_spec, symbolic_spec, pz_specs, \
+         noise_specs, tf_specs, sens_specs:
     specs.update(i)
 
 time_functions = {}
@@ -1425,6 +1432,110 @@ def parse_ics(directives):
     return ics
 
 
+def parse_saves(directives):
+    """Parses the ``.save`` directives.
+
+    The syntax is::
+
+        .SAVE <VAR1> [<VAR2> ...]
+
+    Where each variable is either a node voltage, ``V(<node>)``, or a
+    current, ``I(<element>)``. Shell-style wildcards are allowed.
+
+    **Parameters:**
+
+    directives: list of tuples
+        The list should be assembled as ``(line, line_number)``, as returned
+        by ``parse_circuit()``.
+
+    **Returns:**
+
+    save : list of strings or None
+        All the variables selected by the ``.save`` directives, ``None`` if
+        no ``.save`` directive was found.
+    """
+    save = None
+    for line, line_n in directives:
+        line_elements = line.split()
+        if line_elements[0] != '.save':
+            continue
+        variables = []
+        for token in line_elements[1:]:
+            if token[0] == "*":
+                break
+            variables.append(token)
+        if not len(variables):
+            printing.print_parse_error(line_n, line)
+            raise NetlistParseError(".SAVE directive without variables.")
+        save = (save or []) + variables
+    return save
+
+
+def parse_measures(directives):
+    """Parses the ``.measure`` directives.
+
+    The syntax is::
+
+        .MEASURE <AN> <LABEL> <KIND> <VAR1> [<VAR2>] [<PARAM>=<VALUE> ...]
+
+    Where ``<AN>`` is the analysis type (``tran``, ``dc`` or ``ac``),
+    ``<LABEL>`` the measurement label and ``<KIND>`` one of ``avg``, ``rms``,
+    ``integ``, ``min``, ``max``, ``pp``, ``when``, ``rise``, ``fall`` and
+    ``delay``. The parameters are those of the corresponding class in
+    :mod:`ahkab.measure`, with ``from`` and ``to`` setting the measurement
+    window. ``.MEAS`` is accepted as well.
+
+    **Parameters:**
+
+    directives: list of tuples
+        The list should be assembled as ``(line, line_number)``, as returned
+        by ``parse_circuit()``.
+
+    **Returns:**
+
+    measures : dict
+        The lists of measurements, with the analysis types as keys.
+    """
+    measures = {}
+    for line, line_n in directives:
+        line_elements = line.split()
+        if line_elements[0] not in ('.measure', '.meas'):
+            continue
+        try:
+            if len(line_elements) < 5:
+                raise NetlistParseError("Incomplete .MEASURE directive.")
+            an_type, label, kind = line_elements[1:4]
+            if an_type not in ('tran', 'dc', 'ac'):
+                raise NetlistParseError(".MEASURE is unsupported for " +
+                                        "analysis type %s." % an_type)
+            if kind not in measure.kinds:
+                raise NetlistParseError("Unknown measurement %s." % kind)
+            variables, params = [], {}
+            for token in line_elements[4:]:
+                if token[0] == "*":
+                    break
+                if is_valid_value_param_string(token):
+                    param, value = token.split('=')
+                    param = {'from': 'start', 'to': 'stop'}.get(param, param)
+                    if param in ('edge', 'targ_edge'):
+                        params[param] = value
+                    else:
+                        params[param] = convert_units(value)
+                else:
+                    variables.append(token)
+            try:
+                m = measure.kinds[kind](label, *variables, **params)
+            except (TypeError, ValueError) as e:
+                raise NetlistParseError("Wrong .MEASURE parameters: %s" % e)
+        except NetlistParseError as npe:
+            (msg,) = npe.args
+            printing.print_general_error(msg)
+            printing.print_parse_error(line_n, line)
+            raise
+        measures.setdefault(an_type, []).append(m)
+    return measures
+
+
 def parse_analysis(circ, directives):
     """Parses the analyses.
 
@@ -1446,6 +1557,8 @@ def parse_analysis(circ, directives):
         if line[0] != '.' or line[:3] == '.ic':
             continue
         line_elements = line.split()
+        if line_elements[0] in ('.save', '.measure', '.meas'):
+            continue
         an += [parse_single_analysis(line)]
     return an
 
@@ -0,0 +1,335 @@
+# -*- coding: iso-8859-1 -*-
+# noise.py
+# Noise analysis module
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the methods required to perform a small-signal noise
+analysis.
+
+.. note::
+
+    Typically, the user does not need to call the functions in this module
+    directly, instead, we recommend defining a noise analysis object through
+    the convenience method :func:`ahkab.ahkab.new_noise` and then running it
+    calling :func:`ahkab.ahkab.run`.
+
+The noise sources
+-----------------
+
+Every noise source is a current source, in parallel to the element that
+generates it, with a power spectral density (PSD), in
+:math:`\\mathrm{A^2/Hz}`:
+
+* resistors: thermal noise, :math:`4 k T / R`,
+* diodes: shot noise, :math:`2 q |I_D|`, and flicker noise,
+  :math:`K_F |I_D|^{A_F} / f^{F_{FE}}`,
+* MOS transistors: channel thermal noise, :math:`\\frac{8}{3} k T g_m`,
+  and, for the square-law model, flicker noise,
+  :math:`K_F |I_{DS}|^{A_F} / (C_{ox} L^2 f)`.
+
+The bias currents and the transconductances are those of the Operating
+Point (OP) the circuit is linearized around. The noise sources are
+uncorrelated.
+
+The adjoint method
+------------------
+
+The circuit is linearized as in an AC analysis, see :mod:`ahkab.ac`: at the
+angular frequency :math:`\\omega`, a noise current injected between the
+nodes :math:`n_1` and :math:`n_2` gives the output voltage
+:math:`v_o = c^T A(\\omega)^{-1} e`, where
+:math:`A(\\omega) = MNA + J + j \\omega AC`, :math:`e` is the incidence
+vector of the source and :math:`c` selects the output nodes.
+
+Instead of solving the circuit once for each noise source, the transposed
+-- adjoint -- system
+
+.. math::
+
+    A(\\omega)^T y = c
+
+is solved once per frequency: the transfer from every noise source to the
+output is then simply :math:`y^T e = y_{n_1} - y_{n_2}`, and the output
+noise PSD is
+
+.. math::
+
+    S_o(f) = \\sum_k |y^T e_k|^2 S_k(f).
+
+If an input source is given, the same solution gives its gain to the
+output, :math:`H`, and the input-referred noise,
+:math:`S_i(f) = S_o(f) / |H|^2`.
+
+Module reference
+----------------
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import functools
+
+import numpy as np
+
+from . import ac
+from . import components
+from . import constants
+from . import diode
+from . import ekv
+from . import mosq
+from . import options
+from . import printing
+from . import results
+from . import tf
+from . import utilities
+
+specs = {'noise': {'tokens': ({
+                              'label': 'output',
+                              'pos': 0,
+                              'type': str,
+                              'needed': True,
+                              'dest': 'output',
+                              'default': None
+                              },
+                              {
+                              'label': 'source',
+                              'pos': 1,
+                              'type': str,
+                              'needed': False,
+                              'dest': 'source',
+                              'default': None
+                              },
+                              {
+                              'label': 'type',
+                              'pos': 2,
+                              'type': str,
+                              'needed': False,
+                              'dest': 'sweep_type',
+                              'default': options.ac_log_step
+                              },
+                              {
+                              'label': 'nsteps',
+                              'pos': 3,
+                              'type': float,
+                              'needed': True,
+                              'dest': 'points',
+                              'default': None
+                              },
+                              {
+                              'label': 'start',
+                              'pos': 4,
+                              'type': float,
+                              'needed': True,
+                              'dest': 'start',
+                              'default': None
+                              },
+                              {
+                              'label': 'stop',
+                              'pos': 5,
+                              'type': float,
+                              'needed': True,
+                              'dest': 'stop',
+                              'default': None
+                              })
+                  }
+         }
+
+
+def noise_analysis(circ, output, start, points, stop, source=None,
+                   sweep_type=None, x0=None, outfile="stdout", verbose=3):
+    """Performs a noise analysis.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit to be simulated.
+
+    output : string or tuple of strings
+        The output port, either a node, referred to ground, or a tuple of
+        two nodes, eg. ``'out'`` or ``('outp', 'outn')``. The netlist
+        syntax, ``'V(outp,outn)'``, is accepted as well, see
+        :func:`ahkab.tf.get_output_port`.
+
+    start : float
+        The start frequency, in Hz.
+
+    points : float
+        The number of points to be used to discretize the
+        ``[start, stop]`` interval.
+
+    stop : float
+        The stop frequency, in Hz.
+
+    source : string, optional
+        The ``part_id`` of the independent voltage or current source the
+        noise is referred to. If not set, only the output noise is computed.
+
+    sweep_type : string, optional
+        Either ``options.ac_log_step`` (ie ``'LOG'``), the default, or
+        ``options.ac_lin_step`` (ie ``'LIN'``).
+
+    x0 : OP results instance, optional
+        The linearization point. If not set, it will be computed
+        running an OP analysis.
+
+    outfile : string, optional
+        The name of the file where the results will be written. Set to
+        ``'stdout'`` to write to the standard output.
+
+    verbose : int, optional
+        The verbosity level, from 0 (silent) to 6 (debug).
+
+    **Returns:**
+
+    sol : noise solution
+        The noise spectral densities, see
+        :class:`ahkab.results.noise_solution`.
+
+    :raises ValueError: if the parameters are out of their valid range.
+
+    :raises RuntimeError: if the circuit is non-linear and can't be
+        linearized.
+    """
+    if outfile == 'stdout':
+        verbose = 0
+    if start == 0:
+        raise ValueError("NOISE analysis has start frequency = 0")
+    if start > stop:
+        raise ValueError("NOISE analysis has start > stop")
+    if points < 2 and not start == stop:
+        raise ValueError("NOISE analysis has number of points < 2 & " +
+                         "start != stop")
+    if sweep_type is None or sweep_type.upper() == options.ac_log_step:
+        omega_iter = utilities.log_axis_iterator(2*np.pi*start, 2*np.pi*stop,
+                                                 points)
+    elif sweep_type.upper() == options.ac_lin_step:
+        omega_iter = utilities.lin_axis_iterator(2*np.pi*start, 2*np.pi*stop,
+                                                 points)
+    else:
+        raise ValueError("Unknown sweep type %s" % sweep_type)
+    if source is not None and \
+       not isinstance(circ.get_elem_by_name(source),
+                      (components.sources.VSource, components.sources.ISource)):
+        raise ValueError("The input source %s is not an independent source." %
+                         source)
+
+    printing.print_info_line(("Starting NOISE analysis: ", 1), verbose)
+    printing.print_info_line(("w: start = %g Hz, stop = %g Hz, %d points" %
+                              (start, stop, points), 3), verbose)
+
+    A0, AC, x0 = tf.get_linearized_system(circ, x0, verbose)
+    if x0 is not None:
+        xop = x0.asarray() if hasattr(x0, 'asarray') else x0
+    else:
+        xop = np.zeros((A0.shape[0], 1))
+
+    # the output selector and the incidence vectors of the noise sources
+    c = tf._get_output_vector(circ, output, A0.shape[0])
+    sources = get_noise_sources(circ, xop)
+    E = np.zeros((A0.shape[0], len(sources)))
+    for k, (_, n1, n2, _, _, _) in enumerate(sources):
+        if n1:
+            E[n1 - 1, k] += 1.
+        if n2:
+            E[n2 - 1, k] -= 1.
+    b = None
+    if source is not None:
+        part_ids, B = tf.get_source_vectors(circ, A0.shape[0])
+        index = [s.lower() for s in part_ids].index(source.lower())
+        b = B[:, index:index + 1]
+
+    sol = results.noise_solution(circ, start=start, stop=stop, points=points,
+                                 stype=sweep_type, op=x0, output=output,
+                                 source=source, sources=sources,
+                                 outfile=outfile)
+
+    printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
+    omegas = np.array(list(omega_iter))
+    # one adjoint solve per frequency, for all the sources at once
+    solve = functools.partial(ac._solve_block, A0, AC, -c, trans=True)
+    try:
+        for block, y in ac._solve_sweep(solve, None, omegas,
+                                        ac._get_block_size(A0.shape[0])):
+            f = block/np.pi/2
+            psd = np.array([white + flicker/f**ffe
+                            for _, _, _, white, flicker, ffe in sources])
+            contributions = abs(E.T.dot(y))**2*psd.reshape((len(sources), -1))
+            gain = abs(b.T.dot(y))[0, :] if b is not None else None
+            sol.add_lines(f, contributions, gain)
+    except np.linalg.LinAlgError as e:
+        printing.print_general_error(str(e))
+        printing.print_info_line(("failed.", 1), verbose)
+        return None
+    printing.print_info_line(("done.", 1), verbose)
+    return sol
+
+
+def get_noise_sources(circ, xop):
+    """Get the noise sources of a circuit, at an operating point.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    xop : ndarray
+        The operating point, as a column vector.
+
+    **Returns:**
+
+    sources : list of tuples
+        The noise current sources, as tuples of ``(part_id, n1, n2, white,
+        flicker, exponent)``: the PSD of each is
+        ``white + flicker/f**exponent``, in :math:`\\mathrm{A^2/Hz}`.
+    """
+    kT = constants.k*constants.T
+    sources = []
+    for elem in circ:
+        if isinstance(elem, components.Resistor):
+            sources.append((elem.part_id, elem.n1, elem.n2,
+                            4*kT*abs(elem.g), 0., 1.))
+        elif isinstance(elem, diode.diode):
+            i = abs(elem.i(0, _get_port_voltages(elem, 0, xop)))
+            model = elem.model
+            sources.append((elem.part_id, elem.n1, elem.n2,
+                            2*constants.e*i, model.KF*i**model.AF, model.FFE))
+        elif isinstance(elem, mosq.mosq_device):
+            ports_v = np.array(_get_port_voltages(elem, 0, xop))
+            elem.update_status_dictionary([ports_v])
+            i = abs(elem.opdict['Ids'])
+            model = elem.mosq_model
+            sources.append((elem.part_id, elem.n1, elem.n2,
+                            8./3*kT*abs(elem.opdict['gm']),
+                            model.KF*i**model.AF/(model.COX*elem.device.L**2),
+                            1.))
+        elif isinstance(elem, ekv.ekv_device):
+            ports_v = tuple(_get_port_voltages(elem, 0, xop))
+            elem.i(0, ports_v)  # the model caches the OP data in opdict
+            gm = elem.g(0, ports_v, 1)
+            sources.append((elem.part_id, elem.n1, elem.n2,
+                            8./3*kT*abs(gm), 0., 1.))
+    return sources
+
+
+def _get_port_voltages(elem, index, x):
+    # the voltages of the drive ports of the output port ``index``
+    v = []
+    for n1, n2 in elem.get_drive_ports(index):
+        v.append((x[n1 - 1, 0] if n1 else 0.) - (x[n2 - 1, 0] if n2 else 0.))
+    return v
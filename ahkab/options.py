@@ -128,6 +128,66 @@ transient_use_aposteriori_step_control = True
 transient_aposteriori_step_threshold = 0.9
 #: Disable all step control in transient analyses.
 transient_no_step_control = False
+#: Make the step control land exactly on the breakpoints of the time
+#: functions of the independent sources (eg. the corners of a pulse).
+transient_use_breakpoints = True
+#: After a breakpoint or a switch event, the time step is reduced by this
+#: factor.
+transient_breakpoint_step_coeff = .1
+#: Locate the crossings of the switching thresholds by the control voltages
+#: of the switches and make the step control land exactly on them.
+transient_use_switch_events = True
+#: Crossings closer than this fraction of the time step to either end of
+#: the step are not located.
+transient_switch_event_reltol = 1e-3
+#: When a checkpoint file is set, the state of a transient analysis is saved
+#: to it at most every so many seconds (wall-clock time).
+transient_checkpoint_interval = 600.
+#: Highest order the variable-order Gear method (``GEAR``) may select.
+#: Orders above 5 are not zero-stable with variable steps.
+transient_gear_max_order = 5
+#: The variable-order Gear method changes order only if the new order
+#: allows a step at least this many times longer than the current one.
+transient_gear_order_change_gain = 1.2
+#: With the ``TRAP_AUTO`` method, number of steps integrated with Gear's
+#: second order method after a breakpoint, a switch event or whenever
+#: point-to-point ringing is detected, before returning to TRAP.
+transient_trap_damping_steps = 3
+#: Bypass the evaluation of the latent partitions of the nonlinear elements
+#: in transient analyses, see :mod:`ahkab.latency`.
+transient_use_latency = False
+#: A partition is latent while its node voltages move less than this
+#: (in Volt) since its last evaluation.
+transient_latency_vtol = 1e-4
+#: Number of samples per period compared by the steady state detection,
+#: see :mod:`ahkab.steady_state`.
+transient_steady_state_samples = 20
+#: The steady state is reached when the solution repeats itself for this
+#: many periods in a row.
+transient_steady_state_periods = 2
+#: Run the transient analyses with the Parareal parallel-in-time algorithm,
+#: see :mod:`ahkab.parareal`.
+transient_use_parareal = False
+#: Number of Parareal time slices. If set to 0, one per CPU.
+transient_parareal_slices = 0
+#: Number of fixed implicit Euler steps per slice in the Parareal coarse
+#: propagator.
+transient_parareal_coarse_steps = 10
+#: Number of processes running the Parareal fine propagator. If set to 0,
+#: one per CPU.
+transient_parareal_workers = 0
+#: With the waveform relaxation method (``WR``), number of time steps in
+#: each window, see :mod:`ahkab.wr`.
+transient_wr_window = 50
+#: Maximum number of waveform relaxation iterations in a window.
+transient_wr_max_iter = 50
+#: Number of processes solving the partitions in parallel with the ``WR``
+#: method. If set to 0, one per CPU.
+transient_wr_workers = 0
+#: Transient sensitivities: the solution is stored every this many time
+#: points, the others are computed again in the backward pass. Set to 1 to
+#: store all of them.
+transient_sens_checkpoint_steps = 50
 #: Minimum capacitance to ground.
 cmin = 1e-18
 
@@ -159,8 +219,41 @@ symb_formulate_with_gs = False
 # ac
 ac_log_step = 'LOG'
 ac_lin_step = 'LIN'
-#: Maximum number of NR iterations for AC analyses.
-ac_max_nr_iter = 20
+ac_adaptive_step = 'ADAPTIVE'
+ACDIRECT = 'direct'
+ACSCHUR = 'schur'
+ACPRIMA = 'prima'
+#: Number of frequency points solved and stored together in AC analyses.
+ac_block_size = 64
+#: Number of processes solving the frequency points of AC analyses. If set
+#: to 0, one per CPU.
+ac_workers = 1
+#: Adaptive AC sweeps: tolerance on the deviation of the magnitude of each
+#: point, in dB, from the straight line through its neighbours.
+ac_adaptive_db_tol = 0.1
+#: Adaptive AC sweeps: tolerance on the deviation of the phase, in degrees.
+ac_adaptive_phase_tol = 1.
+#: Maximum number of points of an adaptive AC sweep.
+ac_adaptive_max_points = 10000
+#: PRIMA AC analyses: number of block moments matched in each expansion
+#: point.
+ac_krylov_order = 10
+#: PRIMA AC analyses: maximum number of expansion points.
+ac_krylov_max_points = 8
+#: PRIMA AC analyses: tolerance on the residuals of the reduced model,
+#: relative to the norm of the AC sources vector.
+ac_krylov_tol = 1e-8
+#: Circuit reduction: replace the linear subnetworks of the circuit with
+#: PRIMA macromodels in the OP, AC and TRAN analyses run by
+#: :func:`ahkab.run`, see :func:`ahkab.prima.reduce_circuit`. The voltages of
+#: the nodes internal to the subnetworks are not computed.
+prima_reduce = False
+#: Circuit reduction: the external names of the nodes to be preserved, in
+#: addition to the ports of the linear subnetworks.
+prima_outputs = []
+#: Circuit reduction: number of block moments matched by the macromodels of
+#: the linear subnetworks, see :func:`ahkab.prima.reduce_circuit`.
+prima_order = 5
 #: Use degrees instead of rads in AC phase results.
 ac_phase_in_deg = False
 
@@ -168,6 +261,11 @@ ac_phase_in_deg = False
 #: Maximum considered angular frequency in rad/s for PZ analyses.
 pz_max = 1e12
 
+#sens
+#: Sensitivity analyses: relative perturbation of the parameters of the
+#: non-linear devices, whose derivatives are computed by central differences.
+sens_rel_step = 1e-6
+
 # plotting
 # Set to None to disable writing plots to disk
 #: Should plots be shown to the user? This variable is set to ``True``
@@ -0,0 +1,209 @@
+# -*- coding: iso-8859-1 -*-
+# parareal.py
+# Parallel-in-time transient analysis
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Parallel-in-time transient analysis, with the Parareal algorithm.
+
+The simulation time is split in slices, ``options.transient_parareal_slices``.
+Two propagators advance the solution from the beginning of a slice to its
+end:
+
+* the coarse propagator :math:`\\mathcal{G}`, implicit Euler with
+  ``options.transient_parareal_coarse_steps`` fixed steps per slice, cheap
+  and inaccurate,
+* the fine propagator :math:`\\mathcal{F}`, the method selected for the
+  transient analysis, with its step control.
+
+A first estimate of the solution at the slice boundaries :math:`U_k` is
+computed serially with the coarse propagator. Then, at each iteration, the
+fine propagator is run on all slices at once, in a pool of
+``options.transient_parareal_workers`` processes, and the boundary values
+are corrected serially:
+
+.. math::
+
+    U_{k+1}^{j+1} = \\mathcal{G}(U_k^{j+1}) + \\mathcal{F}(U_k^j) -
+    \\mathcal{G}(U_k^j).
+
+The iterations stop when no boundary value moves more than the tolerances
+set by ``options.vea``, ``options.ver``, ``options.iea`` and
+``options.ier``. After :math:`j` iterations, the first :math:`j` slices
+are exact, so the algorithm never takes more iterations than there are
+slices; it pays off when it converges in far fewer, as it usually does
+with smooth or periodic solutions.
+
+The result is the fine solution, restarted at the beginning of every slice.
+
+This module is used by :func:`ahkab.transient.transient_analysis` when
+``options.transient_use_parareal`` is set.
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import multiprocessing
+
+import numpy as np
+
+from . import options
+from . import printing
+
+
+def get_slices(tstart, tstop, slices=None):
+    """Split the simulation time in slices of equal length.
+
+    **Parameters:**
+
+    tstart, tstop : floats
+        The start and stop times.
+    slices : int, optional
+        The number of slices, defaults to
+        ``options.transient_parareal_slices`` or, if that is 0, to the
+        number of CPUs.
+
+    **Returns:**
+
+    bounds : ndarray
+        The boundaries of the slices, ``tstart`` and ``tstop`` included.
+    """
+    slices = slices if slices is not None else options.transient_parareal_slices
+    if not slices:
+        slices = multiprocessing.cpu_count()
+    return np.linspace(tstart, tstop, slices + 1)
+
+
+def parareal_steps(propagate, bounds, x0, times, nv, workers=None, verbose=3):
+    """Generator solving a transient analysis with the Parareal algorithm.
+
+    **Parameters:**
+
+    propagate : callable
+        Called as ``propagate(ta, tb, x, times, coarse)``, it integrates the
+        circuit from ``ta`` to ``tb`` starting from ``x`` and returns the
+        solution at ``times`` as a list of ``(t, x)`` tuples. ``coarse``
+        selects the coarse propagator. It has to be picklable, to be sent to
+        the worker processes.
+    bounds : ndarray
+        The boundaries of the slices, see :func:`get_slices`.
+    x0 : ndarray
+        The solution at ``bounds[0]``.
+    times : ndarray
+        The sorted times at which the solution is returned, in
+        ``]bounds[0], bounds[-1]]``.
+    nv : int
+        The number of nodes in the circuit, ground included.
+    workers : int, optional
+        The number of processes, defaults to
+        ``options.transient_parareal_workers`` or, if that is 0, to the
+        number of CPUs. If set to 1, the slices are solved serially in the
+        current process.
+    verbose : int, optional
+        The verbosity level.
+
+    **Yields:**
+
+    points : list
+        The results, as ``(t, x)`` tuples, one slice at a time.
+
+    :raises RuntimeError: if a propagator fails.
+    """
+    workers = workers if workers is not None else options.transient_parareal_workers
+    if not workers:
+        workers = multiprocessing.cpu_count()
+    n_slices = len(bounds) - 1
+    workers = min(workers, n_slices)
+    printing.print_info_line(("Parareal slices: %d, workers: %d" %
+                              (n_slices, workers), 3), verbose)
+    aerror = np.zeros(x0.shape)
+    aerror[:nv-1] = options.vea
+    aerror[nv-1:] = options.iea
+    rerror = np.zeros(x0.shape)
+    rerror[:nv-1] = options.ver
+    rerror[nv-1:] = options.ier
+    # the output times of each slice, ending with its end
+    slice_times, written = [], []
+    for ta, tb in zip(bounds[:-1], bounds[1:]):
+        st = times[(times > ta) & (times <= tb)]
+        written.append(len(st))
+        if not len(st) or st[-1] < tb:
+            st = np.append(st, tb)
+        slice_times.append(st)
+    # the coarse propagator always runs here
+    _init_worker(propagate)
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, _init_worker, (propagate,))
+        solve = pool.map
+    else:
+        solve = lambda f, tasks: [f(task) for task in tasks]
+    try:
+        U = [x0]
+        coarse = []
+        for k in range(n_slices):
+            coarse.append(_propagate((bounds[k], bounds[k + 1], U[k], None, True)))
+            U.append(coarse[k])
+        for j in range(n_slices):
+            # slices before j are exact and already written
+            tasks = [(bounds[k], bounds[k + 1], U[k], slice_times[k], False)
+                     for k in range(j, n_slices)]
+            fine = dict(zip(range(j, n_slices), solve(_propagate_points, tasks)))
+            converged = True
+            for k in range(j + 1, n_slices):
+                # the correction of the start of slice k
+                if k == j + 1:
+                    new_U = fine[k - 1][-1][1]
+                else:
+                    g = _propagate((bounds[k - 1], bounds[k], U[k - 1], None, True))
+                    new_U = g + fine[k - 1][-1][1] - coarse[k - 1]
+                    coarse[k - 1] = g
+                converged = converged and \
+                            np.all(abs(new_U - U[k]) <= aerror + rerror*abs(new_U))
+                U[k] = new_U
+            printing.print_info_line(("Parareal iteration %d" % (j + 1,), 5),
+                                     verbose)
+            done = range(j, n_slices) if converged else (j,)
+            for k in done:
+                yield fine[k][:written[k]]
+            if converged:
+                break
+        printing.print_info_line(("Parareal iterations: %d" % (j + 1,), 3), verbose)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+_propagator = []
+
+
+def _init_worker(propagate):
+    del _propagator[:]
+    _propagator.append(propagate)
+
+
+def _propagate_points(task):
+    ta, tb, x, times, coarse = task
+    return _propagator[0](ta, tb, x, times, coarse)
+
+
+def _propagate(task):
+    # the solution at the end of the slice
+    ta, tb, x, times, coarse = task
+    return _propagate_points((ta, tb, x, np.array([tb]), coarse))[-1][1]
@@ -0,0 +1,406 @@
+# -*- coding: iso-8859-1 -*-
+# prima.py
+# Model order reduction with Krylov subspaces
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Model order reduction of linear circuits with Krylov subspaces.
+
+A linear circuit, driven by the inputs :math:`u`,
+
+.. math::
+
+    (G + s C)\\ x = B\\ u
+
+with :math:`n` unknowns, is approximated projecting it on a subspace of
+dimension :math:`q \\ll n`, spanned by the columns of an orthonormal matrix
+:math:`V`:
+
+.. math::
+
+    (V^T G V + s V^T C V)\\ y = V^T B\\ u, \\qquad x \\approx V y.
+
+The subspace is built with the block Arnoldi algorithm from the Krylov
+subspaces
+
+.. math::
+
+    \\mathcal{K}_k\\left((G + s_0 C)^{-1} C, (G + s_0 C)^{-1} B\\right)
+
+around one or more expansion points :math:`s_0`, so that the first
+:math:`k` moments of the transfer function in each of them are matched.
+This is the PRIMA algorithm [1]_: the projection by congruence, rather than
+the explicit computation of the moments of AWE, keeps it numerically
+stable and, for RLC circuits in the appropriate form, it preserves their
+passivity.
+
+Complex expansion points, such as :math:`s_0 = j \\omega_0`, give complex
+Krylov vectors: their real and imaginary parts are added to the basis, so
+that the reduced matrices stay real.
+
+Reduction of linear subnetworks
+-------------------------------
+
+:func:`reduce_circuit` replaces the linear subnetworks of a circuit, made of
+resistors, capacitors, inductors and VCCSs, with reduced-order macromodels.
+The nodes connected only to such elements are internal to the subnetworks,
+all the others -- the ones connected to nonlinear devices, sources and any
+other element, the ones selected by the user and ground -- are their ports.
+Each group of internal nodes connected by the reduced elements is a
+separate subnetwork, with its own macromodel.
+
+The matrices of a subnetwork are assembled in the passive form of the MNA,
+where the rows of the inductor currents are sign-flipped: for RLC
+subnetworks :math:`G + G^T` and :math:`C` are then positive semidefinite, a
+property that the projection by congruence preserves, and with it
+passivity. Partitioning the unknowns into the port voltages :math:`v_p` and
+the internal variables :math:`x_i`, the latter are projected on the Krylov
+subspace of the DC moments driven by the ports,
+
+.. math::
+
+    V = \\begin{bmatrix} I & 0 \\\\ 0 & V_i \\end{bmatrix}, \\qquad
+    V_i \\rightarrow \\mathcal{K}_k\\left(G_{ii}^{-1} C_{ii},
+    G_{ii}^{-1} [G_{ip}, C_{ip}]\\right),
+
+so that the port voltages are preserved and the operating point is exact.
+The macromodel :math:`(V^T G V, V^T C V)` is stamped by a single
+:class:`ahkab.components.Macromodel` element, whose internal variables are
+solved as the voltages of a few new internal nodes.
+
+Setting ``options.prima_reduce`` makes :func:`ahkab.run` reduce the circuit
+before OP, AC and TRAN analyses.
+
+.. [1] A. Odabasioglu, M. Celik and L. T. Pileggi, "PRIMA: passive
+       reduced-order interconnect macromodeling algorithm", IEEE Trans. on
+       CAD, vol. 17, no. 8, pp. 645-654, 1998.
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import copy
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+
+from . import circuit
+from . import components
+from . import options
+from . import printing
+
+# the node attributes of the elements
+_NODE_ATTRIBUTES = ('n1', 'n2', 'sn1', 'sn2', 'ng', 'nb')
+
+
+def get_basis(G, C, B, s0, order, V=None):
+    """Build or extend an orthonormal basis of a block Krylov subspace.
+
+    **Parameters:**
+
+    G, C : ndarrays or sparse matrices
+        The matrices of the circuit, :math:`(G + s C) x = B u`.
+    B : ndarray
+        The input matrix, one column per input.
+    s0 : float or complex
+        The expansion point.
+    order : int
+        The number of block moments to be matched.
+    V : ndarray, optional
+        An orthonormal basis to be extended.
+
+    **Returns:**
+
+    V : ndarray
+        The real orthonormal basis, one vector per column.
+
+    :raises np.linalg.LinAlgError, RuntimeError: if :math:`G + s_0 C` is
+        singular.
+    """
+    n = G.shape[0]
+    if V is None:
+        V = np.zeros((n, 0))
+    solve = _get_solver(G + s0*C)
+    # the complex Arnoldi basis of this expansion point
+    W = np.zeros((n, 0), dtype=complex)
+    R = solve(np.asarray(B, dtype=complex).reshape((n, -1)))
+    for _ in range(order):
+        R = _orthonormalize(W, R)
+        if not R.shape[1]:
+            break
+        W = np.hstack((W, R))
+        V = np.hstack((V, _orthonormalize(V, np.hstack((R.real, R.imag)))))
+        R = solve(C.dot(R))
+    return V
+
+
+def project(G, C, B, V):
+    """Project the circuit matrices on the subspace spanned by ``V``.
+
+    **Parameters:**
+
+    G, C : ndarrays or sparse matrices
+        The matrices of the circuit.
+    B : ndarray
+        The input matrix.
+    V : ndarray
+        The orthonormal basis, see :func:`get_basis`.
+
+    **Returns:**
+
+    Gr, Cr, Br : ndarrays
+        The reduced matrices, :math:`V^T G V`, :math:`V^T C V` and
+        :math:`V^T B`.
+    """
+    return (V.T.dot(np.asarray(G.dot(V))), V.T.dot(np.asarray(C.dot(V))),
+            V.T.dot(B))
+
+
+def reduce_circuit(circ, outputs=None, order=None, verbose=3):
+    """Reduce the linear subnetworks of a circuit with PRIMA.
+
+    Resistors, capacitors and inductors without initial conditions or
+    mutual couplings and VCCSs are reduced, if they connect a node internal
+    to a linear subnetwork. Each subnetwork -- a group of internal nodes
+    connected by such elements -- is reduced separately and replaced by a
+    :class:`ahkab.components.Macromodel`. Subnetworks whose macromodel
+    would not be smaller are left untouched.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit to be reduced. It is not modified.
+    outputs : list of strings, optional
+        The external names of the nodes to be preserved, in addition to the
+        ones connected to the elements that are not reduced.
+    order : int, optional
+        The number of block moments to be matched, defaults to
+        ``options.prima_order``.
+    verbose : int, optional
+        The verbosity level.
+
+    **Returns:**
+
+    reduced : circuit instance
+        A new circuit, with the linear subnetworks replaced by their
+        macromodels. The voltages of the preserved nodes and the currents
+        in the elements that are not reduced match the ones of ``circ``.
+
+    :raises ValueError: if a linear subnetwork has no DC path to its ports.
+    """
+    order = order if order is not None else options.prima_order
+    outputs = [circ.ext_node_to_int(n) for n in outputs] if outputs else []
+    nv = circ.get_nodes_number()
+    # the currents sensed by CCCSs and CCVSs must stay in the circuit
+    sensed = set(elem.source_id.upper() for elem in circ
+                 if hasattr(elem, 'source_id'))
+    reducible = lambda elem: _is_reducible(elem) and \
+        elem.part_id.upper() not in sensed
+    ports = set([0] + outputs)
+    for elem in circ:
+        if not reducible(elem):
+            ports.update(_get_nodes(elem))
+    internal = [n for n in range(1, nv) if n not in ports]
+    if not internal:
+        return copy.deepcopy(circ)
+    # group the internal nodes in subnetworks, through the elements
+    # connecting them
+    index = dict((n, i) for i, n in enumerate(internal))
+    sub = [elem for elem in circ if reducible(elem) and
+           not _get_nodes(elem).issubset(ports)]
+    rows, cols = [], []
+    for elem in sub:
+        nodes = [index[n] for n in _get_nodes(elem) if n in index]
+        rows += nodes[:-1]
+        cols += nodes[1:]
+    graph = scipy.sparse.coo_matrix((np.ones(len(rows)), (rows, cols)),
+                                    shape=(len(internal),)*2)
+    ncomp, labels = scipy.sparse.csgraph.connected_components(graph,
+                                                              directed=False)
+    groups = [[] for _ in range(ncomp)]
+    for elem in sub:
+        n = [n for n in _get_nodes(elem) if n in index][0]
+        groups[labels[index[n]]].append(elem)
+    macromodels, removed, reduced_nodes = [], set(), set()
+    for elements in groups:
+        nodes = set(n for elem in elements for n in _get_nodes(elem))
+        sub_internal = sorted(n for n in nodes if n in index)
+        sub_ports = sorted(nodes - set(sub_internal) - set([0]))
+        model = _reduce_subnetwork(elements, sub_ports, sub_internal, order)
+        if model is None:
+            continue
+        macromodels.append((sub_ports, model[0], model[1]))
+        removed.update(id(elem) for elem in elements)
+        reduced_nodes.update(sub_internal)
+        printing.print_info_line(("PRIMA: %d internal variables reduced to %d, "
+                                  % (model[2], model[0].shape[0] -
+                                     len(sub_ports)) +
+                                  "%d ports." % len(sub_ports), 3), verbose)
+    if not macromodels:
+        return copy.deepcopy(circ)
+    return _build_reduced(circ, [elem for elem in circ
+                                 if id(elem) not in removed],
+                          reduced_nodes, macromodels)
+
+
+def _reduce_subnetwork(elements, ports, internal, order):
+    # the macromodel (Gr, Cr, number of internal variables) of a subnetwork,
+    # None if it is not smaller than the subnetwork itself
+    G, C = _get_matrices(elements, ports, internal)
+    n_i = G.shape[0] - len(ports)
+    p, i = np.arange(len(ports)), np.arange(len(ports), G.shape[0])
+    Gii, Cii = G[i, :][:, i], C[i, :][:, i]
+    B = np.hstack((G[i, :][:, p].toarray(), C[i, :][:, p].toarray()))
+    if n_i <= options.dense_matrix_limit:
+        Gii, Cii = Gii.toarray(), Cii.toarray()
+    try:
+        Vi = get_basis(Gii, Cii, B, 0., order)
+    except (np.linalg.LinAlgError, RuntimeError):
+        raise ValueError("The linear subnetwork of %s has no DC path to " %
+                         ", ".join(str(elem.part_id) for elem in elements) +
+                         "its ports, it can't be reduced.")
+    # V = [I 0; 0 Vi]: the port voltages are preserved
+    V = scipy.sparse.block_diag((scipy.sparse.identity(len(ports)),
+                                 scipy.sparse.csc_matrix(Vi)), format='csc')
+    Gr = V.T.dot(G.dot(V)).toarray()
+    Cr = V.T.dot(C.dot(V)).toarray()
+    if Vi.shape[1] >= n_i or \
+       np.count_nonzero(Gr) + np.count_nonzero(Cr) >= G.nnz + C.nnz:
+        return None
+    return Gr, Cr, n_i
+
+
+def _get_matrices(elements, ports, internal):
+    # the sparse matrices of a subnetwork in the passive MNA form: the
+    # unknowns are the port voltages, the internal voltages and the inductor
+    # currents. The inductor rows are sign-flipped, so that G + G^T and C
+    # are positive semidefinite for RLC subnetworks.
+    index = dict((n, k) for k, n in enumerate(list(ports) + list(internal)))
+    g, c = [], []
+
+    def stamp(m, r1, r2, c1, c2, value):
+        for r, sr in ((r1, 1.), (r2, -1.)):
+            for col, sc in ((c1, 1.), (c2, -1.)):
+                if r in index and col in index:
+                    m.append((index[r], index[col], sr*sc*value))
+    size = len(index)
+    for elem in elements:
+        if isinstance(elem, components.Resistor):
+            stamp(g, elem.n1, elem.n2, elem.n1, elem.n2, elem.g)
+        elif isinstance(elem, components.Capacitor):
+            stamp(c, elem.n1, elem.n2, elem.n1, elem.n2, elem.value)
+        elif isinstance(elem, components.sources.GISource):
+            stamp(g, elem.n1, elem.n2, elem.sn1, elem.sn2, elem.alpha)
+        elif isinstance(elem, components.Inductor):
+            # KCL: +i in n1, -i in n2; branch: -v(n1) + v(n2) + L di/dt = 0
+            for n, sign in ((elem.n1, 1.), (elem.n2, -1.)):
+                if n in index:
+                    g.append((index[n], size, sign))
+                    g.append((size, index[n], -sign))
+            c.append((size, size, elem.value))
+            size += 1
+    # gmin to ground on the internal nodes, as in the whole circuit
+    g += [(index[n], index[n], options.gmin) for n in internal]
+
+    def build(entries):
+        r, col, v = zip(*entries) if entries else ((), (), ())
+        return scipy.sparse.csc_matrix((v, (r, col)), shape=(size, size))
+    return build(g), build(c)
+
+
+def _build_reduced(circ, elements, internal, macromodels):
+    # the nodes of circ but the reduced ones, in the same order, then the
+    # state nodes of the macromodels
+    reduced = circuit.Circuit(circ.title)
+    reduced.models = copy.deepcopy(circ.models)
+    node_map = {}
+    for n in range(circ.get_nodes_number()):
+        if n not in internal:
+            node_map[n] = reduced.add_node(circ.nodes_dict[n])
+    reduced.internal_nodes = circ.internal_nodes
+    # all at once, not to break the references among the elements
+    elements = copy.deepcopy(elements)
+    for elem in elements:
+        for attr in _NODE_ATTRIBUTES:
+            if hasattr(elem, attr):
+                setattr(elem, attr, node_map[getattr(elem, attr)])
+        if hasattr(elem, 'ports'):
+            elem.ports = tuple(tuple(node_map[n] for n in port)
+                               for port in elem.ports)
+        reduced.append(elem)
+    for k, (ports, Gr, Cr) in enumerate(macromodels):
+        states = [reduced.add_node(reduced.new_internal_node())
+                  for _ in range(Gr.shape[0] - len(ports))]
+        reduced.append(components.Macromodel('PRIMA%d' % k,
+                                             [node_map[n] for n in ports],
+                                             states, Gr, Cr))
+    return reduced
+
+
+def _is_reducible(elem):
+    if isinstance(elem, (components.Resistor, components.sources.GISource)):
+        return True
+    elif isinstance(elem, components.Capacitor):
+        return elem.ic is None
+    elif isinstance(elem, components.Inductor):
+        return elem.ic is None and not elem.coupling_devices
+    return False
+
+
+def _get_nodes(elem):
+    nodes = set(getattr(elem, attr) for attr in _NODE_ATTRIBUTES
+                if hasattr(elem, attr))
+    for port in getattr(elem, 'ports', ()):
+        nodes.update(port)
+    return nodes
+
+
+def _get_solver(M):
+    # factorize once, solve many times
+    if M.shape[0] > options.dense_matrix_limit:
+        lu = scipy.sparse.linalg.splu(scipy.sparse.csc_matrix(M,
+                                                              dtype=complex))
+        return lambda b: lu.solve(b)
+    lu = scipy.linalg.lu_factor(np.asarray(M, dtype=complex),
+                                check_finite=False)
+    if np.any(np.diag(lu[0]) == 0):
+        raise np.linalg.LinAlgError("Singular matrix")
+    return lambda b: scipy.linalg.lu_solve(lu, b)
+
+
+def _orthonormalize(V, R):
+    # the columns of R orthonormalized against V and each other, with
+    # modified Gram-Schmidt, repeated once; the dependent ones are dropped
+    Q = []
+    for r in R.T:
+        r = r.copy()
+        norm = np.linalg.norm(r)
+        if norm == 0:
+            continue
+        for _ in range(2):
+            for v in Q:
+                r -= np.vdot(v, r)*v
+            r -= V.dot(V.conj().T.dot(r))
+        if np.linalg.norm(r) > 1e-10*norm:
+            Q.append(r/np.linalg.norm(r))
+    if not Q:
+        return np.zeros((V.shape[0], 0), dtype=R.dtype)
+    return np.array(Q).T
@@ -377,6 +377,32 @@ def print_fourier(label, f, F, THD, outfile='stdout'):
     if outfile != 'stdout':
         fp.close()
 
+def print_measures(title, measures, outfile='stdout'):
+    """Print the values of a set of measurements
+
+    **Parameters:**
+
+    title : str
+        The title of the table, eg. the analysis type.
+    measures : list of tuples
+        The measurement labels and values, as ``(label, value)``. A value
+        of ``None`` is printed as not found.
+    outfile : str, optional
+        The file name to print to. Defaults to ``'stdout'``, for the standard
+        output.
+    """
+    if outfile == 'stdout':
+        fp = sys.stdout
+    else:
+        fp = open(outfile, 'w')
+    fp.write('Measurements: %s\n' % title)
+    mtable = [[label, 'not found' if value is None else value]
+              for label, value in measures]
+    fp.write(table(mtable, headers=('Label', 'Value')))
+    fp.write('\n')
+    if outfile != 'stdout':
+        fp.close()
+
 def print_spicefft(label, f, F, THD=None, uformat='NORM', window=None,
                    outfile='stdout'):
     """Print the results of an FFT postprocess
@@ -81,11 +81,16 @@ Index of the solution classes
 .. autosummary::
 
     ac_solution
+    ac_sens_solution
+    ac_tf_solution
     dc_solution
+    noise_solution
     op_solution
     pss_solution
     pz_solution
+    sens_solution
     symbolic_solution
+    tf_solution
     tran_solution
 
 Module reference
@@ -96,10 +101,13 @@ Module reference
 from __future__ import (unicode_literals, absolute_import,
                         division, print_function)
 
+import os
 import sys
 import time
 import pickle
+import shutil
 import re
+import fnmatch
 
 import numpy as np
 
@@ -123,6 +131,30 @@ class _mutable_data(object):
         csvlib.write_csv(self.filename, data, self.variables, append=self._init_file_done)
         self._init_file_done = True
 
+    def _get_data_position(self):
+        """Get the size of the data written so far, in bytes."""
+        if not self._init_file_done or self.filename == 'stdout':
+            return 0
+        return os.path.getsize(self.filename)
+
+    def _restore_data(self, filename, position):
+        """Restore the data written to ``filename``, up to ``position``.
+
+        The data is copied to the data file of this results set, if it is
+        different, and anything written after ``position`` is discarded.
+        """
+        if position == 0 or self.filename == 'stdout':
+            return
+        if not os.path.isfile(filename) or os.path.getsize(filename) < position:
+            raise ValueError("Cannot restore the results written to %s." %
+                             filename)
+        if os.path.abspath(filename) != os.path.abspath(self.filename):
+            with open(filename, 'rb') as src, open(self.filename, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        with open(self.filename, 'r+b') as fp:
+            fp.truncate(position)
+        self._init_file_done = True
+
 
 class solution(object):
     """Base class storing a set of generic simulation results.
@@ -157,6 +189,11 @@ class solution(object):
         self.iter_index = 0
         # Please redefine this sol_type in the subclasses
         self.sol_type = None
+        # indices of the rows of x to be stored, None means all of them
+        self._saved_rows = None
+        # names of the rows of x, set by _set_saved_variables()
+        self._x_variables = None
+        self._measures = []
 
     def asarray(self):
         """Return all data.
@@ -170,6 +207,88 @@ class solution(object):
                                         verbose=0)
         return data
 
+    def _set_saved_variables(self, save):
+        """Restrict the stored variables to those selected by ``save``.
+
+        The first variable, the independent one (eg. ``T`` or ``f``), is
+        always kept. All the others follow the order of the unknowns in the
+        solution vector ``x``.
+
+        **Parameters:**
+
+        save : list of strings or None
+            Node voltages and branch currents to be stored, eg.
+            ``['V(out)', 'I(V1)', 'V(n*)']``. See :func:`match_saved_variable`
+            for the supported syntax. ``None`` keeps every variable.
+        """
+        self._x_variables = list(self.variables[1:])
+        if save is None:
+            return
+        patterns = _normalize_save_patterns(save)
+        kept_variables = [self.variables[0]]
+        self._saved_rows = []
+        for i, varname in enumerate(self.variables[1:]):
+            if match_saved_variable(varname, patterns):
+                kept_variables.append(varname)
+                self._saved_rows.append(i)
+        for p in patterns:
+            if not len(fnmatch.filter([v.upper() for v in
+                                       self.variables[1:]], p)):
+                printing.print_warning(".SAVE: no variable matches %s" % p)
+        self.variables = kept_variables
+        self._saved_rows = np.array(self._saved_rows, dtype=int)
+
+    def _select_saved(self, x):
+        """Extract from the solution ``x`` the rows to be stored."""
+        if self._saved_rows is None:
+            return x
+        return x[self._saved_rows, :]
+
+    def add_measures(self, measures):
+        """Evaluate measurements on the data added to the results set.
+
+        The measurements are updated every time a new point is added, they
+        may refer to any variable, whether it is saved or not.
+
+        **Parameters:**
+
+        measures : list of measurements
+            The measurements, see :mod:`ahkab.measure`.
+        """
+        for m in measures:
+            m.bind(self._x_variables)
+        self._measures += list(measures)
+
+    def _update_measures(self, xvalue, x):
+        """Update the measurements with a new point of the solution."""
+        for m in self._measures:
+            m.update(xvalue, x)
+
+    def _get_measures_state(self):
+        """Get the state of the measurements, as a list of
+        ``(name, state)`` tuples, see :func:`ahkab.measure.Measure.get_state`."""
+        return [(m.name, m.get_state()) for m in self._measures]
+
+    def _restore_measures(self, states):
+        """Restore the state of the measurements, saved by
+        :func:`_get_measures_state`.
+
+        :raises ValueError: if the measurements differ from the saved ones.
+        """
+        if [name for name, _ in states] != [m.name for m in self._measures]:
+            raise ValueError("The saved measurements do not match the " +
+                             "measurements of the results set.")
+        for m, (_, state) in zip(self._measures, states):
+            m.set_state(state)
+
+    @property
+    def measures(self):
+        """The measured values, in a dictionary with the measure labels as
+        keys. A value is ``None`` if it is not available."""
+        values = case_insensitive_dict()
+        values.update(dict((m.name, m.value) for m in self._measures))
+        return values
+
     # Access as a dictionary BY VARIABLE NAME:
     def __len__(self):
         """Get the number of variables in the results set."""
@@ -571,8 +690,12 @@ class ac_solution(solution, _mutable_data):
     outfile: str
         the file to write the results to.  Use ``"stdout"`` to write to the
         standard output.
+    save : list of strings, optional
+        the variables to be stored, see :func:`match_saved_variable`.
+        If unset, all of them are stored.
     """
-    def __init__(self, circ, start, stop, points, stype, op, outfile):
+    def __init__(self, circ, start, stop, points, stype, op, outfile,
+                 save=None):
         solution.__init__(self, circ, outfile)
         self.sol_type = "AC"
         self.linearization_op = op
@@ -597,6 +720,7 @@ class ac_solution(solution, _mutable_data):
                 self.variables += [varname]
                 self.units.update({varname: "A"})
 
+        self._set_saved_variables(save)
         for i in range(1, len(self.variables)):
             self.csv_headers.append("|%s|" % self.variables[i])
             self.csv_headers.append("arg(%s)" % self.variables[i])
@@ -614,13 +738,26 @@ class ac_solution(solution, _mutable_data):
                           self.filename)
 
     def add_line(self, frequency, x):
-        frequency = np.array([[frequency]])
-        xsplit = np.zeros((x.shape[0]*2, 1))
-        for i in range(x.shape[0]):
-            xsplit[2*i, 0] = np.abs(x[i, 0])
-            xsplit[2*i+1, 0] = np.angle(x[i, 0], deg=options.ac_phase_in_deg)
+        self.add_lines(np.array([frequency]), x)
 
-        data = np.concatenate((frequency, xsplit), axis=0)
+    def add_lines(self, frequencies, x):
+        """Add several frequency points to the results set at once.
+
+        **Parameters:**
+
+        frequencies : ndarray
+            The frequencies, in Hz.
+
+        x : ndarray
+            The complex solutions, one column per frequency.
+        """
+        for i, frequency in enumerate(frequencies):
+            self._update_measures(frequency, x[:, i:i+1])
+        x = self._select_saved(x)
+        data = np.zeros((x.shape[0]*2 + 1, x.shape[1]))
+        data[0, :] = frequencies
+        data[1::2, :] = np.abs(x)
+        data[2::2, :] = np.angle(x, deg=options.ac_phase_in_deg)
         self._add_data(data)
 
     def get_x(self):
@@ -711,6 +848,384 @@ class ac_solution(solution, _mutable_data):
         self.iter_headers = self.variables
         return self
 
+class noise_solution(solution, _mutable_data):
+    """Noise results
+
+    The output noise, ``onoise``, and, if an input source was specified,
+    the input-referred noise, ``inoise``, are stored as spectral densities,
+    in ``V/sqrt(Hz)`` or ``A/sqrt(Hz)``.
+    The contribution of each element to the output noise is available as
+    ``onoise(<part_id>)``.
+
+    **Parameters:**
+
+    circ : circuit instance
+        the circuit instance of the simulated circuit
+    start : float
+       the sweep frequency start value, in Hz.
+    stop : float
+       the sweep frequency stop value, in Hz.
+    points : int
+       the sweep total points.
+    stype : str
+       the type of sweep, ``"LOG"`` or ``"LIN"``.
+    op : op_solution
+       the linearization Operating Point used to compute the results.
+    output : str or tuple
+       the output port.
+    source : str
+       the ``part_id`` of the input source, or ``None``.
+    sources : list of tuples
+       the noise sources, see :func:`ahkab.noise.get_noise_sources`.
+    outfile: str
+        the file to write the results to.  Use ``"stdout"`` to write to the
+        standard output.
+    """
+    def __init__(self, circ, start, stop, points, stype, op, output, source,
+                 sources, outfile):
+        solution.__init__(self, circ, outfile)
+        self.sol_type = "NOISE"
+        self.linearization_op = op
+        self.stype = stype
+        self.ostart, self.ostop, self.opoints = start, stop, points
+        self.output, self.source = output, source
+        #: the output noise power, integrated over the swept band, in V^2
+        self.onoise_total = 0.
+        #: the input-referred noise power, integrated over the swept band
+        self.inoise_total = 0. if source is not None else None
+        self._last = None
+
+        self.variables = ["f", "onoise"]
+        self.units.update({"f": "Hz", "onoise": "V/sqrt(Hz)"})
+        if source is not None:
+            self.variables += ["inoise"]
+            vsource = isinstance(circ.get_elem_by_name(source),
+                                 components.sources.VSource)
+            self.units.update({"inoise": "V/sqrt(Hz)" if vsource else
+                                         "A/sqrt(Hz)"})
+        # the contributions of the elements, in order of first appearance
+        self._elements = []
+        for part_id, _, _, _, _, _ in sources:
+            if part_id not in self._elements:
+                self._elements.append(part_id)
+        self._index = np.array([self._elements.index(s[0]) for s in sources],
+                               dtype=int)
+        for part_id in self._elements:
+            varname = "onoise(%s)" % part_id
+            self.variables += [varname]
+            self.units.update({varname: "V/sqrt(Hz)"})
+
+    def __str__(self):
+        return ("<NOISE simulation results for '%s' (netlist %s). %s sweep, " +
+                "from %g to %g Hz, %d points. Run on %s, data file " +
+                "%s>") % (self.netlist_title, self.netlist_file, self.stype,
+                          self.ostart, self.ostop, self.opoints, self.timestamp,
+                          self.filename)
+
+    def add_lines(self, frequencies, contributions, gain=None):
+        """Add several frequency points to the results set at once.
+
+        **Parameters:**
+
+        frequencies : ndarray
+            The frequencies, in Hz.
+
+        contributions : ndarray
+            The output noise power spectral densities of the noise sources,
+            one row per source and one column per frequency.
+
+        gain : ndarray, optional
+            The magnitude of the transfer function from the input source to
+            the output, at each frequency. Required if the input source was
+            specified.
+        """
+        per_element = np.zeros((len(self._elements), len(frequencies)))
+        np.add.at(per_element, self._index, contributions)
+        onoise = per_element.sum(axis=0)
+        data = [frequencies, np.sqrt(onoise)]
+        if self.source is not None:
+            inoise = onoise/gain**2
+            data.append(np.sqrt(inoise))
+        else:
+            inoise = np.zeros(onoise.shape)
+        data = np.vstack(data + [np.sqrt(per_element)])
+        # integrate the PSDs with the trapezoidal rule
+        f = np.hstack(([self._last[0]] if self._last else []) + [frequencies])
+        so = np.hstack(([self._last[1]] if self._last else []) + [onoise])
+        si = np.hstack(([self._last[2]] if self._last else []) + [inoise])
+        self.onoise_total += np.trapz(so, f)
+        if self.source is not None:
+            self.inoise_total += np.trapz(si, f)
+        self._last = (f[-1], so[-1], si[-1])
+        self._add_data(data)
+
+    def get_x(self):
+        return self.get(self.variables[0])
+
+    def get_xlabel(self):
+        return self.variables[0]
+
+
+class tf_solution(solution, _mutable_data):
+    """DC transfer function results
+
+    The results are accessible as from a dictionary, with the keys:
+
+    * ``gain``: the small-signal gain from the input source to the output,
+    * ``Rin``: the input resistance seen by the input source,
+    * ``Rout``: the output resistance,
+    * ``gain(<part_id>)``: the gain from each independent source to the
+      output.
+
+    The first two are available only if an input source was specified.
+
+    **Parameters:**
+
+    circ : circuit instance
+        the circuit instance of the simulated circuit.
+    output : str or tuple
+        the output port.
+    source : str
+        the ``part_id`` of the input source, or ``None``.
+    gain, rin, rout : floats
+        the gain, the input and the output resistances.
+    sources : list of strings
+        the ``part_id`` of all the independent sources.
+    gains : sequence
+        the gains from each of ``sources`` to the output.
+    op : op_solution
+        the linearization Operating Point used to compute the results.
+    outfile : str
+        the filename of the save file.
+    """
+    def __init__(self, circ, output, source, gain, rin, rout, sources, gains,
+                 op, outfile):
+        solution.__init__(self, circ, outfile)
+        self.sol_type = "TF"
+        self.linearization_op = op
+        self.output, self.source = output, source
+        self.data = case_insensitive_dict()
+        if source is not None:
+            self.variables += ["gain", "Rin"]
+            self.data.update({"gain": gain, "Rin": rin})
+            self.units.update({"Rin": u"\u2126"})
+        self.variables += ["Rout"]
+        self.data.update({"Rout": rout})
+        self.units.update({"Rout": u"\u2126"})
+        for part_id, g in zip(sources, gains):
+            varname = "gain(%s)" % part_id
+            self.variables += [varname]
+            self.data.update({varname: g})
+        self._add_data(np.array([[self.data[v]] for v in self.variables]))
+
+    def __str__(self):
+        return ("<TF simulation results for '%s' (netlist %s). Output %s, " +
+                "source %s. Run on %s, data file %s>") % \
+               (self.netlist_title, self.netlist_file, self.output,
+                self.source, self.timestamp, self.filename)
+
+    # Access as a dictionary BY VARIABLE NAME:
+    def __getitem__(self, name):
+        """Get a specific variable, as from a dictionary."""
+        if name in self.data:
+            return self.data[name]
+        raise KeyError(name)
+
+    def get(self, name, default=None):
+        """Get a solution by variable name."""
+        try:
+            return self.data[name]
+        except KeyError:
+            return default
+
+    def values(self):
+        """Get all of the results set's variables values."""
+        return [self.data[v] for v in self.variables]
+
+
+class ac_tf_solution(ac_solution):
+    """AC transfer function results
+
+    The complex transfer functions from each independent source to the
+    output are accessible as ``H(<part_id>)``.
+
+    **Parameters:**
+
+    circ : circuit instance
+        the circuit instance of the simulated circuit
+    start : float
+       the sweep frequency start value, in Hz.
+    stop : float
+       the sweep frequency stop value, in Hz.
+    points : int
+       the sweep total points.
+    stype : str
+       the type of sweep, ``"LOG"`` or ``"LIN"``.
+    op : op_solution
+       the linearization Operating Point used to compute the results.
+    output : str or tuple
+       the output port.
+    sources : list of strings
+       the ``part_id`` of all the independent sources.
+    outfile: str
+        the file to write the results to.  Use ``"stdout"`` to write to the
+        standard output.
+    """
+    def __init__(self, circ, start, stop, points, stype, op, output, sources,
+                 outfile):
+        solution.__init__(self, circ, outfile)
+        self.sol_type = "TF"
+        self.linearization_op = op
+        self.stype = stype
+        self.ostart, self.ostop, self.opoints = start, stop, points
+        self.output = output
+
+        self.variables += ["f"]
+        self.units.update({"f": "Hz"})
+        for part_id in sources:
+            self.variables += ["H(%s)" % part_id]
+        self._set_saved_variables(None)
+        self.csv_headers = [self.variables[0]]
+        for i in range(1, len(self.variables)):
+            self.csv_headers.append("|%s|" % self.variables[i])
+            self.csv_headers.append("arg(%s)" % self.variables[i])
+
+    def __str__(self):
+        return ("<AC TF simulation results for '%s' (netlist %s). Output %s, " +
+                "%s sweep, from %g to %g Hz, %d points. Run on %s, data " +
+                "file %s>") % (self.netlist_title, self.netlist_file,
+                               self.output, self.stype, self.ostart,
+                               self.ostop, self.opoints, self.timestamp,
+                               self.filename)
+
+
+class sens_solution(solution, _mutable_data):
+    """DC sensitivity results
+
+    The derivative of each output with respect to each parameter is
+    accessible as from a dictionary, with keys such as ``dV(out)/dR1``.
+
+    The same data is also available in the attributes ``outputs``,
+    ``parameters``, ``parameter_values`` and ``sensitivities``, the
+    latter holding one row per output and one column per parameter.
+
+    **Parameters:**
+
+    circ : circuit instance
+        the circuit instance of the simulated circuit.
+    outputs : list of strings
+        the outputs, eg. ``'V(out)'`` or ``'I(V1)'``.
+    parameters : list of strings
+        the parameters, see :func:`ahkab.sens.get_parameters`.
+    values : list of floats
+        the values of the parameters.
+    sensitivities : ndarray
+        the derivatives, one row per output and one column per parameter.
+    op : op_solution
+        the Operating Point the derivatives are computed at.
+    outfile : str
+        the filename of the save file. If ``None``, the results are not
+        written.
+    """
+    def __init__(self, circ, outputs, parameters, values, sensitivities, op,
+                 outfile):
+        solution.__init__(self, circ, outfile)
+        self.sol_type = "SENS"
+        self.linearization_op = op
+        self.outputs, self.parameters = outputs, parameters
+        self.parameter_values = np.array(values, dtype=float)
+        self.sensitivities = np.array(sensitivities, dtype=float)
+        self.data = case_insensitive_dict()
+        for k, output in enumerate(outputs):
+            for p, parameter in enumerate(parameters):
+                varname = "d%s/d%s" % (output, parameter)
+                self.variables += [varname]
+                self.data.update({varname: self.sensitivities[k, p]})
+        if outfile is not None:
+            self._add_data(np.array([[self.data[v]] for v in self.variables]))
+
+    def __str__(self):
+        return ("<SENS simulation results for '%s' (netlist %s). Outputs %s, " +
+                "%d parameters. Run on %s, data file %s>") % \
+               (self.netlist_title, self.netlist_file, ", ".join(self.outputs),
+                len(self.parameters), self.timestamp, self.filename)
+
+    # Access as a dictionary BY VARIABLE NAME:
+    def __getitem__(self, name):
+        """Get a specific variable, as from a dictionary."""
+        if name in self.data:
+            return self.data[name]
+        raise KeyError(name)
+
+    def get(self, name, default=None):
+        """Get a solution by variable name."""
+        try:
+            return self.data[name]
+        except KeyError:
+            return default
+
+    def values(self):
+        """Get all of the results set's variables values."""
+        return [self.data[v] for v in self.variables]
+
+
+class ac_sens_solution(ac_solution):
+    """AC sensitivity results
+
+    The complex derivatives of each output with respect to each parameter
+    are accessible with keys such as ``dV(out)/dR1``.
+
+    **Parameters:**
+
+    circ : circuit instance
+        the circuit instance of the simulated circuit
+    start : float
+       the sweep frequency start value, in Hz.
+    stop : float
+       the sweep frequency stop value, in Hz.
+    points : int
+       the sweep total points.
+    stype : str
+       the type of sweep, ``"LOG"`` or ``"LIN"``.
+    op : op_solution
+       the linearization Operating Point used to compute the results.
+    outputs : list of strings
+       the outputs, eg. ``'V(out)'`` or ``'I(V1)'``.
+    parameters : list of strings
+       the parameters, see :func:`ahkab.sens.get_parameters`.
+    outfile: str
+        the file to write the results to.  Use ``"stdout"`` to write to the
+        standard output.
+    """
+    def __init__(self, circ, start, stop, points, stype, op, outputs,
+                 parameters, outfile):
+        solution.__init__(self, circ, outfile)
+        self.sol_type = "SENS"
+        self.linearization_op = op
+        self.stype = stype
+        self.ostart, self.ostop, self.opoints = start, stop, points
+        self.outputs, self.parameters = outputs, parameters
+
+        self.variables += ["f"]
+        self.units.update({"f": "Hz"})
+        for output in outputs:
+            for parameter in parameters:
+                self.variables += ["d%s/d%s" % (output, parameter)]
+        self._set_saved_variables(None)
+        self.csv_headers = [self.variables[0]]
+        for i in range(1, len(self.variables)):
+            self.csv_headers.append("|%s|" % self.variables[i])
+            self.csv_headers.append("arg(%s)" % self.variables[i])
+
+    def __str__(self):
+        return ("<AC SENS simulation results for '%s' (netlist %s). Outputs " +
+                "%s, %s sweep, from %g to %g Hz, %d points. Run on %s, data " +
+                "file %s>") % (self.netlist_title, self.netlist_file,
+                               ", ".join(self.outputs), self.stype,
+                               self.ostart, self.ostop, self.opoints,
+                               self.timestamp, self.filename)
+
+
 class dc_solution(solution, _mutable_data):
     """DC results
 
@@ -729,8 +1244,12 @@ class dc_solution(solution, _mutable_data):
        outfile : str
            the filename of the file where the results will be written.
            Use ``"stdout"`` to write to std output.
+       save : list of strings, optional
+           the variables to be stored, see :func:`match_saved_variable`.
+           If unset, all of them are stored.
     """
-    def __init__(self, circ, start, stop, sweepvar, stype, outfile):
+    def __init__(self, circ, start, stop, sweepvar, stype, outfile,
+                 save=None):
         solution.__init__(self, circ, outfile)
         self.sol_type = "DC"
         self.start, self.stop = start, stop
@@ -757,6 +1276,8 @@ class dc_solution(solution, _mutable_data):
                 self.variables += [varname]
                 self.units.update({varname:"A"})
 
+        self._set_saved_variables(save)
+
     def __str__(self):
         return ("<DC simulation results for '%s' (netlist %s). %s sweep of" +
                 " %s from %g to %g %s. Run on %s, data file %s>") % \
@@ -770,8 +1291,9 @@ class dc_solution(solution, _mutable_data):
         This method adds an OP solution and
         its corresponding sweep value to the results set.
         """
+        self._update_measures(sweepvalue, op.asarray())
         sweepvalue = np.array([[sweepvalue]])
-        x = op.asarray()
+        x = self._select_saved(op.asarray())
         data = np.concatenate((sweepvalue, x), axis=0)
         self._add_data(data)
 
@@ -799,13 +1321,23 @@ class tran_solution(solution, _mutable_data):
     outfile : str
         the filename of the save file.
         Use "stdout" to write to the standard output.
+    save : list of strings, optional
+        the variables to be stored, see :func:`match_saved_variable`.
+        If unset, all of them are stored.
     """
-    def __init__(self, circ, tstart, tstop, op, method, outfile):
+    def __init__(self, circ, tstart, tstop, op, method, outfile, save=None):
         solution.__init__(self, circ, outfile)
         self.sol_type = "TRAN"
         self.start_op = op
         self.tstart, self.tstop = tstart, tstop
         self.method = method
+        #: the ``(time, period)`` at which the periodic steady state was
+        #: detected, if the analysis was stopped early, see
+        #: :mod:`ahkab.steady_state`.
+        self.steady_state = None
+        #: the sensitivities of the output functionals, if requested, see
+        #: :class:`ahkab.sens.TransientSensitivity`.
+        self.sensitivities = None
 
         self._lock = False
 
@@ -826,6 +1358,8 @@ class tran_solution(solution, _mutable_data):
                 self.variables += [varname]
                 self.units.update({varname:"A"})
 
+        self._set_saved_variables(save)
+
     def __str__(self):
         return ("<TRAN simulation results for '%s' (netlist %s), from %g s to" +
                 " %g s. Diff. method %s. Run on %s, data file %s>") % \
@@ -836,8 +1370,9 @@ class tran_solution(solution, _mutable_data):
         """This method adds a solution and its corresponding time value to the results set.
         """
         if not self._lock:
+            self._update_measures(time, x)
             time = np.array([[time]])
-            data = np.concatenate((time, x), axis=0)
+            data = np.concatenate((time, self._select_saved(x)), axis=0)
             self._add_data(data)
         else:
             raise RuntimeError("Attempting to add values to a complete " +
@@ -867,6 +1402,9 @@ class pss_solution(solution, _mutable_data):
     outfile : str
         the filename of the save file.
         Use "stdout" to write to the std output.
+    save : list of strings, optional
+        the variables to be stored, see :func:`match_saved_variable`.
+        If unset, all of them are stored.
 
     .. note::
 
@@ -874,7 +1412,7 @@ class pss_solution(solution, _mutable_data):
         :func:`set_results` to initialize its data.
 
     """
-    def __init__(self, circ, method, period, outfile):
+    def __init__(self, circ, method, period, outfile, save=None):
         solution.__init__(self, circ, outfile)
         self.sol_type = "PSS"
         self.period = period
@@ -898,6 +1436,8 @@ class pss_solution(solution, _mutable_data):
                 self.variables += [varname]
                 self.units.update({varname:"A"})
 
+        self._set_saved_variables(save)
+
     def __str__(self):
         return ("<PSS simulation results for '%s' (netlist %s), period %g s. " +
                 "Method: %s. Run on %s, data file %s>") % \
@@ -924,7 +1464,7 @@ class pss_solution(solution, _mutable_data):
 
         """
         time = np.array(t)
-        data = np.concatenate((time, x), axis=0)
+        data = np.concatenate((time, self._select_saved(x)), axis=0)
         self._add_data(data)
 
     def asarray(self):
@@ -1264,6 +1804,50 @@ class pz_solution(solution, _mutable_data):
         return self.variables[self.iter_index], \
                self.data[self.variables[self.iter_index]]
 
+def _normalize_save_patterns(save):
+    if not isinstance(save, (list, tuple)):
+        save = [save]
+    patterns = []
+    for p in save:
+        p = p.strip().upper()
+        m = re.match(r'^V\((.*)\)$', p)
+        if m:
+            # V(out) is stored as VOUT
+            p = 'V' + m.group(1)
+        patterns.append(p)
+    return patterns
+
+
+def match_saved_variable(varname, save):
+    """Check whether a variable is selected by a list of save patterns.
+
+    The patterns may be written as:
+
+    - ``V(<node>)`` or ``V<node>`` for a node voltage,
+    - ``I(<element>)`` for the current flowing in a voltage-defined element,
+
+    where shell-style wildcards (``*``, ``?`` and ``[seq]``) can be used,
+    eg. ``V(out*)`` or ``I(V*)``. The comparison is case-insensitive.
+
+    **Parameters:**
+
+    varname : str
+        the variable name, as found in a solution object (eg. ``'VOUT'``).
+    save : list of strings
+        the save patterns.
+
+    **Returns:**
+
+    match : bool
+        ``True`` if ``varname`` matches any of the patterns.
+    """
+    varname = varname.upper()
+    for p in _normalize_save_patterns(save):
+        if fnmatch.fnmatchcase(varname, p):
+            return True
+    return False
+
+
 class case_insensitive_dict(object):
     """A dictionary that uses case-insensitive strings as keys.
     """
@@ -0,0 +1,888 @@
+# -*- coding: iso-8859-1 -*-
+# sens.py
+# Sensitivity analysis module
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the methods required to perform a sensitivity (SENS)
+analysis: the derivatives of some outputs, node voltages or currents, with
+respect to all the parameters of the circuit elements, at the Operating
+Point, over a frequency sweep or at the end of a transient analysis.
+
+.. note::
+
+    Typically, the user does not need to call the functions in this module
+    directly, instead, we recommend defining a SENS analysis object through
+    the convenience method :func:`ahkab.ahkab.new_sens` and then running it
+    calling :func:`ahkab.ahkab.run`.
+
+The parameters
+--------------
+
+The parameters considered are, see :func:`get_parameters`:
+
+* the values of resistors, capacitors, inductors and voltage-controlled
+  current sources, labeled with their ``part_id``, eg. ``R1``,
+* the DC values of independent sources, labeled as above, eg. ``V1``,
+* the instance parameters of diodes and MOS transistors: the area of the
+  former and the width and length of the latter, eg. ``M1.W``,
+* the main parameters of their models, labeled with the model name, eg.
+  ``nch.VTO``. The derivative is taken with respect to the value the model
+  uses at the simulation temperature.
+
+The derivatives of the linear elements are exact, those of the non-linear
+devices are computed perturbing the parameter, see
+``options.sens_rel_step``. Only the device itself is evaluated again, the
+circuit is never solved more than once.
+
+The adjoint method
+------------------
+
+The Operating Point (OP) :math:`x` of the circuit is the solution of
+:math:`F(x, p) = 0`, where :math:`p` are the parameters. The sensitivity of
+an output :math:`o = c^T x` is then
+
+.. math::
+
+    \\frac{do}{dp} = - c^T J^{-1} \\frac{\\partial F}{\\partial p} =
+    - y^T \\frac{\\partial F}{\\partial p},
+
+where :math:`J` is the Jacobian of :math:`F` and :math:`y` is the solution
+of the adjoint system :math:`J^T y = c`. A single solution per output gives
+the derivatives with respect to all the parameters: the cost of the
+analysis does not depend on their number.
+
+The AC sensitivities are computed in the same way, at each frequency,
+with one forward solution and one adjoint solution per output of the AC
+system, sharing the same factorization. If the circuit is non-linear, the
+parameters also affect its small-signal behavior shifting the OP: that
+contribution is accounted for with one more adjoint solution of the DC
+system, whose factorization is computed once.
+
+Transient sensitivities
+-----------------------
+
+The sensitivities of the final values of some outputs, or of their
+integrals over time, with respect to all the parameters can be computed
+at the end of a transient analysis, see the ``sens_outputs`` parameter of
+:func:`ahkab.transient.transient_analysis`. The adjoint system is
+integrated backwards in time, from the last time point to the first, with
+the transposed Jacobians of each time step, see
+:class:`TransientSensitivity`: the cost is about that of a second
+transient analysis, whatever the number of parameters.
+
+Module reference
+----------------
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import copy
+import re
+
+import numpy as np
+import scipy.sparse
+
+from . import ac
+from . import circuit
+from . import components
+from . import dc_analysis
+from . import diode
+from . import ekv
+from . import expint
+from . import mosq
+from . import options
+from . import printing
+from . import py3compat
+from . import results
+from . import tf
+from . import utilities
+
+specs = {'sens': {'tokens': ({
+                             'label': 'output',
+                             'pos': 0,
+                             'type': str,
+                             'needed': True,
+                             'dest': 'outputs',
+                             'default': None
+                             },
+                             {
+                             'label': 'type',
+                             'pos': 1,
+                             'type': str,
+                             'needed': False,
+                             'dest': 'sweep_type',
+                             'default': options.ac_log_step
+                             },
+                             {
+                             'label': 'nsteps',
+                             'pos': 2,
+                             'type': float,
+                             'needed': False,
+                             'dest': 'points',
+                             'default': None
+                             },
+                             {
+                             'label': 'start',
+                             'pos': 3,
+                             'type': float,
+                             'needed': False,
+                             'dest': 'start',
+                             'default': None
+                             },
+                             {
+                             'label': 'stop',
+                             'pos': 4,
+                             'type': float,
+                             'needed': False,
+                             'dest': 'stop',
+                             'default': None
+                             })
+                 }
+         }
+
+# the parameters of the non-linear devices: the attribute holding the
+# model, the instance and the model parameters
+_DEVICE_PARAMETERS = ((diode.diode, 'model', ('AREA',),
+                       ('IS', 'N', 'ISR', 'NR', 'RS')),
+                      (mosq.mosq_device, 'mosq_model', ('W', 'L'),
+                       ('VTO', 'KP', 'LAMBDA', 'GAMMA', 'PHI')),
+                      (ekv.ekv_device, 'ekv_model', ('W', 'L'),
+                       ('VTO', 'KP', 'LAMBDA', 'GAMMA', 'PHI')))
+
+
+def sens_analysis(circ, outputs, start=None, points=None, stop=None,
+                  sweep_type=None, x0=None, outfile="stdout", verbose=3):
+    """Performs a sensitivity analysis.
+
+    If ``start``, ``stop`` and ``points`` are not set, the sensitivities of
+    the DC outputs at the Operating Point are computed, otherwise those of
+    the AC outputs over a frequency sweep.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit to be simulated.
+
+    outputs : string or list of strings
+        The outputs: node voltages, eg. ``'V(out)'``, ``'V(outp,outn)'`` or
+        simply ``'out'``, or currents in voltage-defined elements, eg.
+        ``'I(V1)'``.
+
+    start : float, optional
+        The start frequency, in Hz.
+
+    points : float, optional
+        The number of points to be used to discretize the
+        ``[start, stop]`` interval.
+
+    stop : float, optional
+        The stop frequency, in Hz.
+
+    sweep_type : string, optional
+        Either ``options.ac_log_step`` (ie ``'LOG'``), the default, or
+        ``options.ac_lin_step`` (ie ``'LIN'``).
+
+    x0 : OP results instance, optional
+        The Operating Point. If not set and the circuit is non-linear, it
+        will be computed running an OP analysis.
+
+    outfile : string, optional
+        The name of the file where the results will be written. Set to
+        ``'stdout'`` to write to the standard output.
+
+    verbose : int, optional
+        The verbosity level, from 0 (silent) to 6 (debug).
+
+    **Returns:**
+
+    sol : SENS solution
+        The DC sensitivities, see :class:`ahkab.results.sens_solution`, or
+        the AC sensitivities, see :class:`ahkab.results.ac_sens_solution`.
+
+    :raises ValueError: if the parameters are out of their valid range.
+
+    :raises RuntimeError: if the circuit is non-linear and can't be
+        linearized.
+    """
+    if outfile == 'stdout':
+        verbose = 0
+    if type(outputs) in py3compat.string_types or \
+       (isinstance(outputs, tuple) and
+        all(type(o) in py3compat.string_types for o in outputs) and
+        not re.match(r'^\s*[VI]\s*\(', outputs[0], re.IGNORECASE)):
+        outputs = [outputs]
+    sweep = start is not None or stop is not None or points is not None
+    if sweep and (start is None or stop is None or points is None):
+        raise ValueError("SENS analysis needs start, stop and the number " +
+                         "of points to perform a frequency sweep")
+    if sweep:
+        if start == 0:
+            raise ValueError("SENS analysis has start frequency = 0")
+        if start > stop:
+            raise ValueError("SENS analysis has start > stop")
+        if points < 2 and not start == stop:
+            raise ValueError("SENS analysis has number of points < 2 & " +
+                             "start != stop")
+        if sweep_type is None or sweep_type.upper() == options.ac_log_step:
+            omegas = utilities.log_axis_iterator(2*np.pi*start, 2*np.pi*stop,
+                                                 points)
+        elif sweep_type.upper() == options.ac_lin_step:
+            omegas = utilities.lin_axis_iterator(2*np.pi*start, 2*np.pi*stop,
+                                                 points)
+        else:
+            raise ValueError("Unknown sweep type %s" % sweep_type)
+        omegas = np.array(list(omegas))
+
+    printing.print_info_line(("Starting SENS analysis: ", 1), verbose)
+    if x0 is None and not (sweep and not circ.is_nonlinear()):
+        # the DC sensitivities of linear circuits depend on the OP as well
+        printing.print_info_line(("Starting OP analysis...", 3), verbose,
+                                 print_nl=False)
+        x0 = dc_analysis.op_analysis(circ, verbose=0)
+        if x0 is None:
+            printing.print_info_line(("failed.", 3), verbose)
+            raise RuntimeError("OP analysis failed, no Operating Point " +
+                               "available.")
+        printing.print_info_line(("done.", 3), verbose)
+    A0, AC, x0 = tf.get_linearized_system(circ, x0, verbose)
+    size = A0.shape[0]
+    if x0 is not None:
+        xop = x0.asarray() if hasattr(x0, 'asarray') else x0
+    else:
+        xop = np.zeros((size, 1))
+    labels, C = [], np.zeros((size, len(outputs)))
+    for k, output in enumerate(outputs):
+        label, C[:, k:k + 1] = get_output_vector(circ, output, size)
+        labels.append(label)
+    params = get_parameters(circ)
+    printing.print_info_line(("%d parameters, %d outputs" %
+                              (len(params), len(outputs)), 3), verbose)
+    # the derivatives of the DC equations with respect to the parameters
+    linear = get_linear_derivatives(circ, params, size)
+    devices = get_device_derivatives(params, xop, size)
+    R = get_residual_derivatives(linear, devices, xop, size, len(params))
+
+    printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
+    try:
+        solve = tf._factorize(A0)
+    except (np.linalg.LinAlgError, RuntimeError):
+        printing.print_general_error("The DC matrix is singular.")
+        printing.print_info_line(("failed.", 1), verbose)
+        return None
+    if not sweep:
+        # one adjoint solve per output
+        Y = solve(C, trans=True)
+        S = -R.T.dot(Y).T
+        sol = results.sens_solution(circ, outputs=labels,
+                                    parameters=[p[0] for p in params],
+                                    values=[p[1] for p in params],
+                                    sensitivities=S, op=x0, outfile=outfile)
+        printing.print_info_line(("done.", 1), verbose)
+        return sol
+
+    sol = results.ac_sens_solution(circ, start=start, stop=stop,
+                                   points=points, stype=sweep_type, op=x0,
+                                   outputs=labels,
+                                   parameters=[p[0] for p in params],
+                                   outfile=outfile)
+    Nac = utilities.remove_row(ac._generate_Nac(circ), rrow=0)
+    bias = get_bias_derivatives(circ, xop, size) if circ.is_nonlinear() \
+           else None
+    # the conductances of both the linear and the non-linear elements
+    dG = tuple(np.hstack(e) for e in zip(linear[0], devices[1]))
+    for omega in omegas:
+        try:
+            solve_ac = tf._factorize(A0 + 1j*omega*AC)
+        except (np.linalg.LinAlgError, RuntimeError):
+            printing.print_general_error("The AC matrix is singular at " +
+                                         "f = %g Hz." % (omega/np.pi/2,))
+            printing.print_info_line(("failed.", 1), verbose)
+            return None
+        x = solve_ac(-Nac)
+        Y = solve_ac(C.astype(complex), trans=True)
+        S = np.zeros((len(outputs), len(params)), dtype=complex)
+        for k in range(len(outputs)):
+            y = Y[:, k:k + 1]
+            # the small-signal matrix depends on the parameters...
+            S[k, :] = -_contract(dG, y, x, len(params)) - \
+                      1j*omega*_contract(linear[1], y, x, len(params))
+            # ... and on the OP, which depends on them as well
+            if bias is not None:
+                q = -_contract(bias, y, x, size)
+                z = solve(q.reshape((-1, 1)), trans=True)
+                S[k, :] -= R.T.dot(z)[:, 0]
+        sol.add_lines(np.array([omega/np.pi/2]), S.reshape((-1, 1)))
+    printing.print_info_line(("done.", 1), verbose)
+    return sol
+
+
+def get_parameters(circ):
+    """Get the parameters of the elements of a circuit.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    **Returns:**
+
+    params : list of tuples
+        The parameters, as tuples of ``(label, value, elems, attr)``, where
+        ``elems`` is the list of the elements depending on the parameter and
+        ``attr`` is ``None`` for the linear elements and the tuple
+        ``(owner, name)`` for the non-linear devices, the parameter being
+        ``elem.<owner>.<name>``.
+    """
+    params = []
+    models = {}
+    for elem in circ:
+        if isinstance(elem, components.Resistor):
+            params.append((elem.part_id, elem.value, [elem], None))
+        elif isinstance(elem, (components.Capacitor, components.Inductor)):
+            params.append((elem.part_id, elem.value, [elem], None))
+        elif isinstance(elem, components.sources.GISource):
+            params.append((elem.part_id, elem.alpha, [elem], None))
+        elif isinstance(elem, (components.sources.VSource,
+                               components.sources.ISource)):
+            params.append((elem.part_id, elem.dc_value, [elem], None))
+        for cls, model_attr, instance, model in _DEVICE_PARAMETERS:
+            if not isinstance(elem, cls):
+                continue
+            for name in instance:
+                params.append(("%s.%s" % (elem.part_id, name),
+                               getattr(elem.device, name), [elem],
+                               ('device', name)))
+            m = getattr(elem, model_attr)
+            if m.name not in models:
+                models[m.name] = len(params)
+                for name in model:
+                    params.append(("%s.%s" % (m.name, name),
+                                   getattr(m, name), [], (model_attr, name)))
+            for i in range(len(model)):
+                params[models[m.name] + i][2].append(elem)
+    return params
+
+
+def get_output_vector(circ, output, size):
+    """Get the vector selecting an output in the solution of a circuit.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    output : string or tuple of strings
+        A node voltage, see :func:`ahkab.tf.get_output_port`, or the current
+        in a voltage-defined element, eg. ``'I(V1)'``.
+
+    size : int
+        The size of the reduced MNA matrix.
+
+    **Returns:**
+
+    label : string
+        The output label, eg. ``'V(out)'``.
+
+    c : ndarray
+        The output is :math:`c^T x`.
+
+    :raises ValueError: if the output is not found in the circuit.
+    """
+    c = np.zeros((size, 1))
+    m = re.match(r'^\s*I\s*\(\s*(\w+)\s*\)\s*$', output, re.IGNORECASE) \
+        if type(output) in py3compat.string_types else None
+    if m:
+        elem = circ.get_elem_by_name(m.group(1))
+        if elem is None or not circuit.is_elem_voltage_defined(elem):
+            raise ValueError("No voltage-defined element %s in the circuit." %
+                             m.group(1))
+        c[circ.get_nodes_number() - 1 + circ.find_vde_index(elem), 0] = 1.
+        return "I(%s)" % elem.part_id, c
+    n1, n2 = tf.get_output_port(circ, output)
+    if n1:
+        c[n1 - 1, 0] += 1.
+    if n2:
+        c[n2 - 1, 0] -= 1.
+    if not n2:
+        return "V(%s)" % circ.nodes_dict[n1], c
+    return "V(%s,%s)" % (circ.nodes_dict[n1], circ.nodes_dict[n2]), c
+
+
+def get_linear_derivatives(circ, params, size):
+    """Get the derivatives of the matrices of the linear elements.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    params : list of tuples
+        The parameters, see :func:`get_parameters`.
+
+    size : int
+        The size of the reduced MNA matrix.
+
+    **Returns:**
+
+    dG, dC, dN : tuples of ndarrays
+        The derivatives of the MNA matrix, of the matrix multiplying the
+        time derivatives of the unknowns (the AC matrix) and of the constant
+        term of the equations, as tuples of ``(p, i, j, value)`` (or
+        ``(p, i, value)`` for the last), holding the parameter index, the
+        row, the column and the value of each non-zero entry.
+    """
+    dG, dC, dN = [], [], []
+    nv_1 = circ.get_nodes_number() - 1
+    for p, (_, value, elems, attr) in enumerate(params):
+        if attr is not None:
+            continue
+        elem = elems[0]
+        if isinstance(elem, components.Resistor):
+            dG += _outer(p, elem.n1, elem.n2, elem.n1, elem.n2, -1./value**2)
+        elif isinstance(elem, components.Capacitor):
+            dC += _outer(p, elem.n1, elem.n2, elem.n1, elem.n2, 1.)
+        elif isinstance(elem, components.Inductor):
+            index = nv_1 + circ.find_vde_index(elem)
+            dC.append((p, index, index, -1.))
+        elif isinstance(elem, components.sources.GISource):
+            dG += _outer(p, elem.n1, elem.n2, elem.sn1, elem.sn2, 1.)
+        elif isinstance(elem, components.sources.VSource):
+            dN.append((p, nv_1 + circ.find_vde_index(elem), -1.))
+        elif isinstance(elem, components.sources.ISource):
+            dN += [(p, n - 1, v) for n, v in ((elem.n1, 1.), (elem.n2, -1.))
+                   if n]
+    return (_entries(dG, 4), _entries(dC, 4), _entries(dN, 3))
+
+
+def get_device_derivatives(params, x, size):
+    """Get the derivatives of the currents and the conductances of the
+    non-linear devices.
+
+    **Parameters:**
+
+    params : list of tuples
+        The parameters, see :func:`get_parameters`.
+
+    x : ndarray
+        The point where the derivatives are evaluated.
+
+    size : int
+        The size of the reduced MNA matrix.
+
+    **Returns:**
+
+    dT, dJ : tuples of ndarrays
+        The derivatives of the currents, as ``(p, i, value)``, and of the
+        conductances, as ``(p, i, j, value)``, see
+        :func:`get_linear_derivatives`.
+    """
+    dT, dJ = [], []
+    for p, (_, value, elems, attr) in enumerate(params):
+        if attr is None:
+            continue
+        # central differences, forward ones for parameters set to zero,
+        # which may change the device equations, eg. RS
+        h = options.sens_rel_step*abs(value)
+        steps = ((value + h, 1./(2*h)), (value - h, -1./(2*h))) if h else \
+                ((options.sens_rel_step, 1./options.sens_rel_step),
+                 (value, -1./options.sens_rel_step))
+        for elem in elems:
+            for v, w in steps:
+                it, iv, gi, gj, gv = get_stamps(_get_perturbed(elem, attr, v),
+                                                x)
+                dT += [(p, i, w*val) for i, val in zip(it, iv)]
+                dJ += [(p, i, j, w*val) for i, j, val in zip(gi, gj, gv)]
+    return _entries(dT, 3), _entries(dJ, 4)
+
+
+def get_bias_derivatives(circ, x, size):
+    """Get the derivatives of the conductances of the non-linear devices
+    with respect to the unknowns.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    x : ndarray
+        The point where the derivatives are evaluated.
+
+    size : int
+        The size of the reduced MNA matrix.
+
+    **Returns:**
+
+    dJ : tuple of ndarrays
+        The derivatives, as ``(k, i, j, value)``, where ``k`` is the index
+        of the unknown, see :func:`get_linear_derivatives`.
+    """
+    dJ = []
+    for elem in circ:
+        if not elem.is_nonlinear:
+            continue
+        nodes = set(n for index in range(len(elem.get_output_ports()))
+                    for port in elem.get_drive_ports(index) for n in port
+                    if n)
+        for n in nodes:
+            h = options.sens_rel_step*max(abs(x[n - 1, 0]), 1.)
+            for sign in (1., -1.):
+                xp = x.copy()
+                xp[n - 1, 0] += sign*h
+                _, _, gi, gj, gv = get_stamps(elem, xp)
+                dJ += [(n - 1, i, j, sign*val/(2*h))
+                       for i, j, val in zip(gi, gj, gv)]
+    return _entries(dJ, 4)
+
+
+def get_residual_derivatives(linear, devices, x, size, n_params):
+    """Get the derivatives of the DC equations with respect to the
+    parameters.
+
+    **Parameters:**
+
+    linear : tuple
+        The derivatives of the linear elements, see
+        :func:`get_linear_derivatives`.
+
+    devices : tuple
+        The derivatives of the non-linear devices at ``x``, see
+        :func:`get_device_derivatives`.
+
+    x : ndarray
+        The point where the derivatives are evaluated.
+
+    size : int
+        The size of the reduced MNA matrix.
+
+    n_params : int
+        The number of parameters.
+
+    **Returns:**
+
+    R : sparse matrix
+        The derivatives, one column per parameter.
+    """
+    np_, ni, nv = linear[2]
+    tp, ti, tv = devices[0]
+    rows = np.hstack((ni, ti)).astype(int)
+    cols = np.hstack((np_, tp)).astype(int)
+    return _product(linear[0], x, size, n_params) + \
+           scipy.sparse.csc_matrix((np.hstack((nv, tv)), (rows, cols)),
+                                   shape=(size, n_params))
+
+
+def get_stamps(elem, x):
+    """Get the currents and the conductances of a non-linear element.
+
+    They are the contributions of the element to the equations and to
+    their Jacobian, see :func:`ahkab.dc_analysis.mdn_solver`.
+
+    **Parameters:**
+
+    elem : circuit element
+        The non-linear element.
+
+    x : ndarray
+        The solution vector.
+
+    **Returns:**
+
+    it, iv : lists
+        The rows and the values of the currents.
+
+    gi, gj, gv : lists
+        The rows, the columns and the values of the conductances.
+    """
+    it, iv, gi, gj, gv = [], [], [], [], []
+    for index, (n1, n2) in enumerate(elem.get_output_ports()):
+        dports = elem.get_drive_ports(index)
+        v = [(x[d1 - 1, 0] if d1 else 0.) - (x[d2 - 1, 0] if d2 else 0.)
+             for d1, d2 in dports]
+        if hasattr(elem, 'gstamp') and hasattr(elem, 'istamp'):
+            iis, gs = elem.gstamp(v, None)
+            gi += list(iis[0])
+            gj += list(iis[1])
+            gv += list(gs.reshape(-1))
+            iis, i = elem.istamp(v, None)
+            it += list(iis[0])
+            iv += list(i.reshape(-1))
+            continue
+        i = elem.i(index, v, None)
+        outs = [(n - 1, s) for n, s in ((n1, 1.), (n2, -1.)) if n]
+        for row, s in outs:
+            it.append(row)
+            iv.append(s*i)
+        for k, (d1, d2) in enumerate(dports):
+            g = elem.g(index, v, k, None)
+            for row, s in outs:
+                for d, t in ((d1, 1.), (d2, -1.)):
+                    if d:
+                        gi.append(row)
+                        gj.append(d - 1)
+                        gv.append(s*t*g)
+    return it, iv, gi, gj, gv
+
+
+class TransientSensitivity(object):
+    """Adjoint sensitivities of a transient analysis.
+
+    The sensitivities of an output functional, either the final value of
+    an output or its integral over time, with respect to all the
+    parameters of the circuit, see :func:`get_parameters`, are computed
+    with a single backward pass, whatever the number of the parameters.
+
+    The accepted time points of the transient analysis are fed to
+    :func:`add`. Only the times and one solution every
+    ``options.transient_sens_checkpoint_steps`` are kept: the others are
+    recomputed from the closest checkpoint during the backward pass, run by
+    :func:`solve`.
+
+    The adjoint is that of the trapezoidal rule (of implicit Euler, if
+    ``trap`` is not set) on the accepted time points, with an implicit
+    Euler first step: it is exact for the ``TRAP`` and ``IMPLICIT_EULER``
+    methods and accurate to the integration error for the others.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit.
+    outputs : list of strings
+        The outputs, see :func:`get_output_vector`.
+    functional : string
+        ``'final'``, for the values of the outputs at the last time point,
+        or ``'integ'``, for their integrals over time.
+    tstart : float
+        The start time.
+    x0 : ndarray
+        The initial conditions.
+    mna, N, D : ndarrays
+        The reduced matrices of the transient analysis, see
+        :mod:`ahkab.transient`.
+    trap : boolean, optional
+        Whether the trapezoidal rule is used, defaults to ``True``.
+    initial_op : boolean, optional
+        Whether ``x0`` is the Operating Point of the circuit, which then
+        depends on the parameters as well. Defaults to ``False``.
+    """
+    def __init__(self, circ, outputs, functional, tstart, x0, mna, N, D,
+                 trap=True, initial_op=False):
+        if functional.lower() not in ('final', 'integ'):
+            raise ValueError("Unknown sensitivity functional %s." %
+                             functional)
+        self.circ = circ
+        self.functional = functional.lower()
+        self.trap, self.initial_op = trap, initial_op
+        self.mna, self.N, self.D = mna, N, D
+        size = mna.shape[0]
+        self._G = mna + dc_analysis.build_gmin_matrix(circ, options.gmin, size,
+                                                      0)
+        if type(outputs) in py3compat.string_types:
+            outputs = [outputs]
+        #: the output labels, eg. ``'integ(V(out))'``
+        self.outputs = []
+        self._C = np.zeros((size, len(outputs)))
+        for k, output in enumerate(outputs):
+            label, self._C[:, k:k + 1] = get_output_vector(circ, output, size)
+            self.outputs.append(label if self.functional == 'final' else
+                                "integ(%s)" % label)
+        #: the parameters, see :func:`get_parameters`
+        self.params = get_parameters(circ)
+        self._linear = get_linear_derivatives(circ, self.params, size)
+        # the DC values of the time-dependent sources have no effect
+        np_, ni, nv = self._linear[2]
+        fixed = [p for p, (_, _, elems, attr) in enumerate(self.params)
+                 if attr is None and getattr(elems[0], 'is_timedependent',
+                                             False)]
+        keep = ~np.in1d(np_, fixed)
+        self._dN = (np_[keep], ni[keep], nv[keep])
+        self._times = [tstart]
+        self._stored = {0: x0.copy()}
+        self._last = x0.copy()
+
+    def add(self, t, x):
+        """Add the solution ``x`` at the accepted time point ``t``."""
+        self._times.append(t)
+        self._last = x.copy()
+        if (len(self._times) - 1) % options.transient_sens_checkpoint_steps == 0:
+            self._stored[len(self._times) - 1] = x.copy()
+
+    def solve(self, verbose=3):
+        """Run the backward pass.
+
+        **Parameters:**
+
+        verbose : int, optional
+            The verbosity level, from 0 (silent) to 6 (debug).
+
+        **Returns:**
+
+        sol : SENS solution
+            The sensitivities, see :class:`ahkab.results.sens_solution`.
+
+        :raises RuntimeError: if the solutions between the checkpoints
+            can't be recomputed.
+        """
+        printing.print_info_line(("Starting the adjoint transient " +
+                                  "sensitivity analysis...", 3), verbose,
+                                 print_nl=False)
+        times = np.array(self._times)
+        K, P = len(times) - 1, len(self.params)
+        size = self.mna.shape[0]
+        # the weights of the outputs in the functional, at each time point
+        weights = np.zeros((K + 1,))
+        if self.functional == 'final':
+            weights[K] = 1.
+        else:
+            h = np.diff(times)
+            weights[:-1] += h/2.
+            weights[1:] += h/2.
+        S = np.zeros((len(self.outputs), P))
+        Y, B = None, None
+        # each step needs the linearization at both its ends
+        G_prev, F_prev = self._linearize(self._last, self._dN)
+        checkpoints = sorted(self._stored)
+        for start, stop in reversed(list(zip(checkpoints,
+                                             checkpoints[1:] + [K]))):
+            states = self._recompute(start, stop)
+            for k in range(stop, start, -1):
+                x, x_prev = states[k - start], states[k - start - 1]
+                h, theta = times[k] - times[k - 1], self._get_theta(k)
+                G, Fx = G_prev, F_prev
+                G_prev, F_prev = self._linearize(x_prev, self._dN)
+                rhs = weights[k]*self._C
+                if Y is not None:
+                    rhs = rhs - B.T.dot(Y)
+                Y = tf._factorize(self.D/h + theta*G)(rhs, trans=True)
+                dR = _product(self._linear[1], x - x_prev, size, P)/h + \
+                     theta*Fx + (1 - theta)*F_prev
+                S -= dR.T.dot(Y).T
+                # x_prev enters the previous step too
+                B = -self.D/h + (1 - theta)*G_prev
+        if self.initial_op:
+            # x0 is the OP, it depends on the parameters
+            rhs = weights[0]*self._C
+            if Y is not None:
+                rhs = rhs - B.T.dot(Y)
+            G0, F0 = self._linearize(self._stored[0], self._linear[2])
+            Z = tf._factorize(G0)(rhs, trans=True)
+            S -= F0.T.dot(Z).T
+        printing.print_info_line(("done.", 3), verbose)
+        return results.sens_solution(self.circ, outputs=self.outputs,
+                                     parameters=[p[0] for p in self.params],
+                                     values=[p[1] for p in self.params],
+                                     sensitivities=S, op=None, outfile=None)
+
+    def _get_theta(self, k):
+        return .5 if self.trap and k > 1 else 1.
+
+    def _linearize(self, x, dN):
+        # the Jacobian of the equations and their derivatives with respect
+        # to the parameters, at x
+        size = x.shape[0]
+        G = self._G + ac._generate_J(xop=x, circ=self.circ,
+                                     reduced_mna_size=size) \
+            if self.circ.is_nonlinear() else self._G
+        devices = get_device_derivatives(self.params, x, size)
+        F = get_residual_derivatives((self._linear[0], None, dN), devices, x,
+                                     size, len(self.params))
+        return G, F
+
+    def _recompute(self, start, stop):
+        # the solutions at the time points from start to stop, solving
+        # again the steps from the checkpoint at start
+        states = [self._stored[start]]
+        for k in range(start + 1, stop + 1):
+            if k in self._stored:
+                states.append(self._stored[k])
+                continue
+            t, t_prev = self._times[k], self._times[k - 1]
+            h, theta = t - t_prev, self._get_theta(k)
+            x_prev = states[-1]
+            # theta f(x) + (1 - theta) f(x_prev) + D (x - x_prev)/h = 0
+            Ntran = -self.D.dot(x_prev)/(theta*h)
+            if theta != 1.:
+                Ntran += (1 - theta)/theta*self._get_f(x_prev, t_prev)
+            x, _, solved, _ = dc_analysis.dc_solve(
+                mna=self.mna + self.D/(theta*h), Ndc=self.N, Ntran=Ntran,
+                circ=self.circ, Gmin=self._G - self.mna, x0=x_prev, time=t,
+                locked_nodes=self.circ.get_locked_nodes(),
+                MAXIT=options.transient_max_nr_iter, verbose=0)
+            if not solved:
+                raise RuntimeError("Transient sensitivities: can't solve " +
+                                   "again the step at %g s." % t)
+            states.append(x)
+        return states
+
+    def _get_f(self, x, t):
+        # the static part of the equations, without D dx/dt
+        size = x.shape[0]
+        f = self._G.dot(x) + self.N + \
+            expint.get_source_vectors(self.circ, [t], size)
+        for elem in self.circ:
+            if elem.is_nonlinear:
+                it, iv, _, _, _ = get_stamps(elem, x)
+                np.add.at(f[:, 0], it, iv)
+        return f
+
+
+def _get_perturbed(elem, attr, value):
+    # a copy of elem, with the parameter set to value: the original device
+    # and model are left untouched, the caches of the model are bypassed
+    owner, name = attr
+    perturbed = copy.copy(elem)
+    if getattr(elem, 'opdict', None) is not None:
+        perturbed.opdict = dict(elem.opdict)
+    target = copy.copy(getattr(elem, owner))
+    setattr(target, name, value)
+    setattr(perturbed, owner, target)
+    if owner != 'device':
+        perturbed.device = copy.copy(elem.device)
+    return perturbed
+
+
+def _product(entries, x, size, n_params):
+    # the matrix whose column p is the sum of value*x[j]*e_i over the
+    # entries (p, i, j, value)
+    p, i, j, v = entries
+    return scipy.sparse.csc_matrix((v*x[j.astype(int), 0],
+                                    (i.astype(int), p.astype(int))),
+                                   shape=(size, n_params))
+
+
+def _outer(p, n1, n2, m1, m2, value):
+    # the entries of value*(e_n1 - e_n2)(e_m1 - e_m2)^T, in the reduced system
+    return [(p, a - 1, b - 1, value*s*t) for a, s in ((n1, 1.), (n2, -1.))
+            for b, t in ((m1, 1.), (m2, -1.)) if a and b]
+
+
+def _entries(entries, width):
+    # a list of tuples -> a tuple of arrays
+    if not entries:
+        return tuple(np.zeros((0,)) for _ in range(width))
+    return tuple(np.array(e) for e in zip(*entries))
+
+
+def _contract(entries, y, x, length):
+    # sum over the entries (k, i, j, value) of value*y[i]*x[j], for each k
+    k, i, j = (e.astype(int) for e in entries[:3])
+    v = entries[3]
+    w = v*y[i, 0]*x[j, 0]
+    return np.bincount(k, w.real, minlength=length) + \
+           1j*np.bincount(k, w.imag, minlength=length)
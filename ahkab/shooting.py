@@ -29,6 +29,7 @@ from . import transient
 from . import implicit_euler
 from . import dc_analysis
 from . import ticker
+from . import time_functions
 from . import options
 from . import circuit
 from . import printing
@@ -38,7 +39,8 @@ from . import components
 
 
 def shooting_analysis(circ, period, step=None, x0=None, points=None, autonomous=False,
-             matrices=None, outfile='stdout', vector_norm=lambda v: max(abs(v)), verbose=3):
+             matrices=None, outfile='stdout', vector_norm=lambda v: max(abs(v)), save=None,
+             verbose=3):
     """Performs a periodic steady state analysis based on the algorithm described in:
 
         Brambilla, A.; D'Amore, D., "Method for steady-state simulation of
@@ -90,6 +92,10 @@ def shooting_analysis(circ, period, step=None, x0=None, points=None, autonomous=
     outfile : string, optional
         The output filename. Please use ``stdout`` (the default) to print to the
         standard output.
+    save : list of strings, optional
+        The node voltages and currents to be stored, eg.
+        ``['V(out)', 'I(V1)']``. Shell-style wildcards are accepted.
+        If unset, all of them are stored.
     verbose : boolean, optional
         Verbosity switch (0-6). It is set to zero (print errors only)
         if ``outfile`` == 'stdout'``, as not to corrupt the data.
@@ -251,7 +257,7 @@ def shooting_analysis(circ, period, step=None, x0=None, points=None, autonomous=
         for index in range(1, points):
             xmat = numpy.concatenate((xmat, x[index].reshape(-1, 1)), axis=1)
         sol = results.pss_solution(circ=circ, method="shooting", period=period,
-                                   outfile=outfile)
+                                   outfile=outfile, save=save)
         sol.set_results(t, xmat)
         # print_results(circ, x, fdata, points, step)
     else:
@@ -277,31 +283,31 @@ def _build_static_MAass_and_MBass(mna, D, step):
 
 
 def _build_Tass_static_vector(circ, Tf, points, step, tick, n_of_var, verbose=3):
-    Tass_vector = []
     nv = circ.get_nodes_number()
     printing.print_info_line(("Building Tass...", 5), verbose, print_nl=False)
 
     tick.reset()
     tick.display(verbose > 2)
-    for index in range(0, points):
-        Tt = numpy.zeros((n_of_var,))
-        v_eq = 0
-        time = index * step
-        for elem in circ:
-            if (isinstance(elem, components.sources.VSource) or
-                isinstance(elem, components.sources.ISource)) and elem.is_timedependent:
-                # time dependent source
-                if isinstance(elem, components.sources.VSource):
-                    Tt[nv - 1 + v_eq] = -1.0 * elem.V(time)
-                elif isinstance(elem, components.sources.ISource):
-                    if elem.n1:
-                        Tt[elem.n1 - 1] = Tt[elem.n1 - 1] + elem.I(time)
-                    if elem.n2:
-                        Tt[elem.n2 - 1] = Tt[elem.n2 - 1] - elem.I(time)
-            if circuit.is_elem_voltage_defined(elem):
-                v_eq = v_eq + 1
+    # one row per time point, all sources are sampled at once
+    Tt = numpy.zeros((points, n_of_var))
+    times = np.arange(points) * step
+    v_eq = 0
+    for elem in circ:
+        if (isinstance(elem, components.sources.VSource) or
+            isinstance(elem, components.sources.ISource)) and elem.is_timedependent:
+            # time dependent source
+            if isinstance(elem, components.sources.VSource):
+                Tt[:, nv - 1 + v_eq] = -1.0 * time_functions.sample(elem.V, times)
+            elif isinstance(elem, components.sources.ISource):
+                it = time_functions.sample(elem.I, times)
+                if elem.n1:
+                    Tt[:, elem.n1 - 1] = Tt[:, elem.n1 - 1] + it
+                if elem.n2:
+                    Tt[:, elem.n2 - 1] = Tt[:, elem.n2 - 1] - it
+        if circuit.is_elem_voltage_defined(elem):
+            v_eq = v_eq + 1
         tick.step()
-        Tass_vector.append(Tf + Tt)
+    Tass_vector = [Tf + Tt[index, :] for index in range(points)]
     tick.hide(verbose > 2)
     printing.print_info_line(("done.", 5), verbose)
 
@@ -0,0 +1,224 @@
+# -*- coding: iso-8859-1 -*-
+# steady_state.py
+# Steady state detection in transient analyses
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Steady state detection in transient analyses.
+
+A transient analysis is in periodic steady state once its solution repeats
+itself period after period. The detector samples the solution
+``options.transient_steady_state_samples`` times per period and compares
+each sample with the one taken a period before: once they all agree within
+the tolerances set by ``options.vea``, ``options.ver``, ``options.iea`` and
+``options.ier``, the relative ones applied to the peak values over the
+period, for ``options.transient_steady_state_periods`` periods in a
+row, the circuit is settled and the analysis may be stopped at the end of
+the current period.
+
+The period is either supplied by the user or detected:
+
+* if some time-dependent sources are periodic, it is their common period,
+  see :func:`get_period`,
+* otherwise, as in free-running oscillators, it is estimated from the
+  solution itself, from the crossings of the node voltage with the widest
+  swing through its mid-level, see :func:`estimate_period`.
+
+Circuits with time constants much longer than the period may drift by less
+than the tolerances from one period to the next, long before they are
+settled: in that case, tighten the tolerances or raise
+``options.transient_steady_state_periods``.
+
+This is used by :func:`ahkab.transient.transient_analysis` when
+``steady_state`` is set.
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+from fractions import Fraction
+
+import numpy as np
+
+from . import components
+from . import options
+from . import time_functions
+
+
+def get_period(circ):
+    """Get the common period of the time-dependent sources of a circuit.
+
+    The sources with non-periodic time functions are not considered.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit.
+
+    **Returns:**
+
+    period : float or None
+        The least common multiple of the periods of the sources, or ``None``
+        if none of them is periodic.
+    """
+    periods = []
+    for elem in circ:
+        if (isinstance(elem, components.sources.VSource) or
+            isinstance(elem, components.sources.ISource)) and \
+           elem.is_timedependent:
+            periods += _get_function_periods(elem._time_function)
+    if not periods:
+        return None
+    period = periods[0]
+    for p in periods[1:]:
+        period *= Fraction(p/period).limit_denominator(1000).numerator
+    return period
+
+
+def estimate_period(t, v):
+    """Estimate the period of a waveform.
+
+    The rising crossings of ``v`` through the mid-level of its second half
+    are located, the waveform is considered periodic if the last two
+    intervals between them agree.
+
+    **Parameters:**
+
+    t : ndarray
+        The sampling times, uniformly spaced.
+    v : ndarray
+        The samples.
+
+    **Returns:**
+
+    period : float or None
+        The period, or ``None`` if the waveform doesn't look periodic.
+    """
+    half = len(v)//2
+    t, v = t[half:], v[half:]
+    if not len(v):
+        return None
+    level = (v.max() + v.min())/2.
+    rising = np.nonzero((v[:-1] < level) & (v[1:] >= level))[0]
+    if len(rising) < 3:
+        return None
+    crossings = t[rising] + (level - v[rising])/(v[rising + 1] - v[rising]) * \
+                (t[rising + 1] - t[rising])
+    intervals = np.diff(crossings[-3:])
+    if abs(intervals[1] - intervals[0]) > (t[1] - t[0]):
+        return None
+    return intervals[1]
+
+
+class SteadyStateDetector(object):
+    """Detect the periodic steady state of a transient analysis.
+
+    The detector is fed the solution at the times returned by
+    :func:`next_time`, with :func:`add`. The attribute ``settled`` is set
+    once the steady state is reached.
+
+    **Parameters:**
+
+    tstart : float
+        The start time.
+    period : float or None
+        The period. If ``None``, it is estimated from the solution, which is
+        then sampled every ``tstep``.
+    tstep : float
+        The sampling step used to estimate the period.
+    aerror, rerror : ndarrays
+        The absolute and relative tolerances of each variable.
+    nv : int
+        The number of nodes in the circuit, ground included.
+    """
+    def __init__(self, tstart, period, tstep, aerror, rerror, nv):
+        self.aerror, self.rerror = aerror, rerror
+        self.nv = nv
+        self.samples = options.transient_steady_state_samples
+        self.tstep = tstep
+        #: the period, detected or supplied
+        self.period = None
+        #: whether the steady state has been reached
+        self.settled = False
+        self._history = []
+        self._start = tstart
+        self._index = 1
+        self._next_estimate = 4*self.samples
+        if period is not None:
+            self._set_period(tstart, period)
+
+    def next_time(self):
+        """The time at which the next sample is to be taken."""
+        if self.period is None:
+            return self._start + self._index*self.tstep
+        return self._start + self._index*self.period/self.samples
+
+    def add(self, t, x):
+        """Add the solution ``x`` at time ``t``, see :func:`next_time`."""
+        self._index += 1
+        if self.period is None:
+            self._history.append(x[:self.nv - 1, 0].copy())
+            if len(self._history) >= self._next_estimate:
+                # at geometrically spaced times, the cost stays linear
+                self._next_estimate = max(int(1.25*len(self._history)),
+                                          len(self._history) + self.samples)
+                self._estimate_period(t)
+            return
+        self._history.append(x.copy())
+        if len(self._history) > self.samples:
+            x_old = self._history.pop(0)
+            # relative to the peak values over the last period, rather than
+            # to the instantaneous ones
+            peak = abs(np.hstack(self._history)).max(axis=1).reshape((-1, 1))
+            if np.all(abs(x - x_old) <= self.aerror + self.rerror*peak):
+                self._matching += 1
+            else:
+                self._matching = 0
+            # stop at the end of a period, the last one is complete
+            self.settled = self._matching >= \
+                           options.transient_steady_state_periods*self.samples \
+                           and (self._index - 1) % self.samples == 0
+
+    def _set_period(self, t, period):
+        self.period = period
+        self._start, self._index = t, 1
+        self._history = []
+        self._matching = 0
+
+    def _estimate_period(self, t):
+        v = np.array(self._history)
+        times = self._start + self.tstep*np.arange(1, len(v) + 1)
+        half = len(v)//2
+        probe = np.argmax(v[half:].max(axis=0) - v[half:].min(axis=0))
+        period = estimate_period(times, v[:, probe])
+        if period is not None:
+            self._set_period(t, period)
+
+
+def _get_function_periods(fun):
+    if isinstance(fun, time_functions.pulse):
+        return [fun.per] if fun.per else []
+    elif isinstance(fun, time_functions.sin):
+        return [1./fun.freq] if fun.freq else []
+    elif isinstance(fun, time_functions.sffm):
+        return [1./f for f in (fun.fc, fun.fs) if f]
+    elif isinstance(fun, time_functions.am):
+        return [1./f for f in (fun.fc, fun.fm) if f]
+    elif isinstance(fun, time_functions.pwl) and fun.repeat:
+        return [max(fun.x) - fun.repeat_time]
+    return []
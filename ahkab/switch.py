@@ -333,6 +333,22 @@ class vswitch_model:
         """
         return self.VT + self.VH * 2 * (not is_on) - self.VH
 
+    def get_switching_voltage(self, is_on):
+        """Get the control voltage at which the switch commutes.
+
+        **Parameters:**
+
+        is_on : bool
+            The status of the switch, the hysteresis is taken into account.
+
+        **Returns:**
+
+        V : float
+            The threshold the control voltage has to cross to move the switch
+            to the other status.
+        """
+        return self._get_V(is_on)
+
     def _set_status(self, is_on):
         """Set the switch status, which meeans setting the effective
         switching voltage self.V (w hyst taken into account)
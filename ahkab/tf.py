@@ -0,0 +1,450 @@
+# -*- coding: iso-8859-1 -*-
+# tf.py
+# Small-signal transfer function analysis module
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the methods required to perform a small-signal
+transfer function (TF) analysis.
+
+.. note::
+
+    Typically, the user does not need to call the functions in this module
+    directly, instead, we recommend defining a TF analysis object through
+    the convenience method :func:`ahkab.ahkab.new_tf` and then running it
+    calling :func:`ahkab.ahkab.run`.
+
+The DC transfer function
+------------------------
+
+The circuit is linearized around its Operating Point (OP), as in an AC
+analysis, see :mod:`ahkab.ac`. At DC, its matrix is
+:math:`A = MNA + J`, with capacitors open and inductors shorted, and the
+analysis computes:
+
+* the small-signal gain from the input source to the output port,
+* the input resistance, as seen by the input source,
+* the output resistance, seen looking into the output port.
+
+The gain from every other independent source to the output is computed as
+well, at no extra cost: instead of solving the circuit once for each
+source, the transposed -- adjoint -- system
+
+.. math::
+
+    A^T y = c
+
+is solved, where :math:`c` selects the output port. The gain from a source
+whose unit excitation is :math:`b_k` is then :math:`y^T b_k`, for all
+:math:`k`. The matrix is factorized only once, the adjoint and the direct
+solutions needed by the input and output resistances reuse the same LU
+factors.
+
+The AC transfer functions
+-------------------------
+
+If a frequency sweep is requested, the adjoint system
+
+.. math::
+
+    (MNA + J + j \\omega AC)^T y(\\omega) = c
+
+is solved once per frequency, giving the complex transfer functions from
+every independent source to the output port, :math:`H_k(\\omega) =
+y(\\omega)^T b_k`.
+
+Module reference
+----------------
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import functools
+import re
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+
+from . import ac
+from . import components
+from . import dc_analysis
+from . import options
+from . import printing
+from . import py3compat
+from . import results
+from . import utilities
+
+specs = {'tf': {'tokens': ({
+                           'label': 'output',
+                           'pos': 0,
+                           'type': str,
+                           'needed': True,
+                           'dest': 'output',
+                           'default': None
+                           },
+                           {
+                           'label': 'source',
+                           'pos': 1,
+                           'type': str,
+                           'needed': False,
+                           'dest': 'source',
+                           'default': None
+                           },
+                           {
+                           'label': 'type',
+                           'pos': 2,
+                           'type': str,
+                           'needed': False,
+                           'dest': 'sweep_type',
+                           'default': options.ac_log_step
+                           },
+                           {
+                           'label': 'nsteps',
+                           'pos': 3,
+                           'type': float,
+                           'needed': False,
+                           'dest': 'points',
+                           'default': None
+                           },
+                           {
+                           'label': 'start',
+                           'pos': 4,
+                           'type': float,
+                           'needed': False,
+                           'dest': 'start',
+                           'default': None
+                           },
+                           {
+                           'label': 'stop',
+                           'pos': 5,
+                           'type': float,
+                           'needed': False,
+                           'dest': 'stop',
+                           'default': None
+                           })
+               }
+         }
+
+
+def tf_analysis(circ, output, source=None, start=None, points=None,
+                stop=None, sweep_type=None, x0=None, outfile="stdout",
+                verbose=3):
+    """Performs a small-signal transfer function analysis.
+
+    If ``start``, ``stop`` and ``points`` are not set, the DC gain, input
+    and output resistances are computed. Otherwise, the transfer functions
+    from every independent source to the output are computed over a
+    frequency sweep.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit to be simulated.
+
+    output : string or tuple of strings
+        The output port, either a node, referred to ground, or a tuple of
+        two nodes, eg. ``'out'`` or ``('outp', 'outn')``. The netlist
+        syntax, ``'V(outp,outn)'``, is accepted as well.
+
+    source : string, optional
+        The ``part_id`` of the independent voltage or current source
+        driving the circuit. It is needed to compute the DC gain and the
+        input resistance, the transfer functions from all the sources are
+        computed regardless.
+
+    start : float, optional
+        The start frequency, in Hz.
+
+    points : float, optional
+        The number of points to be used to discretize the
+        ``[start, stop]`` interval.
+
+    stop : float, optional
+        The stop frequency, in Hz.
+
+    sweep_type : string, optional
+        Either ``options.ac_log_step`` (ie ``'LOG'``), the default, or
+        ``options.ac_lin_step`` (ie ``'LIN'``).
+
+    x0 : OP results instance, optional
+        The linearization point. If not set, it will be computed
+        running an OP analysis.
+
+    outfile : string, optional
+        The name of the file where the results will be written. Set to
+        ``'stdout'`` to write to the standard output.
+
+    verbose : int, optional
+        The verbosity level, from 0 (silent) to 6 (debug).
+
+    **Returns:**
+
+    sol : TF solution
+        The DC results, see :class:`ahkab.results.tf_solution`, or the AC
+        transfer functions, see :class:`ahkab.results.ac_tf_solution`.
+
+    :raises ValueError: if the parameters are out of their valid range.
+
+    :raises RuntimeError: if the circuit is non-linear and can't be
+        linearized.
+    """
+    if outfile == 'stdout':
+        verbose = 0
+    sweep = start is not None or stop is not None or points is not None
+    if sweep and (start is None or stop is None or points is None):
+        raise ValueError("TF analysis needs start, stop and the number of " +
+                         "points to perform a frequency sweep")
+    if source is not None and \
+       not isinstance(circ.get_elem_by_name(source),
+                      (components.sources.VSource, components.sources.ISource)):
+        raise ValueError("The input source %s is not an independent source." %
+                         source)
+    if sweep:
+        return _ac_tf_analysis(circ, output, start, points, stop, sweep_type,
+                               x0, outfile, verbose)
+
+    printing.print_info_line(("Starting TF analysis: ", 1), verbose)
+    A0, _, x0 = get_linearized_system(circ, x0, verbose)
+    c = _get_output_vector(circ, output, A0.shape[0])
+    sources, B = get_source_vectors(circ, A0.shape[0])
+
+    printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
+    try:
+        solve = _factorize(A0)
+    except (np.linalg.LinAlgError, RuntimeError):
+        printing.print_general_error("The DC matrix is singular.")
+        printing.print_info_line(("failed.", 1), verbose)
+        return None
+    # the gains from all the sources: one adjoint solve
+    gains = solve(c, trans=True).T.dot(B)[0, :]
+    # the output resistance: a unit current through the output port
+    rout = c.T.dot(solve(c))[0, 0]
+    gain = rin = None
+    if source is not None:
+        index = [s.lower() for s in sources].index(source.lower())
+        b = B[:, index:index + 1]
+        gain = gains[index]
+        if isinstance(circ.get_elem_by_name(source),
+                      components.sources.VSource):
+            # a unit voltage drives I = -1/Rin through the source
+            rin = -1./b.T.dot(solve(b))[0, 0]
+        else:
+            # a unit current drives V(n2) - V(n1) = Rin
+            rin = b.T.dot(solve(b))[0, 0]
+    sol = results.tf_solution(circ, output=output, source=source, gain=gain,
+                              rin=rin, rout=rout, sources=sources,
+                              gains=gains, op=x0, outfile=outfile)
+    printing.print_info_line(("done.", 1), verbose)
+    return sol
+
+
+def _ac_tf_analysis(circ, output, start, points, stop, sweep_type, x0,
+                    outfile, verbose):
+    if start == 0:
+        raise ValueError("TF analysis has start frequency = 0")
+    if start > stop:
+        raise ValueError("TF analysis has start > stop")
+    if points < 2 and not start == stop:
+        raise ValueError("TF analysis has number of points < 2 & " +
+                         "start != stop")
+    if sweep_type is None or sweep_type.upper() == options.ac_log_step:
+        omega_iter = utilities.log_axis_iterator(2*np.pi*start, 2*np.pi*stop,
+                                                 points)
+    elif sweep_type.upper() == options.ac_lin_step:
+        omega_iter = utilities.lin_axis_iterator(2*np.pi*start, 2*np.pi*stop,
+                                                 points)
+    else:
+        raise ValueError("Unknown sweep type %s" % sweep_type)
+
+    printing.print_info_line(("Starting AC TF analysis: ", 1), verbose)
+    printing.print_info_line(("w: start = %g Hz, stop = %g Hz, %d points" %
+                              (start, stop, points), 3), verbose)
+    A0, AC, x0 = get_linearized_system(circ, x0, verbose)
+    c = _get_output_vector(circ, output, A0.shape[0])
+    sources, B = get_source_vectors(circ, A0.shape[0])
+    sol = results.ac_tf_solution(circ, start=start, stop=stop, points=points,
+                                 stype=sweep_type, op=x0, output=output,
+                                 sources=sources, outfile=outfile)
+
+    printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
+    omegas = np.array(list(omega_iter))
+    # one adjoint solve per frequency, for all the sources at once
+    solve = functools.partial(ac._solve_block, A0, AC, -c, trans=True)
+    try:
+        for block, y in ac._solve_sweep(solve, None, omegas,
+                                        ac._get_block_size(A0.shape[0])):
+            sol.add_lines(block/np.pi/2, B.T.dot(y))
+    except np.linalg.LinAlgError as e:
+        printing.print_general_error(str(e))
+        printing.print_info_line(("failed.", 1), verbose)
+        return None
+    printing.print_info_line(("done.", 1), verbose)
+    return sol
+
+
+def get_linearized_system(circ, x0=None, verbose=3):
+    """Get the small-signal matrices of a circuit.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    x0 : OP results instance or ndarray, optional
+        The linearization point. If not set and the circuit is non-linear,
+        it is computed running an OP analysis.
+
+    verbose : int, optional
+        The verbosity level, from 0 (silent) to 6 (debug).
+
+    **Returns:**
+
+    A0, AC : ndarrays
+        The reduced matrices: the small-signal circuit is described by
+        :math:`(A_0 + j\\omega AC) x = b`, where :math:`A_0` is
+        :math:`MNA + G_{min} + J`.
+
+    x0 : OP results instance or ndarray
+        The linearization point, ``None`` if the circuit is linear and none
+        was given.
+
+    :raises RuntimeError: if the circuit is non-linear and can't be
+        linearized.
+    """
+    mna, N = dc_analysis.generate_mna_and_N(circ, verbose=verbose)
+    del N
+    mna = utilities.remove_row_and_col(mna)
+    AC = ac._generate_AC(circ, [mna.shape[0], mna.shape[0]])
+    AC = utilities.remove_row_and_col(AC)
+    J = 0
+    if circ.is_nonlinear():
+        if x0 is None:
+            printing.print_info_line(("Starting OP analysis to get a " +
+                                      "linearization point...", 3), verbose,
+                                     print_nl=False)
+            x0 = dc_analysis.op_analysis(circ, verbose=0)
+            if x0 is None:
+                printing.print_info_line(("failed.", 3), verbose)
+                raise RuntimeError("OP analysis failed, no linearization " +
+                                   "point available.")
+            printing.print_info_line(("done.", 3), verbose)
+        xop = x0.asarray() if hasattr(x0, 'asarray') else x0
+        J = ac._generate_J(xop=xop, circ=circ, reduced_mna_size=mna.shape[0])
+    Gmin_matrix = dc_analysis.build_gmin_matrix(circ, options.gmin,
+                                                mna.shape[0], verbose)
+    return mna + Gmin_matrix + J, AC, x0
+
+
+def get_output_port(circ, output):
+    """Get the internal nodes of an output port.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    output : string or tuple of strings
+        The output port: a node, referred to ground, a tuple of nodes or a
+        string such as ``'V(outp,outn)'`` or ``'V(out)'``.
+
+    **Returns:**
+
+    n1, n2 : ints
+        The internal nodes of the port.
+
+    :raises ValueError: if the nodes are not found in the circuit.
+    """
+    if type(output) in py3compat.string_types:
+        m = re.match(r'^\s*V\s*\(\s*(\w+)\s*(?:,\s*(\w+)\s*)?\)\s*$', output,
+                     re.IGNORECASE)
+        output = (m.group(1), m.group(2) or circ.gnd) if m else \
+                 (output, circ.gnd)
+    if len(output) == 1:
+        output = (output[0], circ.gnd)
+    nodes = []
+    for n in output:
+        if n == circ.gnd:
+            nodes.append(0)
+            continue
+        if n not in circ.nodes_dict and n.lower() in circ.nodes_dict:
+            n = n.lower()
+        if n not in circ.nodes_dict:
+            raise ValueError("Output node %s not found in the circuit." % n)
+        nodes.append(circ.ext_node_to_int(n))
+    return tuple(nodes)
+
+
+def get_source_vectors(circ, size):
+    """Get the unit excitations of the independent sources of a circuit.
+
+    **Parameters:**
+
+    circ : Circuit instance
+        The circuit.
+
+    size : int
+        The size of the reduced MNA matrix.
+
+    **Returns:**
+
+    sources : list of strings
+        The ``part_id`` of the sources.
+
+    B : ndarray
+        The right-hand sides of the small-signal system corresponding to a
+        unit value of each source, one column per source.
+    """
+    sources = [elem for elem in circ
+               if isinstance(elem, (components.sources.VSource,
+                                    components.sources.ISource))]
+    B = np.zeros((size, len(sources)))
+    nv_1 = circ.get_nodes_number() - 1
+    for k, elem in enumerate(sources):
+        if isinstance(elem, components.sources.VSource):
+            B[nv_1 + circ.find_vde_index(elem), k] = 1.
+        else:
+            # the current flows from n1 to n2 through the source
+            if elem.n1:
+                B[elem.n1 - 1, k] -= 1.
+            if elem.n2:
+                B[elem.n2 - 1, k] += 1.
+    return [elem.part_id for elem in sources], B
+
+
+def _get_output_vector(circ, output, size):
+    # c^T x is the output voltage
+    c = np.zeros((size, 1))
+    for n, sign in zip(get_output_port(circ, output), (1., -1.)):
+        if n:
+            c[n - 1, 0] += sign
+    return c
+
+
+def _factorize(A):
+    # factorize A once, for both the direct and the adjoint solutions
+    if A.shape[0] > options.dense_matrix_limit:
+        lu = scipy.sparse.linalg.splu(scipy.sparse.csc_matrix(A))
+        return lambda b, trans=False: lu.solve(b, trans='T' if trans else 'N')
+    lu, piv = scipy.linalg.lu_factor(A, check_finite=False)
+    if not np.all(np.diag(lu)):
+        raise np.linalg.LinAlgError("Singular matrix")
+    return lambda b, trans=False: scipy.linalg.lu_solve((lu, piv), b,
+                                                        trans=int(trans))
@@ -82,6 +82,18 @@ In both cases, in time-based simulations, the simulator will call the object at
 every time step, supplying a single parameter, the simulation time (``time`` in
 the following, of type ``float``).
 
+The time functions defined in this module also accept a ``numpy`` array of
+time instants, in which case an array of values is returned. The periodic
+steady state analyses take advantage of this to sample all the sources in one
+call. Custom time functions are not required to do the same: see
+:func:`sample`, which falls back to a point-by-point evaluation.
+
+Optionally, an instance may also provide a ``breakpoints(self, t0, t1)``
+method, returning the sorted list of the time instants in ``[t0, t1]`` where
+the waveform has a corner or a discontinuity. The transient analysis uses
+them to place a time step exactly on each of them. All the time functions
+defined in this module provide such a method.
+
 In turn, the simulator expects to receive as return value a ``float``,
 corresponding to the value of the time-dependent function at the time specified
 by the ``time`` variable.
@@ -135,8 +147,8 @@ get:
     t = r.get_x()
     pylab.hold(True)
     pylab.plot(t, r['vn1'], 'o', ms=3, label='V(n1) (simulation)')
-    npsin1k = np.frompyfunc(mys, 1, 1)
-    pylab.plot(t, npsin1k(t), label='sinc(ft) (theory)')
+    pylab.plot(t, ahkab.time_functions.sample(mys, t),
+               label='sinc(ft) (theory)')
     pylab.legend()
     pylab.xlabel('t [s]')
     pylab.ylabel('Voltage [V]')
@@ -151,7 +163,7 @@ from __future__ import (unicode_literals, absolute_import,
 
 import math
 
-from scipy.interpolate import InterpolatedUnivariateSpline
+import numpy as np
 
 time_fun_specs = {'sin': { #VO VA FREQ TD THETA
     'tokens': ({
@@ -399,6 +411,83 @@ time_fun_specs = {'sin': { #VO VA FREQ TD THETA
 # Functions for time dependent sources  #
 #
 
+def sample(fun, time):
+    """Evaluate a time function on an array of time instants.
+
+    The built-in time functions are evaluated in a single vectorized call,
+    other callables, not necessarily supporting arrays, are evaluated point
+    by point.
+
+    **Parameters:**
+
+    fun : callable
+        The time function, or any function of time, such as the ``V()``
+        method of a voltage source.
+    time : array-like
+        The time instants, in seconds.
+
+    **Returns:**
+
+    values : ndarray
+        The function values, with the same shape as ``time``.
+    """
+    time = np.asarray(time, dtype=float)
+    try:
+        values = np.asarray(fun(time), dtype=float)
+        if values.shape == time.shape:
+            return values
+    except (TypeError, ValueError):
+        pass
+    values = [fun(t) for t in time.reshape((-1,))]
+    return np.array(values, dtype=float).reshape(time.shape)
+
+
+def _as_time_array(time):
+    # None means t=0
+    if time is None:
+        time = 0.
+    return np.asarray(time, dtype=float)
+
+
+def _output(time, value):
+    # scalars in, scalars out
+    if np.ndim(time) == 0:
+        return float(value)
+    return value
+
+
+def _sin(x):
+    # math.sin() for scalars: np.sin() may differ from it in the last ulp,
+    # which is enough to move the steps of an adaptive transient analysis
+    if np.ndim(x) == 0:
+        return math.sin(x)
+    return np.sin(x)
+
+
+def _exp(x):
+    # math.exp() for scalars, see _sin()
+    if np.ndim(x) == 0:
+        return math.exp(x)
+    return np.exp(x)
+
+
+def _get_breakpoints(corners, t0, t1, period=None, offset=0.):
+    """Place ``corners`` (repeated every ``period`` seconds, if set)
+    after ``offset`` and return the sorted ones found in ``[t0, t1]``."""
+    corners = [c for c in corners if c is not None]
+    if not len(corners):
+        return []
+    if not period or period <= 0:
+        bps = [offset + c for c in corners]
+    else:
+        bps = []
+        k = max(int(math.floor((t0 - offset - max(corners))/period)), 0)
+        while offset + k*period + min(corners) <= t1:
+            bps += [offset + k*period + c for c in corners]
+            k += 1
+    return sorted(set([t for t in bps if t0 <= t <= t1]))
+
+
 class pulse(object):
     """Square wave aka pulse function
 
@@ -437,20 +526,37 @@ class pulse(object):
         self._type = "V"
 
     def __call__(self, time):
-        """Evaluate the pulse function at the given time."""
-        if time is None:
-            time = 0
-        time = time - self.per * int(time / self.per)
-        if time < self.td:
-            return self.v1
-        elif time < self.td + self.tr:
-            return self.v1 + ((self.v2 - self.v1) / (self.tr)) * (time - self.td)
-        elif time < self.td + self.tr + self.pw:
-            return self.v2
-        elif time < self.td + self.tr + self.pw + self.tf:
-            return self.v2 + ((self.v1 - self.v2) / (self.tf)) * (time - (self.td + self.tr + self.pw))
-        else:
-            return self.v1
+        """Evaluate the pulse function at the given time(s)."""
+        t = _as_time_array(time)
+        t = t - self.per * np.trunc(t / self.per)
+        rise = (self.v2 - self.v1) / self.tr if self.tr else 0.
+        fall = (self.v1 - self.v2) / self.tf if self.tf else 0.
+        value = np.select((t < self.td,
+                           t < self.td + self.tr,
+                           t < self.td + self.tr + self.pw,
+                           t < self.td + self.tr + self.pw + self.tf),
+                          (self.v1,
+                           self.v1 + rise * (t - self.td),
+                           self.v2,
+                           self.v2 + fall * (t - (self.td + self.tr + self.pw))),
+                          default=self.v1)
+        return _output(time, value)
+
+    def breakpoints(self, t0, t1):
+        """Get the time instants in ``[t0, t1]`` where the pulse has a
+        corner.
+
+        **Returns:**
+
+        bps : list of floats
+            The breakpoints, sorted.
+        """
+        corners = [self.td, self.td + self.tr, self.td + self.tr + self.pw,
+                   self.td + self.tr + self.pw + self.tf]
+        if self.per and corners[-1] >= self.per:
+            # the waveform is cut at the end of the period
+            corners = [c for c in corners if c < self.per] + [0.]
+        return _get_breakpoints(corners, t0, t1, period=self.per)
 
     def __str__(self):
         return "type=pulse " + \
@@ -513,15 +619,28 @@ class sin(object):
         self._type = "V"
 
     def __call__(self, time):
-        """Evaluate the sine function at the given time."""
-        if time is None:
-            time = 0
-        if time < self.td:
-            return self.vo + self.va*math.sin(math.pi*self.phi/180.)
-        else:
-            return self.vo + self.va * math.exp((self.td - time)*self.theta) \
-                   * math.sin(2*math.pi*self.freq*(time - self.td) + \
-                              math.pi*self.phi/180.)
+        """Evaluate the sine function at the given time(s)."""
+        t = _as_time_array(time)
+        # clip the time to td, to avoid overflows in the exponential
+        # for t < td, where it is not used anyway
+        tc = np.maximum(t, self.td)
+        value = np.where(t < self.td,
+                         self.vo + self.va*math.sin(math.pi*self.phi/180.),
+                         self.vo + self.va * _exp((self.td - tc)*self.theta)
+                         * _sin(2*math.pi*self.freq*(tc - self.td) +
+                                math.pi*self.phi/180.))
+        return _output(time, value)
+
+    def breakpoints(self, t0, t1):
+        """Get the time instants in ``[t0, t1]`` where the sine wave has a
+        corner, that is its beginning at ``td``.
+
+        **Returns:**
+
+        bps : list of floats
+            The breakpoints, sorted.
+        """
+        return _get_breakpoints([self.td], t0, t1)
 
     def __str__(self):
         return "type=sin " + \
@@ -586,18 +705,29 @@ class exp(object):
         self._type = "V"
 
     def __call__(self, time):
-        """Evaluate the exponential function at the given time."""
-        if time is None:
-            time = 0
-        if time < self.td1:
-            return self.v1
-        elif time < self.td2:
-            return self.v1 + (self.v2 - self.v1) * \
-                   (1 - math.exp(-1*(time - self.td1)/self.tau1))
-        else:
-            return self.v1 + (self.v2 - self.v1) * \
-                   (1 - math.exp(-1*(time - self.td1)/self.tau1)) + \
-                   (self.v1 - self.v2)*(1 - math.exp(-1*(time - self.td2)/self.tau2))
+        """Evaluate the exponential function at the given time(s)."""
+        t = _as_time_array(time)
+        # clip the time to the beginning of each segment, to avoid overflows
+        # in the exponentials that would be discarded anyway
+        rise = (self.v2 - self.v1) * \
+               (1 - _exp(-1*(np.maximum(t, self.td1) - self.td1)/self.tau1))
+        fall = (self.v1 - self.v2) * \
+               (1 - _exp(-1*(np.maximum(t, self.td2) - self.td2)/self.tau2))
+        value = np.select((t < self.td1, t < self.td2),
+                          (self.v1, self.v1 + rise),
+                          default=self.v1 + rise + fall)
+        return _output(time, value)
+
+    def breakpoints(self, t0, t1):
+        """Get the time instants in ``[t0, t1]`` where the exponential
+        wave has a corner, ie ``td1`` and ``td2``.
+
+        **Returns:**
+
+        bps : list of floats
+            The breakpoints, sorted.
+        """
+        return _get_breakpoints([self.td1, self.td2], t0, t1)
 
     def __str__(self):
         return "type=exp " + \
@@ -654,16 +784,25 @@ class sffm(object):
         self._type = "V"
 
     def __call__(self, time):
-        """Evaluate the SFFM function at the given time."""
-        if time is None:
-            time = 0
-        if time <= self.td:
-            return self.vo
-        else:
-            return self.vo + self.va*math.sin(2*math.pi*self.fc*(time - self.td) +
-                                              self.mdi*math.sin(2*math.pi*self.fs*
-                                                                (time - self.td))
-                                              )
+        """Evaluate the SFFM function at the given time(s)."""
+        t = _as_time_array(time)
+        value = np.where(t <= self.td, self.vo,
+                         self.vo + self.va*_sin(2*math.pi*self.fc*(t - self.td) +
+                                                self.mdi*_sin(2*math.pi*self.fs*
+                                                              (t - self.td))
+                                                ))
+        return _output(time, value)
+
+    def breakpoints(self, t0, t1):
+        """Get the time instants in ``[t0, t1]`` where the SFFM wave has
+        a corner, that is its beginning at ``td``.
+
+        **Returns:**
+
+        bps : list of floats
+            The breakpoints, sorted.
+        """
+        return _get_breakpoints([self.td], t0, t1)
 
     def __str__(self):
         return "type=sffm vo=%g va=%g fc=%g mdi=%g fs=%g td=%g" % \
@@ -713,15 +852,24 @@ class am(object):
         self._type = "V"
 
     def __call__(self, time):
-        """Evaluate the AM function at the given time."""
-        if time is None:
-            time = 0
-        if time <= self.td:
-            return 0.
-        else:
-            return self.sa*(self.oc + math.sin(2*math.pi*self.fm*
-                                               (time - self.td)))* \
-                   math.sin(2*math.pi*self.fc*(time - self.td))
+        """Evaluate the AM function at the given time(s)."""
+        t = _as_time_array(time)
+        value = np.where(t <= self.td, 0.,
+                         self.sa*(self.oc + _sin(2*math.pi*self.fm*
+                                                 (t - self.td)))*
+                         _sin(2*math.pi*self.fc*(t - self.td)))
+        return _output(time, value)
+
+    def breakpoints(self, t0, t1):
+        """Get the time instants in ``[t0, t1]`` where the AM wave has
+        a corner, that is its beginning at ``td``.
+
+        **Returns:**
+
+        bps : list of floats
+            The breakpoints, sorted.
+        """
+        return _get_breakpoints([self.td], t0, t1)
 
     def __str__(self):
         return "type=am sa=%g oc=%g fm=%g fc=%g td=%g" % \
@@ -757,6 +905,9 @@ class pwl(object):
     td : float, optional
         Time delay before the signal begins, in seconds. Defaults to zero.
 
+    Before the first point and, if the waveform is not repeated, after the
+    last one, the waveform holds the first and last values, respectively.
+
     **Example:**
 
     The following code::
@@ -768,9 +919,8 @@ class pwl(object):
         vs = (60e-9, 0, 120e-9, 0, 130e-9, 5, 170e-9, 5, 180e-9, 0)
         x, y = vs[::2], vs[1::2]
         fun = ahkab.time_functions.pwl(x, y, repeat=1, repeat_time=60e-9, td=0)
-        myg = np.frompyfunc(fun, 1, 1)
         t = np.linspace(0, 5e-7, 2000)
-        plt.plot(t, myg(t), lw=3)
+        plt.plot(t, fun(t), lw=3)
         plt.xlabel('Time [s]'); plt.ylabel('Arbitrary units []')
 
 
@@ -784,10 +934,9 @@ class pwl(object):
         vs = (60e-9, 0, 120e-9, 0, 130e-9, 5, 170e-9, 5, 180e-9, 0)
         x, y = vs[::2], vs[1::2]
         fun = ahkab.time_functions.pwl(x, y, repeat=1, repeat_time=60e-9, td=0)
-        myg = np.frompyfunc(fun, 1, 1)
         t = np.linspace(0, 5e-7, 2000)
         plt.figure(figsize=(6, 3)); plt.grid()
-        plt.plot(t, myg(t), lw=3)
+        plt.plot(t, fun(t), lw=3)
         plt.xlabel('Time [s]'); plt.ylabel('Arbitrary units []')
         plt.tight_layout()
 
@@ -803,28 +952,43 @@ class pwl(object):
             self.repeat_time = 0
         self.td = td
         self._type = "V"
-        self._f = InterpolatedUnivariateSpline(self.x, self.y, k=1)
+        self._x = np.asarray(self.x, dtype=float)
+        self._y = np.asarray(self.y, dtype=float)
 
     def __call__(self, time):
-        """Evaluate the PWL function at the given time."""
-        time = self._normalize_time(time)
-        return self._f(time)
+        """Evaluate the PWL function at the given time(s)."""
+        t = self._normalize_time(time)
+        return _output(time, np.interp(t, self._x, self._y))
 
     def _normalize_time(self, time):
-        if time is None:
-            time = 0
-        if time <= self.td:
-            time = 0
-        elif time > self.td:
-            time = time - self.td
-            if self.repeat:
-                if time > max(self.x):
-                    time = (time - max(self.x)) % \
-                           (max(self.x) - self.repeat_time) + \
-                           self.repeat_time
-                else:
-                    pass
-        return time
+        t = _as_time_array(time)
+        t = np.where(t <= self.td, 0., t - self.td)
+        if self.repeat:
+            xmax = max(self.x)
+            t = np.where(t > xmax,
+                         np.mod(t - xmax, xmax - self.repeat_time) +
+                         self.repeat_time, t)
+        return t
+
+    def breakpoints(self, t0, t1):
+        """Get the time instants in ``[t0, t1]`` where the PWL waveform has
+        a corner, ie the interpolation points, shifted by ``td`` and repeated
+        if required.
+
+        **Returns:**
+
+        bps : list of floats
+            The breakpoints, sorted.
+        """
+        xmax = max(self.x)
+        bps = _get_breakpoints([0.] + list(self.x), t0, t1, offset=self.td)
+        if self.repeat:
+            corners = [x - self.repeat_time for x in self.x
+                       if x >= self.repeat_time]
+            bps += _get_breakpoints(corners, t0, t1,
+                                    period=xmax - self.repeat_time,
+                                    offset=self.td + xmax)
+        return sorted(set(bps))
 
     def __str__(self):
         pwl_str = "type=pwl"
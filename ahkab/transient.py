@@ -40,13 +40,24 @@ We need:
 from __future__ import (unicode_literals, absolute_import,
                         division, print_function)
 
+import os
 import sys
+import functools
 import imp
+import pickle
+import timeit
+from math import factorial
 
 import numpy as np
 
 from . import dc_analysis
 from . import implicit_euler
+from . import gear
+from . import expint
+from . import latency
+from . import parareal
+from . import steady_state as steady_state_detection
+from . import wr
 from . import ticker
 from . import options
 from . import circuit
@@ -54,16 +65,22 @@ from . import printing
 from . import utilities
 from . import components
 from . import results
+from . import sens
+from . import switch
 
 # differentiation methods, add them here
 IMPLICIT_EULER = "IMPLICIT_EULER"
 TRAP = "TRAP"
+TRAP_AUTO = "TRAP_AUTO"  # TRAP, damped with Gear2 where it rings
+EXPONENTIAL = "EXPONENTIAL"  # linear circuits only, see expint.py
+WR = "WR"  # waveform relaxation, see wr.py
 GEAR1 = "GEAR1"
 GEAR2 = "GEAR2"
 GEAR3 = "GEAR3"
 GEAR4 = "GEAR4"
 GEAR5 = "GEAR5"
 GEAR6 = "GEAR6"
+GEAR = "GEAR"  # variable order
 
 specs = {'tran':{'tokens':({
                           'label':'tstep',
@@ -112,6 +129,46 @@ specs = {'tran':{'tokens':({
                           'needed':False,
                           'dest':'method',
                           'default':None
+                         },
+                         {
+                          'label':'tprint',
+                          'pos':None,
+                          'type':float,
+                          'needed':False,
+                          'dest':'output_times',
+                          'default':None
+                         },
+                         {
+                          'label':'steady_state',
+                          'pos':None,
+                          'type':bool,
+                          'needed':False,
+                          'dest':'steady_state',
+                          'default':False
+                         },
+                         {
+                          'label':'period',
+                          'pos':None,
+                          'type':float,
+                          'needed':False,
+                          'dest':'period',
+                          'default':None
+                         },
+                         {
+                          'label':'sens',
+                          'pos':None,
+                          'type':str,
+                          'needed':False,
+                          'dest':'sens_outputs',
+                          'default':None
+                         },
+                         {
+                          'label':'sens_type',
+                          'pos':None,
+                          'type':str,
+                          'needed':False,
+                          'dest':'sens_type',
+                          'default':'final'
                          }
                         )
                }
@@ -119,7 +176,10 @@ specs = {'tran':{'tokens':({
 
 
 def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_method, use_step_control=True, x0=None,
-                       mna=None, N=None, D=None, outfile="stdout", return_req_dict=None, verbose=3):
+                       mna=None, N=None, D=None, outfile="stdout", return_req_dict=None, save=None,
+                       output_times=None, checkpoint=None, resume_from=None, measures=None,
+                       steady_state=False, period=None, sens_outputs=None, sens_type='final',
+                       verbose=3):
     """Performs a transient analysis of the circuit described by circ.
 
     Parameters:
@@ -128,13 +188,106 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
     tstep: the maximum step to be allowed during simulation or
     tstop: stop value for simulation
     method: differentiation method: 'TRAP' (default) or 'IMPLICIT_EULER' or 'GEARx' with x=1..6
+        or 'GEAR', Gear with the order selected automatically at each step, see
+        options.transient_gear_max_order. Without step control, 'GEAR' is first order.
+        'TRAP_AUTO' is TRAP switching to Gear2 for a few steps after breakpoints,
+        switch events and when point-to-point ringing is detected, see
+        options.transient_trap_damping_steps.
+        'EXPONENTIAL' solves linear circuits exactly between the breakpoints of
+        piecewise linear sources, see ahkab.expint.
+        'WR' solves the subcircuit instances in parallel by waveform relaxation, with
+        a fixed step, see ahkab.wr.
     use_step_control: the LTE will be calculated and the step adjusted. default: True
     x0: the starting point, the solution at t=tstart (defaults to None, will be set to the OP)
     mna, N, D: MNA matrices, defaulting to None, for big circuits, reusing matrices saves time
     outfile: filename, the results will be written to this file. "stdout" means print out.
     return_req_dict:  to be documented
+    save: list of the variables to be stored, eg. ['V(out)', 'I(V*)'], defaults to all.
+    output_times: either a print step (float) or a sequence of times. If set, the results
+        are written only at those times, interpolating the accepted time points, instead
+        of at every internal time step. Step control is not affected. Default: None.
+    checkpoint: filename. If set, the state of the integrator is periodically saved to it,
+        see options.transient_checkpoint_interval, and when the analysis fails.
+    resume_from: filename of a checkpoint. If set, the analysis resumes from the saved
+        state instead of starting from tstart. Default: None.
+    measures: list of measurements to be evaluated on the results, see ahkab.measure.
+        Default: None.
+    steady_state: if set, the analysis stops before tstop as soon as the circuit reaches
+        its periodic steady state, see ahkab.steady_state. The settling time and the
+        period are stored in the steady_state attribute of the results. Default: False.
+    period: the period used by the steady state detection. If not set, it is the common
+        period of the time-dependent sources or, if none is periodic, it is estimated
+        from the solution. Default: None.
+    sens_outputs: list of outputs, eg. ['V(out)', 'I(V1)']. If set, the sensitivities of
+        their final values or of their integrals over time, see sens_type, with respect
+        to all the circuit parameters are computed with a backward adjoint pass, at the
+        cost of about one more transient analysis, whatever the number of parameters.
+        They are stored in the sensitivities attribute of the results, see
+        ahkab.sens.TransientSensitivity. Default: None.
+    sens_type: either 'final' or 'integ'. Default: 'final'.
     verbose: verbosity level from 0 (silent) to 6 (very verbose).
 
+    If options.transient_use_parareal is set, the time slices are solved in parallel
+    with the Parareal algorithm, see ahkab.parareal.
+
+    """
+    result = {}
+    for _ in _transient_steps(circ, tstart, tstep, tstop, method, use_step_control, x0, mna,
+                              N, D, outfile, return_req_dict, save, output_times,
+                              checkpoint, resume_from, measures, verbose, result,
+                              steady_state=steady_state, period=period,
+                              sens_outputs=sens_outputs, sens_type=sens_type):
+        pass
+    return result['value']
+
+def iter_transient(circ, tstart, tstop, tstep, method=options.default_tran_method,
+                   use_step_control=True, x0=None, outfile=None, save=None,
+                   output_times=None, verbose=0):
+    """Run a transient analysis, yielding the results as they are computed.
+
+    The parameters are the same as in :func:`transient_analysis`, except for
+    their order, ``tstart, tstop, tstep`` as in :func:`ahkab.new_tran`, and
+    for ``outfile``, which defaults to ``None``: nothing is written to disk
+    unless it is set.
+
+    The consumer may stop iterating at any time, that terminates the
+    analysis.
+
+    **Yields:**
+
+    t : ndarray
+        The times of the new results, as a 1D array.
+    x : ndarray
+        The new results, as a ``(n_of_var, len(t))`` array. The rows follow
+        the order of the unknowns of the circuit: node voltages first, then
+        the currents of the voltage-defined elements. A block is yielded
+        every time a time point is accepted and at least one result is to
+        be written (see ``output_times``).
+
+    :raises RuntimeError: if the analysis fails.
+    """
+    result = {}
+    for points in _transient_steps(circ, tstart, tstep, tstop, method, use_step_control, x0,
+                                   None, None, None, outfile, None, save, output_times,
+                                   None, None, None, verbose, result):
+        yield (np.array([t for t, _ in points]),
+               np.concatenate([x for _, x in points], axis=1))
+    if not result['solved']:
+        raise RuntimeError("Transient analysis failed.")
+
+def _transient_steps(circ, tstart, tstep, tstop, method, use_step_control, x0, mna, N, D,
+                     outfile, return_req_dict, save, output_times, checkpoint, resume_from,
+                     measures, verbose, result, steady_state=False, period=None,
+                     allow_parareal=True, sens_outputs=None, sens_type='final'):
+    """Generator running the transient analysis, see :func:`transient_analysis`.
+
+    Every time a time point is accepted, the new results are written to the
+    results set and yielded as a list of ``(t, x)`` tuples. The return value
+    of :func:`transient_analysis` is stored in ``result['value']``, while
+    ``result['solved']`` records whether the analysis succeeded.
+
+    ``allow_parareal`` is cleared by the Parareal propagators, which run the
+    analysis on each time slice.
     """
     if outfile == "stdout":
         verbose = 0
@@ -186,6 +339,7 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
         D = utilities.remove_row_and_col(D)
 
     # setup x0
+    initial_op = isinstance(x0, results.op_solution)
     if x0 is None:
         printing.print_info_line(("Generating x(t=%g) = 0" % (tstart,), 5), verbose)
         x0 = np.zeros((mna.shape[0], 1))
@@ -202,30 +356,60 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
         print("x0:")
         opsol.print_short()
 
+    if steady_state and (method in (EXPONENTIAL, WR) or
+                         options.transient_use_parareal and allow_parareal):
+        raise ValueError("Steady state detection is not supported by the " +
+                         "%s method or with Parareal." % method)
+    if sens_outputs:
+        if method in (EXPONENTIAL, WR) or options.transient_use_parareal and allow_parareal:
+            raise ValueError("Sensitivities are not supported by the %s method or " % method +
+                             "with Parareal.")
+        if resume_from is not None or outfile is None or \
+           any(isinstance(elem, switch.switch_device) for elem in circ):
+            raise ValueError("Sensitivities are not supported when resuming an " +
+                             "analysis, without an output file or with switches.")
+        adjoint = sens.TransientSensitivity(circ, sens_outputs, sens_type, tstart, x0,
+                                            mna, N, D, trap=(method != IMPLICIT_EULER),
+                                            initial_op=initial_op)
+    else:
+        adjoint = None
+    if options.transient_use_parareal and allow_parareal:
+        for points in _parareal_steps(circ, tstart, tstep, tstop, method, use_step_control,
+                                      x0, mna, N, D, outfile, return_req_dict, save,
+                                      output_times, checkpoint, resume_from, measures,
+                                      verbose, result):
+            yield points
+        return
+    elif method == EXPONENTIAL:
+        for points in _exponential_steps(circ, tstart, tstep, tstop, x0, mna, N, D,
+                                         outfile, return_req_dict, save, output_times,
+                                         checkpoint, resume_from, measures, verbose,
+                                         result):
+            yield points
+        return
+    elif method == WR:
+        for points in _wr_steps(circ, tstart, tstep, tstop, x0, mna, N, D,
+                                outfile, return_req_dict, save, output_times,
+                                checkpoint, resume_from, measures, verbose,
+                                result):
+            yield points
+        return
+
     # setup the df method
     printing.print_info_line(("Selecting the appropriate DF ("+method+")... ", 5), verbose, print_nl=False)
+    # the order of the Gear methods is kept here, not in the gear module
+    gear_order = None
     if method == IMPLICIT_EULER:
         from . import implicit_euler as df
-    elif method == TRAP:
+    elif method == TRAP or method == TRAP_AUTO:
         from . import trap as df
-    elif method == GEAR1:
-        from . import gear as df
-        df.order = 1
-    elif method == GEAR2:
-        from . import gear as df
-        df.order = 2
-    elif method == GEAR3:
-        from . import gear as df
-        df.order = 3
-    elif method == GEAR4:
-        from . import gear as df
-        df.order = 4
-    elif method == GEAR5:
-        from . import gear as df
-        df.order = 5
-    elif method == GEAR6:
-        from . import gear as df
-        df.order = 6
+    elif method in (GEAR1, GEAR2, GEAR3, GEAR4, GEAR5, GEAR6):
+        df = gear
+        gear_order = int(method[len(GEAR):])
+    elif method == GEAR:
+        df = gear
+        # start from the first order, it's raised as the history builds up
+        gear_order = 1
     else:
         df = import_custom_df_module(method, print_out=(outfile != "stdout"))
         # df is none if module is not found
@@ -244,7 +428,10 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
     # if you use the step control, the buffer has to be one point longer.
     # That's because the excess point is used by a FF in the df module to predict the next value.
     printing.print_info_line(("Setting up the buffer... ", 5), verbose, print_nl=False)
-    ((max_x, max_dx), (pmax_x, pmax_dx)) = df.get_required_values()
+    if gear_order is not None:
+        ((max_x, max_dx), (pmax_x, pmax_dx)) = gear.get_required_values_order(gear_order)
+    else:
+        ((max_x, max_dx), (pmax_x, pmax_dx)) = df.get_required_values()
     if max_x is None and max_dx is None:
         printing.print_general_error("df doesn't need any value?")
         sys.exit(1)
@@ -254,9 +441,15 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
             if mx is not None:
                 buffer_len = max(buffer_len, mx)
         buffer_len += 1
-        thebuffer = dfbuffer(length=buffer_len, width=3)
+        if method == GEAR:
+            # room for the highest order and its prediction
+            buffer_len = max(buffer_len, options.transient_gear_max_order + 1)
     else:
-        thebuffer = dfbuffer(length=max(max_x, max_dx) + 1, width=3)
+        buffer_len = max(mx for mx in (max_x, max_dx) if mx is not None) + 1
+    if method == TRAP_AUTO:
+        # room for Gear2 and its prediction
+        buffer_len = max(buffer_len, 3)
+    thebuffer = dfbuffer(length=buffer_len, width=3)
     thebuffer.add((tstart, x0, None)) #setup the first values
     printing.print_info_line(("done.", 5), verbose) #FIXME
 
@@ -288,6 +481,12 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
     nv = circ.get_nodes_number()
 
     Gmin_matrix = dc_analysis.build_gmin_matrix(circ, options.gmin, mna.shape[0], verbose)
+    if options.transient_use_latency and circ.is_nonlinear():
+        bypass = latency.LatencyBypass(circ)
+        printing.print_info_line(("Latency partitions: %d" % (len(bypass.partitions),), 5),
+                                 verbose)
+    else:
+        bypass = None
 
     # lo step viene generato automaticamente, ma non superare mai quello fornito.
     if use_step_control:
@@ -295,6 +494,26 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
         tstep = min((tstop-tstart)/9999.0, HMAX)
     printing.print_info_line(("Initial step: %g"% (tstep,), 5), verbose)
 
+    if use_step_control and options.transient_use_breakpoints:
+        breakpoints = get_breakpoints(circ, tstart, tstop)
+        printing.print_info_line(("Breakpoints: %d" % (len(breakpoints),), 5), verbose)
+    else:
+        breakpoints = []
+    bp_index = 0
+
+    switches = [elem for elem in circ if isinstance(elem, switch.switch_device)]
+    use_switch_events = use_step_control and options.transient_use_switch_events
+    # switch events: the one located in the last rejected step, if any, and
+    # those we landed on, whose crossing has not been completed yet
+    event = None
+    landed_events = {}
+
+    variable_order = use_step_control and method == GEAR
+    # accepted steps since the last order change or restart
+    order_steps = 0
+    # TRAP_AUTO: steps left to be integrated with Gear2
+    damped_steps = 0
+
     if max_dx is None:
         max_dx_plus_1 = None
     else:
@@ -316,15 +535,92 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
     # when to start predicting the next point
     start_pred_iter = max(*[i for i in (0, pmax_x, pmax_dx_plus_1) if i is not None])
     lte = None
-    sol = results.tran_solution(circ, tstart, tstop, op=x0, method=method, outfile=outfile)
+    if outfile is not None:
+        sol = results.tran_solution(circ, tstart, tstop, op=x0, method=method, outfile=outfile,
+                                   save=save)
+        if measures:
+            sol.add_measures(measures)
+    else:
+        sol = None
+    # the results waiting to be written, as (t, x) tuples
+    points = []
+    # the derivatives computed by TRAP ring after a discontinuity, which
+    # is never damped if it's in the initial conditions: interpolate
+    # linearly, both on the output grid and to locate the switch events
+    hermite = method not in (TRAP, TRAP_AUTO)
+    if output_times is not None:
+        output_times = _get_output_times(output_times, tstart, tstop)
+        out_index = 0
+        while out_index < len(output_times) and output_times[out_index] <= tstart:
+            points.append((output_times[out_index], x0))
+            out_index += 1
+    if resume_from is not None:
+        state = load_checkpoint(resume_from)
+        if state['method'] != method or state['x'].shape != x0.shape:
+            raise ValueError("The checkpoint %s does not match the analysis." % resume_from)
+        thebuffer._the_real_buffer = list(state['buffer'])
+        time, x = state['time'], state['x']
+        tstep, iter_n = state['tstep'], state['iter_n']
+        if variable_order:
+            gear_order = state['order']
+        order_steps, damped_steps = state['order_steps'], state['damped_steps']
+        for elem in switches:
+            elem.device.is_on = state['switches'][elem.part_id]
+        landed_events = dict((circ.get_elem_by_name(part_id), v)
+                             for part_id, v in state['landed_events'].items())
+        bp_index = np.searchsorted(breakpoints, time, side='right')
+        if output_times is not None:
+            out_index = np.searchsorted(output_times, time, side='right')
+        if sol is not None:
+            if state['outfile'] is not None:
+                sol._restore_data(*state['outfile'])
+            sol._restore_measures(state['measures'])
+        points = []
+        printing.print_info_line(("Resuming from t = %g s." % (time,), 3), verbose)
+    last_checkpoint = timeit.default_timer()
+    if steady_state:
+        if period is None:
+            period = steady_state_detection.get_period(circ)
+        detector = steady_state_detection.SteadyStateDetector(time, period, HMAX, aerror,
+                                                              rerror, nv)
+    else:
+        detector = None
+    solved = True
     printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
     tick = ticker.ticker(increments_for_step=1)
     tick.display(verbose > 1)
+    if points:
+        _add_lines(sol, points)
+        yield points
+        points = []
     while time < tstop:
+        # never step over a breakpoint and avoid leaving a sliver before it
+        on_breakpoint = False
+        if event is not None:
+            # a switch event was located in the last rejected step
+            tstep = event[0] - time
+        elif bp_index < len(breakpoints):
+            if breakpoints[bp_index] - time <= tstep:
+                tstep = breakpoints[bp_index] - time
+                on_breakpoint = True
+            elif breakpoints[bp_index] - time < 1.5*tstep:
+                tstep = (breakpoints[bp_index] - time)/2.
+        damped = False
         if iter_n < first_iterations_number:
             x_coeff, const, x_lte_coeff, prediction, pred_lte_coeff = \
             implicit_euler.get_df((thebuffer.get_df_vector()[0],), tstep, \
             predict=(use_step_control and iter_n >= start_pred_iter))
+        elif damped_steps and len(thebuffer.get_df_vector()) > 2:
+            damped = True
+            x_coeff, const, x_lte_coeff, prediction, pred_lte_coeff = \
+                gear.get_df_order(thebuffer.get_df_vector(), tstep, 2,
+                                  predict=(use_step_control and
+                                           iter_n >= start_pred_iter))
+        elif gear_order is not None:
+            x_coeff, const, x_lte_coeff, prediction, pred_lte_coeff = \
+                gear.get_df_order(thebuffer.get_df_vector(), tstep, gear_order,
+                                  predict=(use_step_control and
+                                           iter_n >= start_pred_iter))
         else:
             x_coeff, const, x_lte_coeff, prediction, pred_lte_coeff = \
                 df.get_df(thebuffer.get_df_vector(), tstep,
@@ -332,6 +628,8 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
                                    iter_n >= start_pred_iter)
                          )
 
+        switch_states = [elem.device.is_on for elem in switches]
+
         if options.transient_prediction_as_x0 and use_step_control and prediction is not None:
             x0 = prediction
         elif x is not None:
@@ -344,6 +642,7 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
                                                      time=(time + tstep),
                                                      locked_nodes=locked_nodes,
                                                      MAXIT=options.transient_max_nr_iter,
+                                                     bypass=bypass,
                                                      verbose=0
                                                      )
 
@@ -354,12 +653,13 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
                 if x_lte_coeff is not None and pred_lte_coeff is not None and prediction is not None:
                     # this is the Local Truncation Error :)
                     lte = abs((x_lte_coeff / (pred_lte_coeff - x_lte_coeff)) * (prediction - x1))
+                    order = gear_order if gear_order is not None else df.order
                     # it should NEVER happen that new_step > 2*tstep, for stability
                     new_step_coeff = 2
                     for index in range(x.shape[0]):
                         if lte[index, 0] != 0:
                             new_value = ((aerror[index, 0] + rerror[index, 0]*abs(x[index, 0])) / lte[index, 0]) \
-                            ** (1.0 / (df.order+1))
+                            ** (1.0 / (order+1))
                             if new_value < new_step_coeff:
                                 new_step_coeff = new_value
                             #print new_value
@@ -370,31 +670,136 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
                         #don't recalculate a x for a small change
                         tstep = check_step(new_step, time, tstop, HMAX)
                         #print "Apost. (reducing) step = "+str(tstep)
+                        # any event will be located again in the shorter step
+                        event = None
                         continue
                     tstep = check_step(new_step, time, tstop, HMAX) # used in the next iteration
                     #print "Apriori tstep = "+str(tstep)
                 else:
                     #print "LTE not calculated."
                     lte = None
+            if use_switch_events and switches and event is None:
+                last_time, last_x, last_dxdt = thebuffer.get_df_vector()[0]
+                if hermite:
+                    dxdt1 = np.multiply(x_coeff, x1) + const
+                else:
+                    # the TRAP derivatives ring, interpolate linearly
+                    last_dxdt = dxdt1 = None
+                event = get_switch_event([elem for elem in switches
+                                          if elem not in landed_events],
+                                         [is_on for elem, is_on in zip(switches, switch_states)
+                                          if elem not in landed_events],
+                                         last_time, last_x, last_dxdt, time + old_step, x1,
+                                         dxdt1)
+                if event is not None and \
+                   time + old_step - event[0] > \
+                   options.transient_switch_event_reltol*old_step:
+                    # reject the step and land on the event
+                    for elem, is_on in zip(switches, switch_states):
+                        elem.device.is_on = is_on
+                    printing.print_info_line(("At %g s switch event at %g s" % (time, event[0]), 5), verbose)
+                    continue
+            if variable_order and lte is not None:
+                order_steps += 1
+                if order_steps > gear_order:
+                    # the points since the last restart can be trusted
+                    new_order, new_step_coeff = select_gear_order(
+                        thebuffer.get_df_vector(), old_step, x, x1, aerror, rerror,
+                        gear_order, min(options.transient_gear_max_order, order_steps - 1))
+                    if new_order != gear_order:
+                        printing.print_info_line(("At %g s Gear order %d -> %d" %
+                                                  (time, gear_order, new_order), 5), verbose)
+                        gear_order = new_order
+                        order_steps = 0
+                        tstep = check_step(old_step*new_step_coeff, time, tstop, HMAX)
             if print_step_and_lte and lte is not None:
                 #if you wish to look at the step. We print just a lte
                 flte.write(str(time)+"\t"+str(old_step)+"\t"+str(lte.max())+"\n")
             # if we get here, either aposteriori_step_control is
             # disabled, or it's enabled and the error is small
             # enough. Anyway, the result is GOOD, STORE IT.
+            if damped:
+                damped_steps -= 1
+            elif method == TRAP_AUTO and \
+                 detect_ringing(thebuffer.get_df_vector(), x1, aerror, rerror):
+                printing.print_info_line(("At %g s TRAP ringing detected" % (time,), 5), verbose)
+                damped_steps = options.transient_trap_damping_steps
             time = time + old_step
+            if on_breakpoint or event is not None:
+                # snap to the breakpoint or to the switch event and restart
+                # with a short step
+                if on_breakpoint:
+                    time = breakpoints[bp_index]
+                    bp_index += 1
+                if event is not None:
+                    # landing may fall a bit short of the crossing: don't
+                    # locate it again until it is completed
+                    elem = event[1]
+                    is_on = switch_states[switches.index(elem)]
+                    v0 = _get_switch_control(elem, is_on, thebuffer.get_df_vector()[0][1])
+                    landed_events[elem] = (is_on, v0)
+                    event = None
+                if variable_order:
+                    # the history before a discontinuity is of no use
+                    gear_order = 1
+                    order_steps = 0
+                if method == TRAP_AUTO:
+                    damped_steps = options.transient_trap_damping_steps
+                tstep = check_step(min(tstep, old_step)*options.transient_breakpoint_step_coeff,
+                                   time, tstop, HMAX)
+            for elem, (is_on, v0) in list(landed_events.items()):
+                if elem.device.is_on != is_on or \
+                   v0*_get_switch_control(elem, is_on, x1) <= 0:
+                    del landed_events[elem]
             x = x1
             iter_n = iter_n + 1
-            sol.add_line(time, x)
 
             dxdt = np.multiply(x_coeff, x) + const
+            if output_times is None:
+                points.append((time, x))
+            else:
+                # write the requested points in ]last time, time]
+                last_time, last_x, last_dxdt = thebuffer.get_df_vector()[0]
+                if not hermite:
+                    last_dxdt = None
+                while out_index < len(output_times) and output_times[out_index] <= time:
+                    points.append((output_times[out_index],
+                                   interpolate_output(output_times[out_index], last_time,
+                                                      last_x, last_dxdt, time, x, dxdt)))
+                    out_index += 1
+            if detector is not None:
+                last_time, last_x, _ = thebuffer.get_df_vector()[0]
+                # allow for the rounding errors of fixed steps
+                while not detector.settled and \
+                      detector.next_time() <= time + 1e-6*(time - last_time):
+                    # linear interpolation: the derivatives computed by TRAP may
+                    # ring, the comparison would never succeed
+                    ts = detector.next_time()
+                    detector.add(ts, interpolate_output(ts, last_time, last_x, None,
+                                                        time, x, None))
+            _add_lines(sol, points)
             thebuffer.add((time, x, dxdt))
+            if adjoint is not None:
+                adjoint.add(time, x)
             if output_buffer is not None:
                 output_buffer.add((x, ))
             tick.step()
+            if checkpoint is not None and timeit.default_timer() - last_checkpoint >= \
+               options.transient_checkpoint_interval:
+                save_checkpoint(checkpoint, method, thebuffer, tstep, iter_n,
+                                dict((elem.part_id, elem.device.is_on) for elem in switches),
+                                landed_events, sol, gear_order if variable_order else None,
+                                order_steps, damped_steps)
+                last_checkpoint = timeit.default_timer()
+            if points:
+                yield points
+                points = []
+            if detector is not None and detector.settled:
+                break
         else:
             # If we get here, Newton failed to converge. We need to reduce the step...
             if use_step_control:
+                event = None
                 tstep = tstep/5.0
                 tstep = check_step(tstep, time, tstop, HMAX)
                 printing.print_info_line(("At %g s reducing step: %g s (convergence failed)" % (time, tstep), 5), verbose)
@@ -413,9 +818,36 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
 
     tick.hide(verbose > 1)
 
+    if not solved and checkpoint is not None:
+        # save the last accepted time point
+        save_checkpoint(checkpoint, method, thebuffer, tstep, iter_n,
+                        dict((elem.part_id, is_on) for elem, is_on in zip(switches, switch_states)),
+                        landed_events, sol, gear_order if variable_order else None,
+                        order_steps, damped_steps)
+
     if solved:
+        settled = detector is not None and detector.settled
+        if output_times is not None and not settled:
+            # the last time point may differ from tstop by a rounding error
+            points = [(t, x) for t in output_times[out_index:]]
+            if points:
+                _add_lines(sol, points)
+                yield points
         printing.print_info_line(("done.", 3), verbose)
-        printing.print_info_line(("Average time step: %g" % ((tstop - tstart)/iter_n,), 3), verbose)
+        printing.print_info_line(("Average time step: %g" % ((time - tstart)/iter_n,), 3), verbose)
+        if settled:
+            printing.print_info_line(("Steady state reached at t = %g s, period: %g s" %
+                                      (time, detector.period), 3), verbose)
+            if sol is not None:
+                sol.steady_state = (time, detector.period)
+        elif detector is not None:
+            printing.print_info_line(("Steady state not reached.", 3), verbose)
+        if adjoint is not None:
+            sol.sensitivities = adjoint.solve(verbose)
+        if bypass is not None:
+            printing.print_info_line(("Latent partitions bypassed: %d of %d evaluations" %
+                                      (bypass.bypassed, bypass.bypassed + bypass.evaluated), 3),
+                                     verbose)
 
         if output_buffer:
             ret_value = output_buffer.get_as_matrix()
@@ -425,7 +857,503 @@ def transient_analysis(circ, tstart, tstep, tstop, method=options.default_tran_m
         print("failed.")
         ret_value =  None
 
-    return ret_value
+    result['value'] = ret_value
+    result['solved'] = solved
+
+def _exponential_steps(circ, tstart, tstep, tstop, x0, mna, N, D, outfile,
+                       return_req_dict, save, output_times, checkpoint, resume_from,
+                       measures, verbose, result):
+    """Generator running the transient analysis of a linear circuit with the
+    exponential integrator, see :mod:`ahkab.expint`.
+
+    Same interface as :func:`_transient_steps`.
+    """
+    if circ.is_nonlinear():
+        raise ValueError("The %s method requires a linear circuit." % EXPONENTIAL)
+    if checkpoint is not None or resume_from is not None or return_req_dict:
+        raise ValueError("Checkpoints and return_req_dict are not supported " +
+                         "by the %s method." % EXPONENTIAL)
+    if outfile is not None:
+        sol = results.tran_solution(circ, tstart, tstop, op=x0, method=EXPONENTIAL,
+                                    outfile=outfile, save=save)
+        if measures:
+            sol.add_measures(measures)
+    else:
+        sol = None
+    if output_times is not None:
+        output_times = _get_output_times(output_times, tstart, tstop)
+        points = [(t, x0) for t in output_times[output_times <= tstart]]
+    else:
+        points = []
+    if points:
+        _add_lines(sol, points)
+        yield points
+    breakpoints = get_breakpoints(circ, tstart, tstop)
+    printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
+    for points in expint.expint_steps(circ, tstart, tstep, tstop, mna, N, D, x0,
+                                      breakpoints, output_times, verbose):
+        if points:
+            _add_lines(sol, points)
+            yield points
+    printing.print_info_line(("done.", 3), verbose)
+    result['value'] = sol
+    result['solved'] = True
+
+def _wr_steps(circ, tstart, tstep, tstop, x0, mna, N, D, outfile,
+              return_req_dict, save, output_times, checkpoint, resume_from,
+              measures, verbose, result):
+    """Generator running the transient analysis with waveform relaxation,
+    see :mod:`ahkab.wr`.
+
+    Same interface as :func:`_transient_steps`.
+    """
+    if checkpoint is not None or resume_from is not None or return_req_dict or \
+       output_times is not None:
+        raise ValueError("Checkpoints, output_times and return_req_dict are " +
+                         "not supported by the %s method." % WR)
+    if outfile is not None:
+        sol = results.tran_solution(circ, tstart, tstop, op=x0, method=WR,
+                                    outfile=outfile, save=save)
+        if measures:
+            sol.add_measures(measures)
+    else:
+        sol = None
+    printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
+    try:
+        for points in wr.wr_steps(circ, tstart, tstep, tstop, mna, N, D, x0,
+                                  verbose=verbose):
+            _add_lines(sol, points)
+            yield points
+    except RuntimeError as e:
+        printing.print_general_error(str(e))
+        result['value'] = None
+        result['solved'] = False
+        return
+    printing.print_info_line(("done.", 3), verbose)
+    result['value'] = sol
+    result['solved'] = True
+
+def _parareal_steps(circ, tstart, tstep, tstop, method, use_step_control, x0, mna, N,
+                    D, outfile, return_req_dict, save, output_times, checkpoint,
+                    resume_from, measures, verbose, result):
+    """Generator running the transient analysis with the Parareal algorithm,
+    see :mod:`ahkab.parareal`.
+
+    Same interface as :func:`_transient_steps`. The results are written every
+    ``tstep``, unless ``output_times`` is set.
+    """
+    if checkpoint is not None or resume_from is not None or return_req_dict:
+        raise ValueError("Checkpoints and return_req_dict are not supported " +
+                         "by the Parareal algorithm.")
+    if method == WR:
+        raise ValueError("The %s method can't be used with Parareal." % WR)
+    if outfile is not None:
+        sol = results.tran_solution(circ, tstart, tstop, op=x0, method=method,
+                                    outfile=outfile, save=save)
+        if measures:
+            sol.add_measures(measures)
+    else:
+        sol = None
+    output_times = _get_output_times(output_times if output_times is not None
+                                     else tstep, tstart, tstop)
+    points = [(t, x0) for t in output_times[output_times <= tstart]]
+    if points:
+        _add_lines(sol, points)
+        yield points
+    propagate = functools.partial(_propagate, circ, tstep, method, use_step_control,
+                                  mna, N, D)
+    bounds = parareal.get_slices(tstart, tstop)
+    printing.print_info_line(("Solving... ", 3), verbose, print_nl=False)
+    try:
+        for points in parareal.parareal_steps(propagate, bounds, x0,
+                                              output_times[output_times > tstart],
+                                              circ.get_nodes_number(),
+                                              verbose=verbose):
+            _add_lines(sol, points)
+            yield points
+    except RuntimeError as e:
+        printing.print_general_error(str(e))
+        result['value'] = None
+        result['solved'] = False
+        return
+    printing.print_info_line(("done.", 3), verbose)
+    result['value'] = sol
+    result['solved'] = True
+
+def _propagate(circ, tstep, method, use_step_control, mna, N, D, tstart, tstop, x0,
+               output_times, coarse):
+    """Propagator of the Parareal algorithm, see :func:`parareal.parareal_steps`.
+
+    The coarse propagator is implicit Euler, with
+    ``options.transient_parareal_coarse_steps`` fixed steps.
+    """
+    if coarse:
+        method, use_step_control = IMPLICIT_EULER, False
+        tstep = (tstop - tstart)/options.transient_parareal_coarse_steps
+    result = {}
+    points = []
+    for new_points in _transient_steps(circ, tstart, tstep, tstop, method, use_step_control,
+                                       x0, mna, N, D, None, None, None, output_times, None,
+                                       None, None, 0, result, allow_parareal=False):
+        points += new_points
+    if not result['solved']:
+        raise RuntimeError("Transient analysis failed in [%g, %g] s." % (tstart, tstop))
+    return points
+
+def _add_lines(sol, points):
+    """Write the ``(t, x)`` tuples in ``points`` to the results set, if any."""
+    if sol is not None:
+        for t, x in points:
+            sol.add_line(t, x)
+
+def save_checkpoint(filename, method, thebuffer, tstep, iter_n, switch_states,
+                    landed_events, sol, order=None, order_steps=0, damped_steps=0):
+    """Save the state of a transient analysis to a checkpoint file.
+
+    The state is made of the last accepted time points in the DF buffer,
+    the step size, the iteration counter, the order and the step counters
+    of the ``GEAR`` and ``TRAP_AUTO`` methods, the status of the switches,
+    the size of the results written so far and the state of the
+    measurements. The file is replaced atomically,
+    so a previous checkpoint survives an interruption while writing.
+
+    This function is called by :func:`transient_analysis`, resume the
+    analysis with its ``resume_from`` parameter.
+
+    **Parameters:**
+
+    filename : str
+        The checkpoint file.
+    method : str
+        The differentiation method.
+    thebuffer : dfbuffer instance
+        The buffer holding the last accepted time points.
+    tstep : float
+        The next time step.
+    iter_n : int
+        The number of accepted time points.
+    switch_states : dict
+        The status of each switch, with the switch ``part_id`` as key.
+    landed_events : dict
+        The switch events that were landed on, see :func:`get_switch_event`.
+    sol : tran_solution instance or None
+        The results set being written, if any.
+    order : int, optional
+        The current order of the variable-order Gear method, if used.
+    order_steps : int, optional
+        The steps taken by the variable-order Gear method since the last
+        order change or restart.
+    damped_steps : int, optional
+        The steps ``TRAP_AUTO`` is still to integrate with Gear2.
+    """
+    last_time, last_x, _ = thebuffer.get_df_vector()[0]
+    state = {'method': method, 'time': last_time, 'x': last_x,
+             'buffer': thebuffer.get_df_vector(), 'tstep': tstep,
+             'iter_n': iter_n, 'order': order, 'order_steps': order_steps,
+             'damped_steps': damped_steps, 'switches': switch_states,
+             'landed_events': dict((elem.part_id, v) for elem, v in
+                                   landed_events.items()),
+             'outfile': (sol.filename, sol._get_data_position())
+                        if sol is not None else None,
+             'measures': sol._get_measures_state() if sol is not None else []}
+    tmpfile = filename + '.tmp'
+    with open(tmpfile, 'wb') as fp:
+        pickle.dump(state, fp, protocol=2)
+    try:
+        os.replace(tmpfile, filename)
+    except AttributeError:
+        # Python 2
+        os.rename(tmpfile, filename)
+
+def load_checkpoint(filename):
+    """Load the state of a transient analysis from a checkpoint file.
+
+    .. warning::
+
+        This function employs ``pickle.load``: load checkpoints from
+        trusted sources only.
+
+    **Parameters:**
+
+    filename : str
+        The checkpoint file, written by :func:`save_checkpoint`.
+
+    **Returns:**
+
+    state : dict
+        The saved state.
+    """
+    with open(filename, 'rb') as fp:
+        state = pickle.load(fp)
+    return state
+
+def get_breakpoints(circ, tstart, tstop):
+    """Collect the breakpoints of the time-dependent sources in a circuit.
+
+    Only time functions providing a ``breakpoints(t0, t1)`` method are
+    considered, see :mod:`ahkab.time_functions`.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit.
+    tstart : float
+        The start time, breakpoints at ``tstart`` or before are discarded.
+    tstop : float
+        The stop time, breakpoints at ``tstop`` or later are discarded.
+
+    **Returns:**
+
+    bps : ndarray
+        The sorted breakpoints, without repetitions.
+    """
+    bps = []
+    for elem in circ:
+        if (isinstance(elem, components.sources.VSource) or
+            isinstance(elem, components.sources.ISource)) and \
+           elem.is_timedependent and \
+           hasattr(elem._time_function, 'breakpoints'):
+            bps += list(elem._time_function.breakpoints(tstart, tstop))
+    bps = np.unique(np.array(bps, dtype=float))
+    # don't keep points closer than hmin to each other or to the ends
+    bps = bps[(bps > tstart + options.hmin) & (bps < tstop - options.hmin)]
+    if len(bps) > 1:
+        bps = bps[np.concatenate(([True], np.diff(bps) > options.hmin))]
+    return bps
+
+def get_switch_event(switches, states, t0, x0, dxdt0, t1, x1, dxdt1):
+    """Locate the earliest switch event in a time step.
+
+    A switch event is the crossing, by the control voltage of a switch, of
+    the threshold that makes the switch commute. The control voltages are
+    interpolated over the step as in :func:`interpolate_output` and the
+    crossing is located with the Illinois variant of the regula falsi.
+
+    Crossings closer than ``options.transient_switch_event_reltol`` times
+    the step to its beginning are ignored: they are the events we just
+    landed on.
+
+    **Parameters:**
+
+    switches : list of switch_device instances
+        The switches to be checked.
+    states : list of booleans
+        The status of each switch at the beginning of the step.
+    t0, x0, dxdt0 : float, ndarray, ndarray or None
+        The time, solution and its derivative at the beginning of the step.
+    t1, x1, dxdt1 : float, ndarray, ndarray or None
+        The time, solution and its derivative at the end of the step.
+
+    **Returns:**
+
+    event : tuple or None
+        ``(t, elem)``, the time of the earliest event in the step and the
+        corresponding switch, or ``None`` if no event occurs.
+    """
+    h = t1 - t0
+    tol = max(options.transient_switch_event_reltol*h, options.hmin)
+    event = None
+    for elem, is_on in zip(switches, states):
+        v0 = _get_switch_control(elem, is_on, x0)
+        v1 = _get_switch_control(elem, is_on, x1)
+        if v0*v1 >= 0:
+            continue
+        if dxdt0 is None or dxdt1 is None:
+            dv0 = dv1 = None
+        else:
+            dv0 = _get_port_voltage(dxdt0, elem.sn1, elem.sn2)
+            dv1 = _get_port_voltage(dxdt1, elem.sn1, elem.sn2)
+        f = lambda t: interpolate_output(t, t0, v0, dv0, t1, v1, dv1)
+        t = _find_crossing(f, t0, v0, t1, v1, max(1e-9*h, options.hmin))
+        if t - t0 > tol and (event is None or t < event[0]):
+            event = (t, elem)
+    return event
+
+def _get_switch_control(elem, is_on, x):
+    """Get the control voltage of a switch minus its switching voltage."""
+    return _get_port_voltage(x, elem.sn1, elem.sn2) - \
+           elem.model.get_switching_voltage(is_on)
+
+def _get_port_voltage(x, n1, n2):
+    """Get the voltage of the port ``(n1, n2)`` from the reduced vector x."""
+    v = x[n1 - 1, 0] if n1 else 0.
+    if n2:
+        v -= x[n2 - 1, 0]
+    return v
+
+def _find_crossing(f, a, fa, b, fb, tol):
+    """Find the zero of ``f`` in ``[a, b]``, where ``fa*fb < 0``."""
+    side = 0
+    c = a
+    for _ in range(100):
+        c = (a*fb - b*fa)/(fb - fa)
+        fc = f(c)
+        if fc == 0 or b - a < tol:
+            break
+        if fc*fb > 0:
+            b, fb = c, fc
+            if side == -1:
+                fa /= 2.
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb /= 2.
+            side = 1
+    return c
+
+def _get_output_times(output_times, tstart, tstop):
+    """Build the sorted array of the times at which results are written."""
+    if np.isscalar(output_times):
+        if output_times <= 0:
+            raise ValueError("The print step must be positive, got %g" %
+                             output_times)
+        n = int(np.floor((tstop - tstart)/output_times + 1e-9))
+        times = tstart + output_times*np.arange(n + 1)
+        if tstop - times[-1] > 1e-9*output_times:
+            times = np.append(times, tstop)
+    else:
+        times = np.sort(np.asarray(output_times, dtype=float).reshape((-1,)))
+        times = times[(times >= tstart) & (times <= tstop)]
+    return times
+
+def interpolate_output(t, t0, x0, dxdt0, t1, x1, dxdt1):
+    """Interpolate the solution between two accepted time points.
+
+    The interpolating polynomial is the cubic Hermite polynomial matching
+    the solution and its time derivative, as computed by the
+    differentiation formula, at both ends of the interval. If a derivative is
+    not available (ie at the very first time point), linear interpolation is
+    used instead.
+
+    **Parameters:**
+
+    t : float
+        The time at which the solution is needed, ``t0 <= t <= t1``.
+    t0, x0, dxdt0 : float, ndarray, ndarray or None
+        The time, solution and its derivative at the beginning of the
+        interval.
+    t1, x1, dxdt1 : float, ndarray, ndarray or None
+        The time, solution and its derivative at the end of the interval.
+
+    **Returns:**
+
+    x : ndarray
+        The interpolated solution at time ``t``.
+    """
+    h = t1 - t0
+    if h <= 0:
+        return x1
+    s = min(max((t - t0)/h, 0.), 1.)
+    if dxdt0 is None or dxdt1 is None:
+        return x0 + s*(x1 - x0)
+    h00 = 2*s**3 - 3*s**2 + 1
+    h10 = s**3 - 2*s**2 + s
+    h01 = -2*s**3 + 3*s**2
+    h11 = s**3 - s**2
+    return h00*x0 + h10*h*dxdt0 + h01*x1 + h11*h*dxdt1
+
+def select_gear_order(pv_array, tstep, x, x1, aerror, rerror, order, max_order):
+    """Select the order of the variable-order Gear method for the next step.
+
+    The LTE of the step just computed is estimated for the orders
+    ``order-1``, ``order`` and ``order+1`` and the order that allows the
+    longest next step is selected. The order is changed only if the gain is
+    at least ``options.transient_gear_order_change_gain``.
+
+    The LTE of the order :math:`q` is :math:`C_{q+1} x^{(q+1)}`, where the
+    error constant :math:`C_{q+1}` accounts for the past steps, see
+    :func:`ahkab.gear.get_df_order`, and the derivative is estimated from
+    the divided difference of order :math:`q+1` of the new solution and of
+    the :math:`q+1` latest past points. The predictor-corrector (Milne)
+    estimate, used by the step control, would not do here: it holds only
+    if the predictor has the same order as the corrector that computed
+    ``x1``.
+
+    **Parameters:**
+
+    pv_array : list
+        The past points, as returned by ``dfbuffer.get_df_vector()``,
+        not including the new solution.
+    tstep : float
+        The time step just taken.
+    x : ndarray
+        The solution at the previous time point.
+    x1 : ndarray
+        The new solution, computed with the current order.
+    aerror, rerror : ndarrays
+        The absolute and relative tolerances on each variable.
+    order : int
+        The current order.
+    max_order : int
+        The highest order that may be selected. It should not exceed the
+        number of past points that are to be trusted, less one.
+
+    **Returns:**
+
+    (new_order, new_step_coeff) : tuple
+        The order to be used and the ratio of the next step to ``tstep``.
+    """
+    times = [pv_array[0][0] + tstep] + [t for t, _, _ in pv_array]
+    values = [x1] + [v for _, v, _ in pv_array]
+    best = None
+    for q in (order, order - 1, order + 1):
+        if q < 1 or q > max_order or len(pv_array) < q + 1:
+            continue
+        x_lte_coeff = gear.get_df_order(pv_array, tstep, q)[2]
+        derivative = factorial(q + 1)*_divided_difference(times[:q + 2], values[:q + 2])
+        lte = abs(x_lte_coeff*derivative)
+        with np.errstate(divide='ignore'):
+            coeffs = ((aerror + rerror*abs(x)) / lte) ** (1.0 / (q + 1))
+        # it should NEVER happen that new_step > 2*tstep, for stability
+        step_coeff = min(2., coeffs.min())
+        if best is None or \
+           step_coeff > options.transient_gear_order_change_gain*best[1]:
+            best = (q, step_coeff)
+    return best
+
+def _divided_difference(times, values):
+    """The divided difference of the highest order of ``values``, known at
+    the distinct time points ``times``."""
+    values = list(values)
+    for k in range(1, len(times)):
+        values = [(values[i] - values[i + 1])/(times[i] - times[i + k])
+                  for i in range(len(values) - 1)]
+    return values[0]
+
+def detect_ringing(pv_array, x1, aerror, rerror):
+    """Detect point-to-point ringing in the latest time points.
+
+    The trapezoidal rule is A-stable but it does not damp the stiff
+    components of the solution: after a discontinuity, or where the time
+    step is much longer than the fastest time constants, they show up as an
+    oscillation changing sign at every time point. It is detected as three
+    consecutive increments of a variable alternating in sign, the last two
+    larger than the tolerance.
+
+    **Parameters:**
+
+    pv_array : list
+        The past points, as returned by ``dfbuffer.get_df_vector()``,
+        not including the new solution.
+    x1 : ndarray
+        The new solution.
+    aerror, rerror : ndarrays
+        The absolute and relative tolerances on each variable.
+
+    **Returns:**
+
+    ringing : boolean
+        ``True`` if any variable is ringing.
+    """
+    if len(pv_array) < 3:
+        return False
+    d2 = x1 - pv_array[0][1]
+    d1 = pv_array[0][1] - pv_array[1][1]
+    d0 = pv_array[1][1] - pv_array[2][1]
+    tol = aerror + rerror*abs(x1)
+    return bool(np.any((d2*d1 < 0) & (d1*d0 < 0) &
+                       (abs(d2) > tol) & (abs(d1) > tol)))
 
 def check_step(tstep, time, tstop, HMAX):
     """Checks the step for several common issues and corrects them.
@@ -534,6 +1462,9 @@ def generate_D(circ, shape):
             D[n1, n2] = D[n1, n2] - elem.value
             D[n2, n2] = D[n2, n2] + elem.value
             D[n2, n1] = D[n2, n1] - elem.value
+        elif isinstance(elem, components.Macromodel):
+            ix = np.ix_(elem.nodes, elem.nodes)
+            D[ix] = D[ix] + elem.C
         elif isinstance(elem, components.Inductor):
             D[ nv + i_eq, nv + i_eq ] = -1 * elem.value
             # Mutual inductors (coupled inductors)
@@ -0,0 +1,324 @@
+# -*- coding: iso-8859-1 -*-
+# wr.py
+# Waveform relaxation transient analysis
+# Copyright 2015 Giuseppe Venturini
+#
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Waveform relaxation transient analysis.
+
+Circuits built from many loosely coupled sub-circuits can be solved one
+piece at a time. The unknowns are split in partitions at the subcircuit
+boundaries, see :func:`get_partitions`, and the simulation time is split
+in windows of ``options.transient_wr_window`` time steps.
+
+In each window, every partition is integrated on its own, with the
+trapezoidal rule and a fixed time step, taking the waveforms of the other
+partitions from the previous iteration (Gauss-Jacobi relaxation). The
+partitions are independent of each other within an iteration, so they are
+solved in parallel, in a pool of ``options.transient_wr_workers``
+processes. The iterations stop when no waveform moves more than the
+tolerances set by ``options.vea``, ``options.ver``, ``options.iea`` and
+``options.ier``; the result is then the same as the one of a fixed-step
+TRAP simulation of the whole circuit.
+
+Convergence is fast when the partitions are loosely coupled, for example
+when they exchange signals through high-impedance inputs. Tightly coupled
+partitions need many iterations, or shorter windows.
+
+This module is used by :func:`ahkab.transient.transient_analysis` when the
+``WR`` method is selected.
+
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import multiprocessing
+
+import numpy as np
+
+from . import circuit
+from . import dc_analysis
+from . import expint
+from . import options
+from . import printing
+from . import switch
+
+
+def get_partitions(circ):
+    """Partition the unknowns of a circuit at the subcircuit boundaries.
+
+    A node belongs to a subcircuit instance if the elements of that instance
+    are the only subcircuit elements connected to it, top level elements
+    aside: the ports of an instance are solved with it, unless they are
+    shared with other instances. The remaining nodes belong to the top level
+    partition. The current flowing in a voltage-defined element belongs to
+    the partition of its first (non-ground) node.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit.
+
+    **Returns:**
+
+    partitions : list of ndarrays
+        The indices of the unknowns of each partition, in the reduced MNA
+        system. Empty partitions are not returned.
+    """
+    nv = circ.get_nodes_number()
+    owners = {}
+    for elem in circ:
+        label = circuit.get_subckt_instance(elem)
+        for n in _get_nodes(elem):
+            owners.setdefault(n, set()).add(label)
+    groups = {None: []}
+    node_owner = {}
+    for n in range(1, nv):
+        labels = owners.get(n, set()) - set((None,))
+        label = list(labels)[0] if len(labels) == 1 else None
+        node_owner[n] = label
+        groups.setdefault(label, []).append(n - 1)
+    index = nv - 1
+    for elem in circ:
+        if circuit.is_elem_voltage_defined(elem):
+            n = elem.n1 if elem.n1 else elem.n2
+            groups.setdefault(node_owner.get(n), []).append(index)
+            index += 1
+    return [np.array(sorted(g), dtype=int) for g in groups.values() if g]
+
+
+def wr_steps(circ, tstart, tstep, tstop, mna, N, D, x0, window=None,
+             max_iter=None, workers=None, verbose=3):
+    """Generator solving a circuit with waveform relaxation.
+
+    **Parameters:**
+
+    circ : circuit instance
+        The circuit, it may not contain switches.
+    tstart, tstep, tstop : floats
+        The start time, the (fixed) time step and the stop time.
+    mna, N, D : ndarrays
+        The (reduced) circuit matrices.
+    x0 : ndarray
+        The solution at ``tstart``.
+    window : int, optional
+        The number of time steps in a window, defaults to
+        ``options.transient_wr_window``.
+    max_iter : int, optional
+        The maximum number of iterations in a window, defaults to
+        ``options.transient_wr_max_iter``.
+    workers : int, optional
+        The number of processes, defaults to
+        ``options.transient_wr_workers``. If set to 1, the partitions are
+        solved serially in the current process.
+    verbose : int, optional
+        The verbosity level.
+
+    **Yields:**
+
+    points : list
+        The new results, as ``(t, x)`` tuples, after every window.
+
+    :raises ValueError: if the circuit contains switches.
+    :raises RuntimeError: if the iterations do not converge in a window.
+    """
+    if any(isinstance(elem, switch.switch_device) for elem in circ):
+        raise ValueError("Switches are not supported by waveform relaxation.")
+    window = window if window is not None else options.transient_wr_window
+    max_iter = max_iter if max_iter is not None else options.transient_wr_max_iter
+    workers = workers if workers is not None else options.transient_wr_workers
+    n = mna.shape[0]
+    nv = circ.get_nodes_number()
+    partitions = get_partitions(circ)
+    aerror = np.zeros((n,))
+    aerror[:nv-1] = options.vea
+    aerror[nv-1:] = options.iea
+    rerror = np.zeros((n,))
+    rerror[:nv-1] = options.ver
+    rerror[nv-1:] = options.ier
+    G = np.asarray(mna + dc_analysis.build_gmin_matrix(circ, options.gmin, n,
+                                                       verbose))
+    D = np.asarray(D)
+    # each partition gets the rows of its own unknowns, restricted to the
+    # columns of its unknowns and of the ones it is coupled to (its
+    # boundary): only these waveforms are sent to it in the iterations
+    shared = {'G': [], 'D': [], 'elements': [], 'index': [],
+              'aerror': [], 'rerror': []}
+    unknowns = []
+    for P in partitions:
+        rows = set(P[P < nv - 1] + 1)
+        elements = [elem for elem in circ if elem.is_nonlinear and
+                    rows.intersection(_get_nodes(elem))]
+        coupled = np.any(G[P, :] != 0, axis=0) | np.any(D[P, :] != 0, axis=0)
+        boundary = set(np.flatnonzero(coupled))
+        for elem in elements:
+            boundary.update(node - 1 for node in _get_drive_nodes(elem))
+        boundary = np.array(sorted(boundary.difference(P)), dtype=int)
+        L = np.concatenate((P, boundary))
+        unknowns.append(L)
+        shared['G'].append(G[np.ix_(P, L)])
+        shared['D'].append(D[np.ix_(P, L)])
+        shared['elements'].append(elements)
+        shared['index'].append(dict((i, j) for j, i in enumerate(L)))
+        shared['aerror'].append(aerror[P])
+        shared['rerror'].append(rerror[P])
+    if not workers:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(partitions))
+    printing.print_info_line(("Partitions: %d, workers: %d" %
+                              (len(partitions), workers), 3), verbose)
+    steps = max(int(np.ceil((tstop - tstart)/tstep*(1 - 1e-9))), 1)
+    times = np.linspace(tstart, tstop, steps + 1)
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, _init_worker, (shared,))
+        solve = pool.map
+    else:
+        _init_worker(shared)
+        solve = lambda f, tasks: [f(task) for task in tasks]
+    try:
+        x, dxdt = np.asarray(x0).reshape((-1,)), np.zeros((n,))
+        total_iter = 0
+        for start in range(0, steps, window):
+            wtimes = times[start:start + window + 1]
+            Ns = (N + expint.get_source_vectors(circ, wtimes, n)).T
+            X = np.tile(x, (len(wtimes), 1))
+            DX = np.tile(dxdt, (len(wtimes), 1))
+            for iteration in range(max_iter):
+                tasks = [(k, wtimes, X[:, L], DX[:, L], Ns[:, P], start == 0)
+                         for k, (P, L) in enumerate(zip(partitions, unknowns))]
+                newX, newDX = X.copy(), DX.copy()
+                converged = True
+                for P, (XP, DXP, ok) in zip(partitions,
+                                            solve(_integrate_partition, tasks)):
+                    newX[:, P], newDX[:, P] = XP, DXP
+                    converged = converged and ok
+                delta = abs(newX - X)
+                X, DX = newX, newDX
+                if converged and np.all(delta <= aerror + rerror*abs(X)):
+                    break
+            else:
+                raise RuntimeError("Waveform relaxation failed to converge " +
+                                   "in %d iterations at t = %g s." %
+                                   (max_iter, wtimes[0]))
+            total_iter += iteration + 1
+            x, dxdt = X[-1], DX[-1]
+            yield [(t, xk.reshape((-1, 1))) for t, xk in zip(wtimes[1:], X[1:])]
+        printing.print_info_line(("Waveform relaxation iterations: %d" %
+                                  (total_iter,), 3), verbose)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+_shared = {}
+
+
+def _init_worker(shared):
+    # the matrices are sent to each process once
+    _shared.update(shared)
+
+
+def _integrate_partition(task):
+    # integrate the unknowns of partition k over a window, the waveforms of
+    # its boundary are taken from X, DX. X and DX hold the partition
+    # unknowns first, then its boundary, Ns the partition rows only.
+    k, times, X, DX, Ns, euler_start = task
+    G, D = _shared['G'][k], _shared['D'][k]
+    elements, index = _shared['elements'][k], _shared['index'][k]
+    aerror, rerror = _shared['aerror'][k], _shared['rerror'][k]
+    m = G.shape[0]
+    GPP, DPP = G[:, :m], D[:, :m]
+    X, DX = X.copy(), DX.copy()
+    # the element stamps outside of the partition go to the last row and
+    # column, which are discarded
+    J, Tx = np.zeros((m + 1, m + 1)), np.zeros((m + 1, 1))
+    Jl, Txl = _LocalView(J, index, m, 2), _LocalView(Tx, index, m, 1)
+    converged = True
+    for i in range(1, len(times)):
+        h = times[i] - times[i - 1]
+        if i == 1 and euler_start:
+            # implicit Euler on the first step, as the fixed-step TRAP does
+            C1, C0 = 1./h, -X[i - 1]/h
+        else:
+            C1, C0 = 2./h, -2./h*X[i - 1] - DX[i - 1]
+        x = X[i].copy()
+        xl = _LocalView(x.reshape((-1, 1)), index, None, 1)
+        for _ in range(options.transient_max_nr_iter):
+            J[:], Tx[:] = 0., 0.
+            for elem in elements:
+                dc_analysis._update_J_and_Tx(Jl, Txl, xl, elem, times[i])
+            F = G.dot(x) + D.dot(C1*x + C0) + Ns[i] + Tx[:m, 0]
+            dx = np.linalg.solve(GPP + C1*DPP + J[:m, :m], -F)
+            x[:m] += dx
+            if not elements or np.all(abs(dx) <= aerror + rerror*abs(x[:m])):
+                break
+        else:
+            converged = False
+        X[i, :m] = x[:m]
+        DX[i, :m] = C1*x[:m] + C0[:m]
+    return X[:, :m], DX[:, :m], converged
+
+
+class _LocalView(object):
+    # index an array holding the unknowns of a partition with the indices of
+    # the whole MNA system, on its first dims dimensions. The unknowns not in
+    # index map to default, or raise a KeyError if it is None.
+    def __init__(self, a, index, default, dims):
+        self.a, self.index, self.default, self.dims = a, index, default, dims
+
+    def _map(self, i):
+        if np.ndim(i):
+            return [self._map(j) for j in i]
+        if self.default is None:
+            return self.index[int(i)]
+        return self.index.get(int(i), self.default)
+
+    def _key(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        return tuple(self._map(i) if d < self.dims else i
+                     for d, i in enumerate(key))
+
+    def __getitem__(self, key):
+        return self.a[self._key(key)]
+
+    def __setitem__(self, key, value):
+        self.a[self._key(key)] = value
+
+
+def _get_nodes(elem):
+    # the (non-ground) nodes where an element injects current, all the
+    # nodes of the multiport ones, such as the macromodels
+    nodes = set(getattr(elem, 'nodes', (elem.n1, elem.n2)))
+    if elem.is_nonlinear:
+        for port in elem.get_output_ports():
+            nodes.update(port)
+    nodes.discard(0)
+    return nodes
+
+
+def _get_drive_nodes(elem):
+    # the (non-ground) nodes whose voltages drive a nonlinear element
+    nodes = set()
+    for index in range(len(elem.get_output_ports())):
+        for port in elem.get_drive_ports(index):
+            nodes.update(port)
+    nodes.discard(0)
+    return nodes
@@ -0,0 +1,137 @@
+# -*- coding: iso-8859-1 -*-
+# test_ac_direct.py
+# Unit tests for the direct solution of AC analyses
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import ac, options
+
+
+class TestACDirect:
+    """Test the direct solution of AC analyses"""
+    def setUp(self):
+        self.old_options = (options.ac_block_size, options.dense_matrix_limit)
+        cir = ahkab.Circuit('RC low-pass')
+        cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, ac_value=1)
+        cir.add_resistor('R1', 'in', 'out', 1e3)
+        cir.add_capacitor('C1', 'out', cir.gnd, 1e-9)
+        self.cir = cir
+
+    def tearDown(self):
+        options.ac_block_size, options.dense_matrix_limit = self.old_options
+
+    def _check(self):
+        r = ahkab.run(self.cir, ahkab.new_ac(1e3, 1e8, 51, x0=None))['ac']
+        f = np.logspace(3, 8, 51)
+        H = 1./(1. + 2j*np.pi*f*1e3*1e-9)
+        assert np.allclose(r['f'], f)
+        assert np.allclose(r['Vout'], H, rtol=1e-6, atol=1e-9)
+
+    def test_default_sweep(self):
+        """Test AC with sweep_type=None"""
+        ac = ahkab.new_ac(1e3, 1e8, 51, x0=None, sweep_type=None)
+        r = ahkab.run(self.cir, ac)['ac']
+        assert np.allclose(r['f'], np.logspace(3, 8, 51))
+
+    def test_dense(self):
+        """Test AC on dense matrices, in blocks, against the exact response"""
+        for block_size in (1, 7, 64):
+            options.ac_block_size = block_size
+            self._check()
+
+    def test_workers(self):
+        """Test AC with frequencies split among processes"""
+        options.ac_block_size = 7
+        r = ahkab.run(self.cir, ahkab.new_ac(1e3, 1e8, 51, x0=None))['ac']
+        for method in ('direct', 'schur'):
+            ac = ahkab.new_ac(1e3, 1e8, 51, x0=None, method=method, workers=3)
+            rp = ahkab.run(self.cir, ac)['ac']
+            assert np.allclose(rp['f'], r['f'])
+            assert np.allclose(rp['Vout'], r['Vout'], rtol=1e-9, atol=0)
+
+    def test_sparse(self):
+        """Test AC on sparse matrices against the exact response"""
+        options.dense_matrix_limit = 0
+        options.ac_block_size = 7
+        self._check()
+
+
+class TestACSchur:
+    """Test AC analyses with the Schur method"""
+    def setUp(self):
+        self.old_block_size = options.ac_block_size
+        # a twin-T notch filter and a series RLC resonator, driven together
+        cir = ahkab.Circuit('Twin-T notch and RLC')
+        cir.add_vsource('V1', 'in', cir.gnd, dc_value=1, ac_value=1)
+        cir.add_capacitor('C1', 'in', 'n1', 2.2e-12)
+        cir.add_capacitor('C2', 'n1', 'out', 2.2e-12)
+        cir.add_resistor('R1', 'n1', cir.gnd, 1e3)
+        cir.add_resistor('R2', 'in', 'n2', 2e3)
+        cir.add_resistor('R3', 'n2', 'out', 2e3)
+        cir.add_capacitor('C3', 'n2', cir.gnd, 2*2.2e-12)
+        cir.add_resistor('R4', 'in', 'n3', 10)
+        cir.add_inductor('L1', 'n3', 'n4', 1e-6)
+        cir.add_capacitor('C4', 'n4', cir.gnd, 1e-9)
+        self.cir = cir
+
+    def tearDown(self):
+        options.ac_block_size = self.old_block_size
+
+    def test_schur(self):
+        """Test AC with the Schur method against the direct one"""
+        options.ac_block_size = 7
+        ac = ahkab.new_ac(1e5, 1e10, 101, x0=None)
+        ref = ahkab.run(self.cir, ac)['ac']
+        ac = ahkab.new_ac(1e5, 1e10, 101, x0=None, method='schur')
+        r = ahkab.run(self.cir, ac)['ac']
+        for v in ('Vout', 'Vn4', 'I(L1)'):
+            assert np.allclose(r[v], ref[v], rtol=1e-6, atol=1e-12)
+
+    def test_qz(self):
+        """Test the generalized Schur reduction of ac._reduce_pencil()"""
+        mna = np.array([[1e-3, -1e-3], [-1e-3, 1e-3]])
+        AC = np.array([[0, 0], [0, 1e-9]])
+        Nac = np.array([[-1e-3], [0]])
+        omegas = np.array([1e3, 1e6, 1e9])
+        # A0 is singular, the eigenvector basis is not available
+        solve = ac._reduce_pencil(mna, AC, Nac, omegas)
+        assert solve.func is ac._solve_block_qz
+        for k, omega in enumerate(omegas):
+            x = np.linalg.solve(mna + 1j*omega*AC, -Nac)
+            assert np.allclose(solve(omegas)[:, k:k+1], x)
+
+
+def test_adaptive():
+    """Test the adaptive AC sweep on a high-Q resonator"""
+    cir = ahkab.Circuit('RLC')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, ac_value=1)
+    cir.add_resistor('R1', 'in', 'n1', 1)
+    cir.add_inductor('L1', 'n1', 'out', 1e-6)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-9)
+    ac = ahkab.new_ac(1e5, 1e8, 31, x0=None, sweep_type='ADAPTIVE',
+                      save=['V(out)'])
+    r = ahkab.run(cir, ac)['ac']
+    f = r['f']
+    assert np.all(np.diff(f) > 0) and f[0] == 1e5 and np.isclose(f[-1], 1e8)
+    assert len(f) < 300
+    # the response between the points is interpolated within tolerance
+    fd = np.logspace(5, 8, 2001)
+    s = 2j*np.pi*fd
+    H = 1./(1. + s*1e-9 + s*s*1e-15)
+    mag = np.interp(np.log(fd), np.log(f), 20*np.log10(abs(r['Vout'])))
+    assert np.allclose(mag, 20*np.log10(abs(H)), rtol=0, atol=.1)
@@ -0,0 +1,56 @@
+# -*- coding: iso-8859-1 -*-
+# test_breakpoints.py
+# Unit tests for the breakpoints of the time functions
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import time_functions, transient
+
+
+def test_time_functions_breakpoints():
+    """Test the breakpoints() method of the time functions"""
+    p = time_functions.pulse(v1=0, v2=1, td=1., tr=.5, pw=2., tf=.5, per=5.)
+    assert np.allclose(p.breakpoints(0, 11), [1., 1.5, 3.5, 4., 6., 6.5, 8.5,
+                                              9., 11.])
+    assert np.allclose(p.breakpoints(5.5, 7), [6., 6.5])
+    s = time_functions.sin(vo=0, va=1, freq=1e3, td=1e-3)
+    assert s.breakpoints(0, 1e-2) == [1e-3]
+    assert s.breakpoints(2e-3, 1e-2) == []
+    e = time_functions.exp(v1=0, v2=1, td1=1., tau1=.1, td2=3., tau2=.1)
+    assert e.breakpoints(0, 10) == [1., 3.]
+    w = time_functions.pwl([0, 1, 2, 3], [0, 1, 1, 0], repeat=True,
+                           repeat_time=1, td=.5)
+    assert np.allclose(w.breakpoints(0, 6), [.5, 1.5, 2.5, 3.5, 4.5, 5.5])
+    w = time_functions.pwl([0, 1, 2, 3], [0, 1, 1, 0])
+    assert np.allclose(w.breakpoints(.5, 10), [1, 2, 3])
+
+
+def test_tran_breakpoints():
+    """Test TRAN step control landing on breakpoints"""
+    cir = ahkab.Circuit('RC pulse')
+    pulse = time_functions.pulse(v1=0, v2=1, td=1e-6, tr=1e-9, pw=5e-6,
+                                 tf=1e-9, per=10e-6)
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=pulse)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-9)
+    bps = transient.get_breakpoints(cir, 0, 20e-6)
+    assert np.allclose(bps, pulse.breakpoints(1e-12, 20e-6 - 1e-12))
+    tran = ahkab.new_tran(0, 20e-6, 1e-7, x0=None)
+    r = ahkab.run(cir, tran)['tran']
+    for bp in bps:
+        assert np.min(np.abs(r['T'] - bp)) == 0.
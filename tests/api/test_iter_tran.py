@@ -0,0 +1,70 @@
+# -*- coding: iso-8859-1 -*-
+# test_iter_tran.py
+# Unit tests for the streaming TRAN interface
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+
+
+def _build_rc():
+    cir = ahkab.Circuit('RC low-pass')
+    mys = ahkab.time_functions.sin(vo=0, va=1, freq=1e3)
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=mys)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 100e-9)
+    return cir
+
+
+def test_iter_tran():
+    """Test ahkab.iter_tran() against ahkab.run()"""
+    ref = ahkab.run(_build_rc(), ahkab.new_tran(0, 2e-3, 1e-5, x0=None))
+    ref = ref['tran'].asarray()
+    blocks = list(ahkab.iter_tran(_build_rc(), 0, 2e-3, 1e-5))
+    t = np.concatenate([b[0] for b in blocks])
+    x = np.concatenate([b[1] for b in blocks], axis=1)
+    assert np.all(t == ref[0, :])
+    assert np.all(x == ref[1:, :])
+
+
+def test_iter_tran_output_times():
+    """Test ahkab.iter_tran() with a print step"""
+    t = np.concatenate([b[0] for b in
+                        ahkab.iter_tran(_build_rc(), 0, 2e-3, 1e-5,
+                                        output_times=1e-4)])
+    assert np.allclose(t, np.linspace(0, 2e-3, 21), rtol=0, atol=1e-15)
+
+
+def test_iter_tran_early_stop():
+    """Test stopping ahkab.iter_tran() early"""
+    cir = _build_rc()
+    nout = cir.nodes_dict['out'] - 1
+    tstop = None
+    for t, x in ahkab.iter_tran(cir, 0, 2e-3, 1e-5):
+        if (x[nout, :] > .5).any():
+            tstop = t[-1]
+            break
+    assert tstop is not None and tstop < 1e-3
+
+
+def test_iter_transient_order():
+    """Test transient.iter_transient() takes tstart, tstop, tstep"""
+    t = np.concatenate([b[0] for b in
+                        ahkab.transient.iter_transient(_build_rc(), 0, 2e-3,
+                                                       1e-5,
+                                                       output_times=1e-4)])
+    assert np.allclose(t, np.linspace(0, 2e-3, 21), rtol=0, atol=1e-15)
@@ -0,0 +1,95 @@
+# -*- coding: iso-8859-1 -*-
+# test_latency.py
+# Unit tests for the latency exploitation in TRAN
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import os
+import tempfile
+import numpy as np
+import ahkab
+from ahkab import latency, netlist_parser, options
+
+NETLIST = """* diode clamps, only the first one is active
+.model diode dmod is=1e-14
+.subckt clamp in out
+r1 in out 1k
+d1 out 0 dmod
+c1 out 0 1n
+.ends
+v1 a 0 type=vdc vdc=0 type=pulse v1=0 v2=2 td=1u tr=10n tf=10n pw=5u per=20u
+v2 b 0 type=vdc vdc=1
+x1 name=clamp in=a out=o1
+x2 name=clamp in=b out=o2
+x3 name=clamp in=b out=o3
+d1 b o4 dmod
+d2 o4 0 dmod
+r1 o4 0 1k
+.end
+"""
+
+
+class TestLatency:
+    """Test the bypass of latent partitions in TRAN"""
+    def setUp(self):
+        fd, filename = tempfile.mkstemp(suffix='.ckt')
+        with os.fdopen(fd, 'w') as fp:
+            fp.write(NETLIST)
+        self.circ = netlist_parser.parse_circuit(filename)[0]
+        os.remove(filename)
+        self.old_option = options.transient_use_latency
+
+    def tearDown(self):
+        options.transient_use_latency = self.old_option
+
+    def test_partitions(self):
+        """Test latency.get_partitions()"""
+        partitions = latency.get_partitions(self.circ)
+        partitions = sorted(sorted(e.part_id for e in p) for p in partitions)
+        # one per subckt instance, connected top-level elements together
+        assert partitions == [['d-x1-clamp-1'], ['d-x2-clamp-1'],
+                              ['d-x3-clamp-1'], ['d1', 'd2']]
+
+    def test_tran_latency(self):
+        """Test TRAN with options.transient_use_latency"""
+        op = ahkab.run(self.circ, ahkab.new_op())['op']
+        res = {}
+        for use_latency in (False, True):
+            options.transient_use_latency = use_latency
+            tran = ahkab.new_tran(0, 20e-6, 1e-7, x0=op, output_times=1e-7)
+            res[use_latency] = ahkab.run(self.circ, tran)['tran']
+        for v in ('Vo1', 'Vo2', 'Vo4'):
+            assert np.allclose(res[True][v], res[False][v], rtol=0,
+                               atol=1e-6)
+
+    def test_bypass(self):
+        """Test latency.LatencyBypass against the full evaluation"""
+        n = self.circ.get_nodes_number() - 1 + \
+            len([e for e in self.circ
+                 if ahkab.circuit.is_elem_voltage_defined(e)])
+        x = np.linspace(.1, .7, n).reshape((-1, 1))
+        J, Tx = np.zeros((n, n)), np.zeros((n, 1))
+        for elem in self.circ:
+            if elem.is_nonlinear:
+                ahkab.dc_analysis._update_J_and_Tx(J, Tx, x, elem, None)
+        bypass = latency.LatencyBypass(self.circ, vtol=1e-3)
+        for dx in (0., 1e-4):
+            Jb, Txb = np.zeros((n, n)), np.zeros((n, 1))
+            bypass.update_J_and_Tx(Jb, Txb, x + dx, None)
+            assert np.allclose(Jb, J)
+            assert np.allclose(Txb, Tx + J.dot(dx*np.ones((n, 1))))
+        # the second time, all the partitions were latent
+        assert bypass.evaluated == bypass.bypassed == 4
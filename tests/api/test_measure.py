@@ -0,0 +1,110 @@
+# -*- coding: iso-8859-1 -*-
+# test_measure.py
+# Unit tests for the measurements
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import measure, netlist_parser
+
+
+def _feed(measures, t, *waves):
+    for m in measures:
+        m.bind(['VIN', 'VOUT'])
+    for i in range(len(t)):
+        x = np.array([[w[i]] for w in waves])
+        for m in measures:
+            m.update(t[i], x)
+
+
+def test_measures():
+    """Test the measurements on known waveforms"""
+    t = np.linspace(0, 2, 20001)
+    vin = np.sin(2*np.pi*t)
+    vout = np.sin(2*np.pi*(t - .1))
+    ms = [measure.Average('avg', 'v(in)', start=0, stop=.5),
+          measure.RMS('rms', 'v(in)'),
+          measure.Integral('integ', 'v(in)', start=0, stop=.5),
+          measure.Minimum('min', 'v(in)'),
+          measure.Maximum('max', 'v(in)'),
+          measure.PeakToPeak('pp', 'v(in)'),
+          measure.When('when', 'v(in)', val=.5, edge='fall', n=2),
+          measure.RiseTime('rise', 'v(in)', low=-.5, high=.5),
+          measure.FallTime('fall', 'v(in)', low=-.5, high=.5),
+          measure.Delay('delay', 'v(in)', 'v(out)', val=0., edge='rise')]
+    _feed(ms, t, vin, vout)
+    values = dict((m.name, m.value) for m in ms)
+    assert np.allclose(values['avg'], 2/np.pi, rtol=1e-6)
+    assert np.allclose(values['rms'], 1/np.sqrt(2), rtol=1e-6)
+    assert np.allclose(values['integ'], 1/np.pi, rtol=1e-6)
+    assert np.allclose([values['min'], values['max'], values['pp']],
+                       [-1, 1, 2])
+    assert np.allclose(values['when'], 1 + 5./12, rtol=1e-6)
+    assert np.allclose(values['rise'], 1./6, rtol=1e-6)
+    assert np.allclose(values['fall'], 1./6, rtol=1e-6)
+    assert np.allclose(values['delay'], .1, rtol=1e-6)
+    # never reached
+    m = measure.When('never', 'v(in)', val=2.)
+    _feed([m], t, vin, vout)
+    assert m.value is None
+
+
+def test_analyses_measures():
+    """Test measurements in TRAN, AC and DC analyses"""
+    cir = ahkab.Circuit('RC low-pass')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1, ac_value=1,
+                    function=ahkab.time_functions.pulse(
+                        v1=0, v2=1, td=1e-4, tr=1e-9, pw=1e-3, tf=1e-9,
+                        per=2e-3))
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 100e-9)
+    tran = ahkab.new_tran(0, 1e-3, 1e-6, x0=None,
+                          measures=[measure.RiseTime('trise', 'V(out)',
+                                                     low=.1, high=.9)])
+    ac = ahkab.new_ac(1, 1e6, 1000, x0=None, save=['V(in)'],
+                      measures=[measure.When('f3db', 'V(out)',
+                                             val=1/np.sqrt(2))])
+    dc = ahkab.new_dc(0, 2, 21, 'V1',
+                      measures=[measure.When('vhalf', 'V(out)', val=.5)])
+    r = ahkab.run(cir, [tran, ac, dc])
+    # unsaved variables can be measured
+    assert 'Vout' not in r['ac']
+    assert np.allclose(r['tran'].measures['trise'], np.log(9)*1e-4,
+                       rtol=1e-2)
+    assert np.allclose(r['ac'].measures['f3db'], 1/(2*np.pi*1e-4), rtol=1e-2)
+    assert np.allclose(r['dc'].measures['vhalf'], .5)
+
+
+def test_parse_measures():
+    """Test netlist_parser.parse_measures"""
+    directives = [('.op', 2),
+                  ('.measure tran trise rise v(out) low=0.1 high=0.9', 3),
+                  ('.tran 1n 1u', 4),
+                  ('.meas tran tpd delay v(in) v(out) val=0.5 edge=rise ' +
+                   'from=1u * comment', 5),
+                  ('.measure ac vmax max v(out)', 6)]
+    measures = netlist_parser.parse_measures(directives)
+    assert sorted(measures.keys()) == ['ac', 'tran']
+    trise, tpd = measures['tran']
+    assert isinstance(trise, measure.RiseTime)
+    assert isinstance(tpd, measure.Delay)
+    assert tpd.variables == ('v(in)', 'v(out)')
+    assert tpd.edge == 'rise' and tpd.start == 1e-6 and tpd.val == .5
+    assert isinstance(measures['ac'][0], measure.Maximum)
+    # .measure directives are not analyses
+    an = netlist_parser.parse_analysis(None, directives)
+    assert [a['type'] for a in an] == ['op', 'tran']
@@ -0,0 +1,84 @@
+# -*- coding: iso-8859-1 -*-
+# test_noise.py
+# Unit tests for the NOISE analysis
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import constants, netlist_parser, noise
+
+
+def test_rc_noise():
+    """Test NOISE on an RC divider against the analytic PSD"""
+    cir = ahkab.Circuit('RC divider')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, ac_value=1)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_resistor('R2', 'out', cir.gnd, 3e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-9)
+    r = ahkab.run(cir, ahkab.new_noise('V(out)', 1e3, 1e8, 20,
+                                       source='V1'))['noise']
+    kT4, R = 4*constants.k*constants.T, 750.
+    w = 2*np.pi*r['f']
+    assert np.allclose(r['onoise'], np.sqrt(kT4*R/(1 + (w*R*1e-9)**2)))
+    assert np.allclose(r['onoise']**2, r['onoise(R1)']**2 + r['onoise(R2)']**2)
+    # R1 and R2 referred to the input are a 750 ohm resistor, scaled
+    assert np.allclose(r['inoise'], np.sqrt(kT4*R)/.75)
+
+
+def test_diode_mos_noise():
+    """Test NOISE on a non-linear circuit against one AC run per source"""
+    cir = ahkab.Circuit('Diode-biased common source stage')
+    cir.add_model('diode', 'dm', dict(IS=1e-14, KF=1e-14, AF=1.2))
+    cir.add_model('mosq', 'nch', dict(TYPE='n', KF=1e-26))
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=5, ac_value=1)
+    cir.add_vsource('V2', 'vdd', cir.gnd, dc_value=5)
+    cir.add_resistor('R1', 'in', 'n1', 10e3)
+    cir.add_diode('D1', 'n1', cir.gnd, 'dm')
+    cir.add_resistor('R2', 'vdd', 'out', 10e3)
+    cir.add_mos('M1', 'out', 'n1', cir.gnd, cir.gnd, w=1e-6, l=1e-6,
+                model_label='nch')
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-12)
+    op = ahkab.run(cir, ahkab.new_op())['op']
+    r = ahkab.run(cir, ahkab.new_noise('out', 10, 1e9, 9, source='V1',
+                                       x0=op))['noise']
+    sources = noise.get_noise_sources(cir, op.asarray())
+    assert len(sources) == 4
+    # one AC run per noise source, with a unit current in its place
+    cir.get_elem_by_name('V1').ac_value = 0
+    for part_id, n1, n2, white, flicker, ffe in sources:
+        cir.add_isource('IN', cir.nodes_dict[n1], cir.nodes_dict[n2],
+                        dc_value=0, ac_value=1)
+        ac = ahkab.run(cir, ahkab.new_ac(10, 1e9, 9, x0=op))['ac']
+        cir.remove_elem('IN')
+        psd = white + flicker/ac['f']**ffe
+        assert np.allclose(r['onoise(%s)' % part_id],
+                           np.abs(ac['Vout'])*np.sqrt(psd))
+    cir.get_elem_by_name('V1').ac_value = 1
+    ac = ahkab.run(cir, ahkab.new_ac(10, 1e9, 9, x0=op))['ac']
+    assert np.allclose(r['inoise'], r['onoise']/np.abs(ac['Vout']))
+    # shot noise, flicker noise
+    i_d = op['I(V1)'][0, 0]
+    assert np.allclose(sources[1][3:], (2*constants.e*abs(i_d),
+                                        1e-14*abs(i_d)**1.2, 1.))
+
+
+def test_noise_netlist():
+    """Test the .NOISE directive"""
+    an = netlist_parser.parse_single_analysis('.noise V(out,ref) V1 ' +
+                                              'nsteps=10 start=1 stop=1k')
+    assert an['output'] == 'V(out,ref)' and an['source'] == 'V1'
+    assert an['sweep_type'] == 'LOG' and an['points'] == 10
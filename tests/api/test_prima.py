@@ -0,0 +1,168 @@
+# -*- coding: iso-8859-1 -*-
+# test_prima.py
+# Unit tests for the PRIMA model order reduction
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import options, prima, time_functions
+
+
+def _build_ladder(stages):
+    cir = ahkab.Circuit('RC ladder')
+    cir.add_vsource('V1', 'n0', cir.gnd, dc_value=0, ac_value=1)
+    for i in range(stages):
+        cir.add_resistor('R%d' % i, 'n%d' % i, 'n%d' % (i + 1), 10)
+        cir.add_capacitor('C%d' % i, 'n%d' % (i + 1), cir.gnd,
+                          1e-12*(1 + i % 7))
+    cir.add_inductor('L1', 'n%d' % stages, 'out', 1e-7)
+    cir.add_capacitor('CL', 'out', cir.gnd, 1e-10)
+    return cir
+
+
+def test_moments():
+    """Test the moment matching of prima.get_basis()"""
+    np.random.seed(0)
+    n = 12
+    G = 2*np.eye(n) - np.eye(n, k=1) - np.eye(n, k=-1) + 1e-2*np.eye(n)
+    C = np.diag(1 + np.random.rand(n))
+    B = np.zeros((n, 2))
+    B[0, 0], B[-1, 1] = 1., 1.
+    V = prima.get_basis(G, C, B, 0., 3)
+    assert V.shape == (n, 6)
+    V = prima.get_basis(G, C, B, 1j, 1, V)
+    assert V.shape == (n, 10) and np.allclose(V.T.dot(V), np.eye(10))
+    Gr, Cr, Br = prima.project(G, C, B, V)
+    for s, tol in ((0j, 1e-12), (1e-3 + 0j, 1e-9), (1j, 1e-12),
+                   (1j + 1e-3, 1e-6)):
+        x = np.linalg.solve(G + s*C, B)
+        xr = V.dot(np.linalg.solve(Gr + s*Cr, Br))
+        assert np.allclose(x, xr, rtol=0, atol=tol)
+
+
+class TestACPrima:
+    """Test AC analyses with the PRIMA method"""
+    def setUp(self):
+        self.old_limit = options.dense_matrix_limit
+        self.cir = _build_ladder(60)
+
+    def tearDown(self):
+        options.dense_matrix_limit = self.old_limit
+
+    def _check(self):
+        ac = ahkab.new_ac(1e3, 1e11, 200, x0=None)
+        ref = ahkab.run(self.cir, ac)['ac']
+        ac = ahkab.new_ac(1e3, 1e11, 200, x0=None, method='prima')
+        r = ahkab.run(self.cir, ac)['ac']
+        for v in ('Vn30', 'Vout', 'I(L1)'):
+            assert np.allclose(r[v], ref[v], rtol=0, atol=1e-9)
+
+    def test_dense(self):
+        """Test AC with PRIMA against the direct method"""
+        self._check()
+
+    def test_sparse(self):
+        """Test AC with PRIMA on sparse matrices"""
+        options.dense_matrix_limit = 10
+        self._check()
+
+
+def _build_loaded_ladder():
+    cir = ahkab.Circuit('RC ladder with a diode load')
+    cir.add_model('diode', 'dm', dict(IS=1e-14))
+    mys = time_functions.sin(vo=.5, va=.2, freq=1e6)
+    cir.add_vsource('V1', 'n0', cir.gnd, dc_value=.5, ac_value=1, function=mys)
+    for i in range(30):
+        cir.add_resistor('R%d' % i, 'n%d' % i, 'n%d' % (i + 1), 100)
+        cir.add_capacitor('C%d' % i, 'n%d' % (i + 1), cir.gnd,
+                          1e-12*(1 + i % 3))
+    cir.add_diode('D1', 'n30', cir.gnd, 'dm')
+    cir.add_inductor('L1', 'n30', 'k', 1e-8)
+    cir.add_resistor('RK', 'k', cir.gnd, 1e3)
+    # too small to be worth reducing, if b8 is kept
+    for i in range(8):
+        cir.add_resistor('RB%d' % i, 'b%d' % i if i else 'n0', 'b%d' % (i + 1),
+                         1e3)
+        cir.add_capacitor('CB%d' % i, 'b%d' % (i + 1), cir.gnd, 1e-13)
+    cir.add_resistor('RBL', 'b8', cir.gnd, 1e4)
+    return cir
+
+
+def test_reduce_circuit():
+    """Test prima.reduce_circuit()"""
+    cir = _build_loaded_ladder()
+    reduced = prima.reduce_circuit(cir, outputs=['n10', 'b8'], order=2,
+                                    verbose=0)
+    models = [elem for elem in reduced
+              if isinstance(elem, ahkab.components.Macromodel)]
+    # n1-n9 and b1-b7 are left as they are, n11-n29 and k-L1 are reduced
+    # separately
+    assert len(models) == 2
+    assert 'n5' in reduced.nodes_dict and 'b3' in reduced.nodes_dict
+    assert 'n20' not in reduced.nodes_dict and 'k' not in reduced.nodes_dict
+    assert reduced.get_nodes_number() == cir.get_nodes_number() - 20 + 5
+    for model in models:
+        # passive
+        assert np.allclose(model.C, model.C.T)
+        assert np.linalg.eigvalsh(model.C).min() >= -1e-20
+        assert np.linalg.eigvalsh(model.G + model.G.T).min() >= -1e-12
+
+
+class TestPrimaReduce:
+    """Test OP, AC and TRAN with options.prima_reduce"""
+    def setUp(self):
+        self.old_options = (options.prima_reduce, options.prima_outputs,
+                            options.prima_order)
+
+    def tearDown(self):
+        (options.prima_reduce, options.prima_outputs,
+         options.prima_order) = self.old_options
+
+    def test_run(self):
+        """Test OP, AC and TRAN on the reduced circuit"""
+        cir = _build_loaded_ladder()
+        analyses = lambda: [ahkab.new_op(),
+                            ahkab.new_ac(1e3, 1e9, 50, x0=None),
+                            ahkab.new_tran(0, 2e-6, 1e-9, x0=None,
+                                           output_times=1e-8)]
+        ref = ahkab.run(cir, analyses())
+        options.prima_reduce, options.prima_order = True, 2
+        options.prima_outputs = ['n10', 'b8']
+        r = ahkab.run(cir, analyses())
+        assert 'Vn20' not in r['op'].keys() and 'Vn20' not in r['tran'].keys()
+        for v in ('Vn10', 'Vn30', 'Vb8', 'I(V1)'):
+            # within the NR tolerances
+            assert np.allclose(r['op'][v], ref['op'][v], rtol=1e-5, atol=0)
+            assert np.allclose(r['ac'][v], ref['ac'][v], rtol=0,
+                               atol=1e-2*abs(ref['ac'][v]).max())
+        for v in ('Vn10', 'Vn30', 'Vb8'):
+            assert np.allclose(r['tran'][v], ref['tran'][v], rtol=0, atol=1e-3)
+
+    def test_full_circuit_x0(self):
+        """Test an analysis of the whole circuit after a reduced OP"""
+        cir = _build_loaded_ladder()
+        analyses = lambda: [ahkab.new_op(),
+                            ahkab.new_noise('n10', 1e3, 1e7, 10, source='V1',
+                                            x0='op')]
+        ref = ahkab.run(cir, analyses())
+        options.prima_reduce, options.prima_order = True, 2
+        options.prima_outputs = ['n10', 'b8']
+        r = ahkab.run(cir, analyses())
+        # NOISE runs on the whole circuit, with its own OP
+        assert len(r['op'].keys()) < len(ref['op'].keys())
+        for v in ('onoise', 'inoise', 'onoise(R20)'):
+            assert np.allclose(r['noise'][v], ref['noise'][v], rtol=1e-6)
@@ -0,0 +1,90 @@
+# -*- coding: iso-8859-1 -*-
+# test_save.py
+# Unit tests for the selective saving of results
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import netlist_parser, results
+
+
+def _build_circuit():
+    cir = ahkab.Circuit('RC ladder')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1, ac_value=1,
+                    function=ahkab.time_functions.pulse(v1=0, v2=1, td=0,
+                                                       tr=1e-6, pw=10e-6,
+                                                       tf=1e-6, per=20e-6))
+    cir.add_resistor('R1', 'in', 'n1', 1e3)
+    cir.add_capacitor('C1', 'n1', cir.gnd, 1e-9)
+    cir.add_resistor('R2', 'n1', 'n2', 1e3)
+    cir.add_capacitor('C2', 'n2', cir.gnd, 1e-9)
+    cir.add_vsource('VOUT', 'n2', 'out', dc_value=0)
+    cir.add_resistor('R3', 'out', cir.gnd, 1e3)
+    return cir
+
+
+def test_match_saved_variable():
+    """Test results.match_saved_variable"""
+    assert results.match_saved_variable('VOUT', ['V(out)'])
+    assert results.match_saved_variable('Vout', ['vout'])
+    assert results.match_saved_variable('VN12', ['v(n*)'])
+    assert results.match_saved_variable('I(VOUT)', ['i(v*)'])
+    assert results.match_saved_variable('I(V1)', 'I(V1)')
+    assert not results.match_saved_variable('VIN', ['V(n*)', 'I(V1)'])
+    assert not results.match_saved_variable('I(V1)', ['V1'])
+
+
+def test_tran_save():
+    """Test TRAN with save=[...]"""
+    cir = _build_circuit()
+    tran_all = ahkab.new_tran(0, 20e-6, tstep=1e-6, x0=None,
+                              use_step_control=False)
+    tran_sel = ahkab.new_tran(0, 20e-6, tstep=1e-6, x0=None,
+                              use_step_control=False,
+                              save=['V(out)', 'i(v*)'])
+    r_all = ahkab.run(cir, tran_all)['tran']
+    r_sel = ahkab.run(cir, tran_sel)['tran']
+    assert r_sel.keys() == ['T', 'VOUT', 'I(V1)', 'I(VOUT)']
+    assert r_sel.asarray().shape == (4, r_all.asarray().shape[1])
+    for v in r_sel.keys():
+        assert np.allclose(r_sel[v], r_all[v])
+    assert 'VN1' not in r_sel
+
+
+def test_ac_dc_save():
+    """Test AC and DC with save=[...]"""
+    cir = _build_circuit()
+    op = ahkab.new_op()
+    ac = ahkab.new_ac(1e3, 1e6, 10, save=['V(n*)'])
+    dc = ahkab.new_dc(0, 1, 3, 'V1', save=['I(VOUT)'])
+    r = ahkab.run(cir, [op, ac, dc])
+    assert r['ac'].keys() == ['f', 'Vn1', 'Vn2']
+    assert r['ac'].asarray().shape == (3, 10)
+    assert r['dc'].keys() == ['V1', 'I(VOUT)']
+    assert np.allclose(r['dc']['I(VOUT)'], np.array([0, .5, 1]) / 3e3)
+
+
+def test_parse_saves():
+    """Test netlist_parser.parse_saves"""
+    directives = [('.op', 2), ('.save v(out) i(v1)', 3),
+                  ('.tran 1n 1u', 4), ('.save v(n*) * comment', 5)]
+    assert netlist_parser.parse_saves(directives) == ['v(out)', 'i(v1)',
+                                                      'v(n*)']
+    assert netlist_parser.parse_saves([('.op', 1)]) is None
+    # .save directives are not analyses
+    an = netlist_parser.parse_analysis(None, directives)
+    assert [a['type'] for a in an] == ['op', 'tran']
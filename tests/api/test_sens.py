@@ -0,0 +1,80 @@
+# -*- coding: iso-8859-1 -*-
+# test_sens.py
+# Unit tests for the SENS analysis
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import netlist_parser
+
+
+def _build(R1=1e3, C1=1e-9, L1=1e-3, IS=1e-14):
+    cir = ahkab.Circuit('RLC and diode')
+    cir.add_model('diode', 'dm', dict(IS=IS))
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1, ac_value=1)
+    cir.add_resistor('R1', 'in', 'out', R1)
+    cir.add_capacitor('C1', 'out', cir.gnd, C1)
+    cir.add_inductor('L1', 'out', 'o2', L1)
+    cir.add_resistor('R2', 'o2', cir.gnd, 500.)
+    cir.add_diode('D1', 'out', cir.gnd, 'dm')
+    return cir
+
+
+def test_linear_dc_sens():
+    """Test the DC SENS analysis on a resistive divider"""
+    cir = ahkab.Circuit('Divider')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_resistor('R2', 'out', cir.gnd, 3e3)
+    r = ahkab.run(cir, ahkab.new_sens(['V(out)', 'I(V1)']))['sens']
+    assert r.parameters == ['V1', 'R1', 'R2']
+    # Vout = V1 R2/(R1 + R2), I(V1) = -V1/(R1 + R2)
+    assert np.allclose([r['dV(out)/dV1'], r['dV(out)/dR1'],
+                        r['dV(out)/dR2']], [.75, -3e3/16e6, 1e3/16e6])
+    assert np.allclose(r.sensitivities[1], [-1/4e3, 1/16e6, 1/16e6])
+
+
+def test_dc_sens():
+    """Test the DC SENS analysis against the OP of perturbed circuits"""
+    r = ahkab.run(_build(), ahkab.new_sens('out', x0=None))['sens']
+    for label, kwarg, value in (('R1', 'R1', 1e3), ('dm.IS', 'IS', 1e-14)):
+        ops = [ahkab.run(_build(**{kwarg: v}), ahkab.new_op())['op']
+               for v in (value*(1 - 1e-4), value*(1 + 1e-4))]
+        d = (ops[1]['Vout'][0, 0] - ops[0]['Vout'][0, 0])/(2e-4*value)
+        assert np.allclose(r['dV(out)/d' + label], d, rtol=1e-4)
+
+
+def test_ac_sens():
+    """Test the AC SENS analysis against AC runs of perturbed circuits"""
+    r = ahkab.run(_build(), ahkab.new_sens('V(out)', start=1e3, stop=1e6,
+                                           points=4, x0=None))['sens']
+    for label, kwarg, value in (('R1', 'R1', 1e3), ('C1', 'C1', 1e-9),
+                                ('L1', 'L1', 1e-3), ('dm.IS', 'IS', 1e-14)):
+        acs = [ahkab.run(_build(**{kwarg: v}),
+                         ahkab.new_ac(1e3, 1e6, 4, x0=None))['ac']
+               for v in (value*(1 - 1e-5), value*(1 + 1e-5))]
+        d = (acs[1]['Vout'] - acs[0]['Vout'])/(2e-5*value)
+        assert np.allclose(r['dV(out)/d' + label], d, rtol=1e-4)
+
+
+def test_sens_netlist():
+    """Test the .SENS directive"""
+    an = netlist_parser.parse_single_analysis('.sens V(out,ref)')
+    assert an['outputs'] == 'V(out,ref)' and an['start'] is None
+    an = netlist_parser.parse_single_analysis('.sens I(V1) lin 10 1 1k')
+    assert an['outputs'] == 'I(V1)' and an['sweep_type'] == 'lin'
+    assert (an['points'], an['start'], an['stop']) == (10, 1, 1e3)
@@ -0,0 +1,74 @@
+# -*- coding: iso-8859-1 -*-
+# test_steady_state.py
+# Unit tests for the steady state detection in TRAN
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import netlist_parser, steady_state, time_functions
+
+
+def _build_rc():
+    cir = ahkab.Circuit('RC low-pass')
+    mys = time_functions.sin(vo=0, va=1, freq=10e3)
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=mys)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 10e-9)
+    return cir
+
+
+def test_get_period():
+    """Test steady_state.get_period()"""
+    cir = _build_rc()
+    assert np.allclose(steady_state.get_period(cir), 1e-4)
+    pulse = time_functions.pulse(v1=0, v2=1, td=0, tr=1e-6, pw=1e-4, tf=1e-6,
+                                 per=2.5e-4)
+    cir.add_isource('I1', 'out', cir.gnd, dc_value=0, function=pulse)
+    assert np.allclose(steady_state.get_period(cir), 5e-4)
+    cir = ahkab.Circuit('DC')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1)
+    assert steady_state.get_period(cir) is None
+
+
+def test_estimate_period():
+    """Test steady_state.estimate_period()"""
+    t = np.linspace(0, 1e-3, 10001)
+    v = np.exp(-t/1e-4) + np.sin(2*np.pi*12e3*t + .3)
+    assert np.allclose(steady_state.estimate_period(t, v), 1/12e3, rtol=1e-4)
+    assert steady_state.estimate_period(t, np.exp(-t/1e-4)) is None
+
+
+def test_tran_steady_state():
+    """Test TRAN stopping at the steady state"""
+    tran = ahkab.new_tran(0, 2e-3, 1e-6, x0=None, steady_state=True)
+    r = ahkab.run(_build_rc(), tran)['tran']
+    settled, period = r.steady_state
+    assert np.allclose(period, 1e-4)
+    # tau is 10us, far shorter than tstop
+    assert r['T'][-1] == settled and settled < 1e-3
+    t = np.linspace(settled - period, settled, 50)
+    assert np.allclose(np.interp(t, r['T'], r['Vout']),
+                       np.interp(t - period, r['T'], r['Vout']), rtol=0,
+                       atol=2e-3)
+
+
+def test_tran_steady_state_netlist():
+    """Test the steady state parameters of the .TRAN directive"""
+    an = netlist_parser.parse_single_analysis('.tran tstep=1n tstop=1u ' +
+                                              'steady_state=1 period=10n')
+    assert an['steady_state'] is True
+    assert np.allclose(an['period'], 10e-9)
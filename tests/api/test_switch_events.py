@@ -0,0 +1,70 @@
+# -*- coding: iso-8859-1 -*-
+# test_switch_events.py
+# Unit tests for the location of the switch events in TRAN
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import options, time_functions, transient
+
+
+def _build_circuit():
+    cir = ahkab.Circuit('Switched RC')
+    cir.add_model('sw', 'SW1', {'name': 'SW1', 'VT': 1., 'VH': .1,
+                                'RON': 1., 'ROFF': 1e6})
+    cir.add_vsource('VC', 'c', cir.gnd, dc_value=0,
+                    function=time_functions.sin(vo=0, va=2, freq=1e3))
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1)
+    cir.add_switch('S1', 'in', 'out', 'c', cir.gnd, ic=False,
+                   model_label='SW1')
+    cir.add_resistor('R1', 'out', cir.gnd, 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-7)
+    return cir
+
+
+def test_get_switch_event():
+    """Test transient.get_switch_event()"""
+    cir = _build_circuit()
+    s1 = cir.get_elem_by_name('S1')
+    nc = cir.get_nodes_number() - 1
+    x0, x1 = np.zeros((nc + 2, 1)), np.zeros((nc + 2, 1))
+    x1[s1.sn1 - 1, 0] = 2.
+    # the switch is off: it commutes at VT + VH
+    t, elem = transient.get_switch_event([s1], [False], 0., x0, None, 1., x1,
+                                         None)
+    assert abs(t - .55) < 1e-9 and elem is s1
+    # the switch is on: no crossing of VT - VH while rising
+    x0[s1.sn1 - 1, 0] = 1.
+    assert transient.get_switch_event([s1], [True], 0., x0, None, 1., x1,
+                                      None) is None
+
+
+def test_tran_switch_events():
+    """Test TRAN step control landing on switch events"""
+    ton = np.arcsin(1.1/2)/(2*np.pi*1e3)
+    toff = (np.pi - np.arcsin(.9/2))/(2*np.pi*1e3)
+    tran = ahkab.new_tran(0, 2e-3, 1e-5, x0=None)
+    r = ahkab.run(_build_circuit(), tran)['tran']
+    assert np.min(np.abs(r['T'] - ton)) < 1e-9
+    assert np.min(np.abs(r['T'] - toff)) < 1e-9
+    assert np.allclose(r['Vout'][r['T'] < ton - 1e-6], 0, atol=1e-3)
+    options.transient_use_switch_events = False
+    try:
+        r = ahkab.run(_build_circuit(), tran)['tran']
+    finally:
+        options.transient_use_switch_events = True
+    assert np.min(np.abs(r['T'] - ton)) > 1e-9
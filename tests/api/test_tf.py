@@ -0,0 +1,88 @@
+# -*- coding: iso-8859-1 -*-
+# test_tf.py
+# Unit tests for the TF analysis
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import netlist_parser, tf
+
+
+def _build_divider():
+    cir = ahkab.Circuit('Loaded divider')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1, ac_value=1)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_resistor('R2', 'out', cir.gnd, 3e3)
+    cir.add_isource('I1', cir.gnd, 'out', dc_value=1e-3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-9)
+    return cir
+
+
+def test_dc_tf():
+    """Test the DC TF analysis on a resistive divider"""
+    cir = _build_divider()
+    r = ahkab.run(cir, ahkab.new_tf('out', 'V1'))['tf']
+    assert np.allclose([r['gain'], r['Rin'], r['Rout']], [.75, 4e3, 750.])
+    assert np.allclose([r['gain(V1)'], r['gain(I1)']], [.75, 750.])
+    r = ahkab.run(cir, ahkab.new_tf('V(out)', 'I1'))['tf']
+    assert np.allclose([r['gain'], r['Rin'], r['Rout']], [750., 750., 750.])
+
+
+def test_dc_tf_nonlinear():
+    """Test the DC TF analysis against the OP of a perturbed circuit"""
+    cir = ahkab.Circuit('Diode and resistor')
+    cir.add_model('diode', 'dm', dict(IS=1e-14))
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=5)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_diode('D1', 'out', cir.gnd, 'dm')
+    r = ahkab.run(cir, ahkab.new_tf('out', 'V1', x0=None))['tf']
+    ops = []
+    for v in (5 - 1e-4, 5 + 1e-4):
+        cir.get_elem_by_name('V1').dc_value = v
+        ops.append(ahkab.run(cir, ahkab.new_op())['op'])
+    gain = (ops[1]['Vout'][0, 0] - ops[0]['Vout'][0, 0])/2e-4
+    rin = -2e-4/(ops[1]['I(V1)'][0, 0] - ops[0]['I(V1)'][0, 0])
+    assert np.allclose([r['gain'], r['Rin']], [gain, rin], rtol=1e-4)
+    # the diode small-signal resistance in parallel with R1
+    assert np.allclose(1./r['Rout'], 1e-3 + (1 - r['gain'])/1e3/r['gain'])
+
+
+def test_ac_tf():
+    """Test the AC TF analysis against one AC run per source"""
+    cir = _build_divider()
+    r = ahkab.run(cir, ahkab.new_tf(('out', cir.gnd), start=1e3, stop=1e7,
+                                    points=5))['tf']
+    assert r.keys() == ['f', 'H(V1)', 'H(I1)']
+    ac = ahkab.run(cir, ahkab.new_ac(1e3, 1e7, 5))['ac']
+    assert np.allclose(r['H(V1)'], ac['Vout'])
+    assert np.allclose(r['H(I1)'], ac['Vout']*1e3)
+
+
+def test_tf_netlist():
+    """Test the .TF directive"""
+    an = netlist_parser.parse_single_analysis('.tf V(out,ref) V1')
+    assert an['output'] == 'V(out,ref)' and an['source'] == 'V1'
+    assert an['start'] is None and an['points'] is None
+    an = netlist_parser.parse_single_analysis('.tf V(out) V1 lin 10 1 1k')
+    assert an['sweep_type'] == 'lin' and an['points'] == 10
+    assert an['start'] == 1 and an['stop'] == 1e3
+    cir = ahkab.Circuit('Port test')
+    cir.add_resistor('R1', 'out', 'ref', 1e3)
+    n_out, n_ref = cir.ext_node_to_int('out'), cir.ext_node_to_int('ref')
+    assert tf.get_output_port(cir, 'V(out,ref)') == (n_out, n_ref)
+    assert tf.get_output_port(cir, 'out') == (n_out, 0)
+    assert tf.get_output_port(cir, ('out', 'ref')) == (n_out, n_ref)
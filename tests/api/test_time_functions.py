@@ -147,6 +147,33 @@ def test_pwl():
     # check str() does not choke
     print(str(f))
 
+def test_vectorized():
+    """Test time functions evaluated on arrays"""
+    funs = (time_functions.pulse(v1=-2, v2=3, td=.1e-3, tr=.05e-3, pw=.5e-3,
+                                 tf=.01e-3, per=1e-3),
+            time_functions.sin(vo=1, va=2, freq=5e3, td=.1e-3, theta=1e3,
+                               phi=30),
+            time_functions.exp(v1=.5, v2=-.05, td1=.1e-3, tau1=20e-6,
+                               td2=.4e-3, tau2=20e-6),
+            time_functions.sffm(vo=.1, va=1e-3, fc=20e3, mdi=5, fs=1e3,
+                                td=.1e-3),
+            time_functions.am(sa=10, fc=20e3, fm=1e3, oc=1, td=.1e-3),
+            time_functions.pwl([0., 0.05e-3, 0.55e-3, 0.56e-3, 1e-3],
+                               [-2, 3, 3, -2, -2], repeat=True, td=0.1e-3,
+                               repeat_time=0.5e-3))
+    t = np.linspace(0, 3e-3, 1001)
+    for f in funs:
+        ft = f(t)
+        assert ft.shape == t.shape
+        assert np.allclose(ft, [f(ti) for ti in t])
+        assert isinstance(f(1e-3), float)
+        assert np.allclose(time_functions.sample(f, t), ft)
+    # non-vectorized functions are sampled point by point
+    mys = lambda t: 1 if not t else np.sin(np.pi*1e4*t)/(np.pi*1e4*t)
+    s = time_functions.sample(mys, t)
+    assert s.shape == t.shape
+    assert s[0] == 1 and s[-1] == mys(t[-1])
+
 if __name__ == '__main__':
     test_sffm()
     test_am()
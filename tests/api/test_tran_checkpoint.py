@@ -0,0 +1,153 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_checkpoint.py
+# Unit tests for checkpointing and resuming TRAN analyses
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import os
+import tempfile
+import numpy as np
+import ahkab
+from ahkab import measure, options, time_functions, transient
+
+
+def _build_circuit():
+    cir = ahkab.Circuit('Switched RC')
+    cir.add_model('sw', 'SW1', {'name': 'SW1', 'VT': 1., 'VH': .1,
+                                'RON': 1., 'ROFF': 1e6})
+    cir.add_vsource('VC', 'c', cir.gnd, dc_value=0,
+                    function=time_functions.sin(vo=0, va=2, freq=1e3))
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=1)
+    cir.add_switch('S1', 'in', 'out', 'c', cir.gnd, ic=False,
+                   model_label='SW1')
+    cir.add_resistor('R1', 'out', cir.gnd, 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-7)
+    return cir
+
+
+class TestCheckpoint:
+    """Test checkpointing and resuming a TRAN analysis"""
+    def setUp(self):
+        fd, self.checkpoint = tempfile.mkstemp(suffix='.ckp')
+        os.close(fd)
+        self.old_options = (options.transient_checkpoint_interval,
+                            options.transient_max_time_iter)
+
+    def tearDown(self):
+        (options.transient_checkpoint_interval,
+         options.transient_max_time_iter) = self.old_options
+        os.remove(self.checkpoint)
+
+    def test_resume(self):
+        """Test TRAN resume_from= after an interrupted analysis"""
+        ref = ahkab.run(_build_circuit(),
+                        ahkab.new_tran(0, 2e-3, 1e-5, x0=None))['tran']
+        # interrupt the analysis halfway
+        options.transient_checkpoint_interval = 0.
+        options.transient_max_time_iter = ref.asarray().shape[1] // 2
+        r = ahkab.run(_build_circuit(),
+                      ahkab.new_tran(0, 2e-3, 1e-5, x0=None,
+                                     checkpoint=self.checkpoint))
+        assert r['tran'] is None
+        state = transient.load_checkpoint(self.checkpoint)
+        assert 0 < state['time'] < 2e-3
+        options.transient_max_time_iter = 0
+        r = ahkab.run(_build_circuit(),
+                      ahkab.new_tran(0, 2e-3, 1e-5, x0=None,
+                                     resume_from=self.checkpoint))['tran']
+        assert r.asarray().shape == ref.asarray().shape
+        assert np.allclose(r.asarray(), ref.asarray(), rtol=0, atol=1e-12)
+
+    def test_no_outfile(self):
+        """Test TRAN checkpoints of an analysis without results file"""
+        ref = ahkab.run(_build_circuit(),
+                        ahkab.new_tran(0, 2e-3, 1e-5, x0=None))['tran']
+        options.transient_checkpoint_interval = 0.
+        options.transient_max_time_iter = ref.asarray().shape[1] // 2
+        r = transient.transient_analysis(_build_circuit(), 0, 1e-5, 2e-3,
+                                         outfile=None, checkpoint=self.checkpoint,
+                                         verbose=0)
+        assert r is None
+        state = transient.load_checkpoint(self.checkpoint)
+        assert state['outfile'] is None
+        # the results set of the resumed analysis starts at the checkpoint
+        options.transient_max_time_iter = 0
+        r = ahkab.run(_build_circuit(),
+                      ahkab.new_tran(0, 2e-3, 1e-5, x0=None,
+                                     resume_from=self.checkpoint))['tran']
+        n = r.asarray().shape[1]
+        assert r.get_x()[0] > state['time']
+        assert np.allclose(r.asarray(), ref.asarray()[:, -n:], rtol=0, atol=1e-12)
+
+    def test_resume_measures(self):
+        """Test TRAN measurements across a checkpoint"""
+        def _measures():
+            return [measure.Average('avg', 'V(out)'), measure.RMS('rms', 'V(out)'),
+                    measure.Maximum('max', 'V(out)'),
+                    measure.When('when', 'V(out)', val=.5, edge='fall', n=2)]
+        ref = ahkab.run(_build_circuit(),
+                        ahkab.new_tran(0, 2e-3, 1e-5, x0=None,
+                                       measures=_measures()))['tran']
+        options.transient_checkpoint_interval = 0.
+        options.transient_max_time_iter = ref.asarray().shape[1] // 2
+        ahkab.run(_build_circuit(),
+                  ahkab.new_tran(0, 2e-3, 1e-5, x0=None, checkpoint=self.checkpoint,
+                                 measures=_measures()))
+        options.transient_max_time_iter = 0
+        r = ahkab.run(_build_circuit(),
+                      ahkab.new_tran(0, 2e-3, 1e-5, x0=None, measures=_measures(),
+                                     resume_from=self.checkpoint))['tran']
+        for name in ('avg', 'rms', 'max', 'when'):
+            assert np.allclose(r.measures[name], ref.measures[name], rtol=1e-12)
+        # the measurements must match the saved ones
+        try:
+            ahkab.run(_build_circuit(),
+                      ahkab.new_tran(0, 2e-3, 1e-5, x0=None,
+                                     resume_from=self.checkpoint))
+            assert False
+        except ValueError:
+            pass
+
+    def test_resume_counters(self):
+        """Test TRAN resume_from= right after a breakpoint with GEAR and TRAP_AUTO"""
+        def _build_rc():
+            cir = ahkab.Circuit('RC low-pass')
+            cir.add_vsource('V1', 'in', cir.gnd, dc_value=0,
+                            function=time_functions.pulse(
+                                v1=0, v2=1, td=2e-4, tr=1e-6, pw=1, tf=1e-6, per=2))
+            cir.add_resistor('R1', 'in', 'out', 1e3)
+            cir.add_capacitor('C1', 'out', cir.gnd, 1e-7)
+            return cir
+        for method in ('GEAR', 'TRAP_AUTO'):
+            ref = ahkab.run(_build_rc(), ahkab.new_tran(0, 1e-3, 1e-5, x0=None,
+                                                        method=method))['tran']
+            # stop on the end of the rising edge
+            options.transient_checkpoint_interval = 0.
+            options.transient_max_time_iter = \
+                int(np.argmin(abs(ref.get_x() - 2.01e-4))) + 1
+            ahkab.run(_build_rc(), ahkab.new_tran(0, 1e-3, 1e-5, x0=None, method=method,
+                                                  checkpoint=self.checkpoint))
+            state = transient.load_checkpoint(self.checkpoint)
+            assert np.allclose(state['time'], 2.01e-4)
+            if method == 'GEAR':
+                assert state['order_steps'] == 0
+            else:
+                assert state['damped_steps'] == options.transient_trap_damping_steps
+            options.transient_max_time_iter = 0
+            r = ahkab.run(_build_rc(),
+                          ahkab.new_tran(0, 1e-3, 1e-5, x0=None, method=method,
+                                         resume_from=self.checkpoint))['tran']
+            assert np.allclose(r.asarray(), ref.asarray(), rtol=0, atol=1e-12)
@@ -0,0 +1,119 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_exponential.py
+# Unit tests for the exponential integrator
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+from nose.tools import raises
+import ahkab
+from ahkab import expint, options, time_functions
+
+
+def _build_rc(function):
+    cir = ahkab.Circuit('RC low-pass')
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=function)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-9)
+    return cir
+
+
+def test_tran_exponential_pwl():
+    """Test the exponential integrator with a piecewise linear source"""
+    # ramp to 1V in 5us, then flat
+    tr, tau = 5e-6, 1e-6
+    ramp = time_functions.pwl([0, tr], [0, 1])
+    cir = _build_rc(ramp)
+    assert expint.is_piecewise_linear(cir)
+    # the step is much longer than tau
+    tran = ahkab.new_tran(0, 10e-6, 2.5e-6, x0=None, method='EXPONENTIAL')
+    r = ahkab.run(cir, tran)['tran']
+    assert np.allclose(r['T'], [2.5e-6, 5e-6, 7.5e-6, 10e-6])
+    t = r['T']
+    exact = np.where(t <= tr, (t - tau*(1 - np.exp(-t/tau)))/tr,
+                     1 - tau/tr*(np.exp(tr/tau) - 1)*np.exp(-t/tau))
+    assert np.allclose(r['Vout'], exact, rtol=1e-9, atol=1e-12)
+
+
+def test_tran_exponential_sin():
+    """Test the exponential integrator against TRAP with a sine source"""
+    mys = time_functions.sin(vo=0, va=1, freq=100e3)
+    times = np.linspace(0, 20e-6, 21)
+    res = {}
+    for method in ('TRAP', 'EXPONENTIAL'):
+        tran = ahkab.new_tran(0, 20e-6, 1e-8, x0=None, method=method,
+                              output_times=times)
+        res[method] = ahkab.run(_build_rc(mys), tran)['tran']
+    assert np.allclose(res['EXPONENTIAL']['T'], times)
+    assert np.allclose(res['EXPONENTIAL']['Vout'], res['TRAP']['Vout'],
+                       rtol=0, atol=1e-4)
+
+
+def _get_matrices(cir):
+    mna, N = ahkab.dc_analysis.generate_mna_and_N(cir, verbose=0)
+    mna = ahkab.utilities.remove_row_and_col(mna)
+    D = ahkab.transient.generate_D(cir, mna.shape)
+    D = ahkab.utilities.remove_row_and_col(D)
+    return mna, D
+
+
+def test_reduce_dae():
+    """Test expint.ReducedDAE on an RC with a voltage source"""
+    cir = _build_rc(time_functions.pwl([0, 1e-6], [0, 1]))
+    dae = expint.ReducedDAE(*_get_matrices(cir))
+    # a single time constant
+    assert dae.size == 1
+    assert np.allclose(dae.A.toarray(), -1e6)
+
+
+def test_reduce_dae_floating():
+    """Test the exponential integrator on a floating capacitor"""
+    def _build():
+        cir = _build_rc(time_functions.pwl([0, 1e-6], [0, 1]))
+        cir.add_resistor('R2', 'out', 'o2', 1e3)
+        cir.add_capacitor('C2', 'o2', 'o3', 1e-9)
+        cir.add_inductor('L1', 'o3', cir.gnd, 1e-3)
+        return cir
+    dae = expint.ReducedDAE(*_get_matrices(_build()))
+    # V(out), V(o2) - V(o3) and I(L1)
+    assert dae.size == 3
+    times = np.linspace(0, 20e-6, 21)
+    res = {}
+    for method in ('TRAP', 'EXPONENTIAL'):
+        tran = ahkab.new_tran(0, 20e-6, 1e-8, x0=None, method=method,
+                              output_times=times)
+        res[method] = ahkab.run(_build(), tran)['tran']
+    # the sparse matrices used for big circuits
+    old_limit, options.dense_matrix_limit = options.dense_matrix_limit, 0
+    try:
+        res['sparse'] = ahkab.run(_build(), tran)['tran']
+    finally:
+        options.dense_matrix_limit = old_limit
+    for v in ('Vout', 'Vo2', 'Vo3', 'I(L1)'):
+        assert np.allclose(res['EXPONENTIAL'][v], res['TRAP'][v], rtol=1e-3,
+                           atol=1e-6)
+        assert np.allclose(res['sparse'][v], res['EXPONENTIAL'][v], rtol=1e-9,
+                           atol=1e-12)
+
+
+@raises(ValueError)
+def test_tran_exponential_nonlinear():
+    """Test the exponential integrator refuses nonlinear circuits"""
+    cir = _build_rc(time_functions.pwl([0, 1e-6], [0, 1]))
+    cir.add_model('diode', 'dmodel', {})
+    cir.add_diode('D1', 'out', cir.gnd, 'dmodel')
+    tran = ahkab.new_tran(0, 10e-6, 1e-6, x0=None, method='EXPONENTIAL')
+    ahkab.run(cir, tran)
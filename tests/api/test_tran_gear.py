@@ -0,0 +1,91 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_gear.py
+# Unit tests for the variable-order Gear integration
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import gear, transient
+
+
+def _build_rc():
+    cir = ahkab.Circuit('RC low-pass')
+    mys = ahkab.time_functions.sin(vo=0, va=1, freq=1e3)
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=mys)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 100e-9)
+    return cir
+
+
+def _rc_exact(t):
+    w, tau = 2*np.pi*1e3, 1e-4
+    return (np.sin(w*t) - w*tau*np.cos(w*t) + w*tau*np.exp(-t/tau)) / \
+           (1 + (w*tau)**2)
+
+
+def test_gear_df_order():
+    """Test gear.get_df_order() against gear.get_df()"""
+    pv_array = [(t, np.array([[np.exp(-t)]]), None)
+                for t in (1., .9, .75, .6, .5)]
+    gear.order = 3
+    ref = gear.get_df(pv_array, .1, predict=True)
+    res = gear.get_df_order(pv_array, .1, 3, predict=True)
+    for a, b in zip(ref, res):
+        assert np.allclose(a, b)
+    # the module-level order is untouched
+    assert gear.order == 3
+
+
+def test_select_gear_order():
+    """Test transient.select_gear_order() on a smooth solution"""
+    t = [1., .9, .8, .7, .6, .5]
+    x = lambda t: np.array([[np.sin(t)]])
+    pv_array = [(ti, x(ti), None) for ti in t]
+    tol = np.array([[1e-6]])
+    # a smooth solution needs a higher order than Euler
+    order, coeff = transient.select_gear_order(pv_array, .1, x(1.), x(1.1),
+                                               tol, 0*tol, 1, 5)
+    assert order == 2
+    assert 0 < coeff <= 2
+    # never above max_order
+    order, _ = transient.select_gear_order(pv_array, .1, x(1.), x(1.1),
+                                           tol, 0*tol, 2, 2)
+    assert order <= 2
+
+
+def test_tran_gear():
+    """Test TRAN with the variable-order Gear method"""
+    r_var = ahkab.run(_build_rc(), ahkab.new_tran(0, 5e-3, 1e-4, x0=None,
+                                                  method='GEAR'))['tran']
+    r_fix = ahkab.run(_build_rc(), ahkab.new_tran(0, 5e-3, 1e-4, x0=None,
+                                                  method='GEAR2'))['tran']
+    assert np.allclose(r_var['Vout'], _rc_exact(r_var['T']), rtol=0,
+                       atol=5e-3)
+    # the higher orders allow longer steps
+    assert len(r_var['T']) < len(r_fix['T'])
+
+
+def test_tran_gear_order_local():
+    """Test that TRAN does not set the module-level gear.order"""
+    old_order, gear.order = gear.order, None
+    try:
+        for method in ('GEAR3', 'GEAR'):
+            ahkab.run(_build_rc(), ahkab.new_tran(0, 1e-3, 1e-4, x0=None,
+                                                  method=method))
+            assert gear.order is None
+    finally:
+        gear.order = old_order
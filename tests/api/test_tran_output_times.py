@@ -0,0 +1,70 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_output_times.py
+# Unit tests for the TRAN output grid
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import transient
+
+
+def _build_rc():
+    cir = ahkab.Circuit('RC low-pass')
+    mys = ahkab.time_functions.sin(vo=0, va=1, freq=1e3)
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=mys)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 100e-9)
+    return cir
+
+
+def _rc_exact(t):
+    w, tau = 2*np.pi*1e3, 1e-4
+    return (np.sin(w*t) - w*tau*np.cos(w*t) + w*tau*np.exp(-t/tau)) / \
+           (1 + (w*tau)**2)
+
+
+def test_print_step():
+    """Test TRAN with a uniform output grid"""
+    cir = _build_rc()
+    tran = ahkab.new_tran(0, 2e-3, 1e-5, x0=None, output_times=5e-5)
+    r = ahkab.run(cir, tran)['tran']
+    assert np.allclose(r['T'], np.linspace(0, 2e-3, 41), rtol=0, atol=1e-15)
+    assert r['Vout'][0] == 0.
+    assert np.allclose(r['Vout'], _rc_exact(r['T']), rtol=0, atol=1e-3)
+
+
+def test_time_list():
+    """Test TRAN with an explicit list of output times"""
+    cir = _build_rc()
+    times = [1.5e-3, 0.2e-3, 0.33e-3, 5e-3]
+    tran = ahkab.new_tran(0, 2e-3, 1e-5, x0=None, output_times=times)
+    r = ahkab.run(cir, tran)['tran']
+    # sorted, times after tstop are dropped
+    assert np.allclose(r['T'], [0.2e-3, 0.33e-3, 1.5e-3], rtol=0, atol=1e-15)
+    assert np.allclose(r['Vout'], _rc_exact(r['T']), rtol=0, atol=1e-3)
+
+
+def test_interpolate_output():
+    """Test transient.interpolate_output()"""
+    # a cubic is interpolated exactly
+    x = lambda t: np.array([[t**3 - t], [2.]])
+    dx = lambda t: np.array([[3*t**2 - 1], [0.]])
+    xi = transient.interpolate_output(.3, 0., x(0.), dx(0.), 1., x(1.), dx(1.))
+    assert np.allclose(xi, x(.3))
+    # no derivative -> linear interpolation
+    xi = transient.interpolate_output(.5, 0., x(0.), None, 1., x(1.), dx(1.))
+    assert np.allclose(xi, (x(0.) + x(1.))/2)
@@ -0,0 +1,71 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_parareal.py
+# Unit tests for the Parareal transient analysis
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import options, parareal, time_functions
+
+
+def _decay(ta, tb, x, times, coarse):
+    # dx/dt = -x: a single implicit Euler step or the exact solution
+    if coarse:
+        return [(tb, x/(1. + tb - ta))]
+    return [(t, x*np.exp(ta - t)) for t in times]
+
+
+def test_parareal_steps():
+    """Test parareal.parareal_steps() on dx/dt = -x"""
+    bounds = parareal.get_slices(0, 4, 8)
+    times = np.linspace(.1, 4, 40)
+    x0 = np.ones((1, 1))
+    points = [p for ps in parareal.parareal_steps(_decay, bounds, x0, times, 2,
+                                                  workers=1, verbose=0)
+              for p in ps]
+    assert np.allclose([t for t, _ in points], times)
+    assert np.allclose([x[0, 0] for _, x in points], np.exp(-times),
+                       rtol=1e-3, atol=1e-6)
+
+
+class TestParareal:
+    """Test TRAN with options.transient_use_parareal"""
+    def setUp(self):
+        self.old_options = (options.transient_use_parareal,
+                            options.transient_parareal_slices,
+                            options.transient_parareal_workers)
+
+    def tearDown(self):
+        (options.transient_use_parareal, options.transient_parareal_slices,
+         options.transient_parareal_workers) = self.old_options
+
+    def test_tran_parareal(self):
+        """Test TRAN with Parareal against the serial analysis"""
+        cir = ahkab.Circuit('RC low-pass')
+        mys = time_functions.sin(vo=0, va=1, freq=10e3)
+        cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=mys)
+        cir.add_resistor('R1', 'in', 'out', 1e3)
+        cir.add_capacitor('C1', 'out', cir.gnd, 10e-9)
+        tran = ahkab.new_tran(0, 200e-6, 1e-7, x0=None, output_times=1e-6)
+        ref = ahkab.run(cir, tran)['tran']
+        options.transient_use_parareal = True
+        options.transient_parareal_slices = 8
+        for workers in (1, 2):
+            options.transient_parareal_workers = workers
+            r = ahkab.run(cir, tran)['tran']
+            assert np.allclose(r['T'], ref['T'])
+            assert np.allclose(r['Vout'], ref['Vout'], rtol=0, atol=1e-5)
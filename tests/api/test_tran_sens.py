@@ -0,0 +1,86 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_sens.py
+# Unit tests for the transient adjoint sensitivities
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import netlist_parser, options, time_functions
+
+
+def _build(R1=1e3, C1=1e-6, L1=1e-3, IS=1e-14):
+    cir = ahkab.Circuit('Pulsed RLC and diode')
+    pulse = time_functions.pulse(v1=.5, v2=1, td=0, tr=1e-5, pw=1, tf=1e-5,
+                                 per=2)
+    cir.add_model('diode', 'dm', dict(IS=IS))
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=.5, function=pulse)
+    cir.add_resistor('R1', 'in', 'out', R1)
+    cir.add_capacitor('C1', 'out', cir.gnd, C1)
+    cir.add_inductor('L1', 'out', 'o2', L1)
+    cir.add_resistor('R2', 'o2', cir.gnd, 2e3)
+    cir.add_diode('D1', 'out', cir.gnd, 'dm')
+    return cir
+
+
+def _run(cir, method, **kwargs):
+    tran = ahkab.new_tran(0, 2e-3, 2e-5, x0='op', method=method,
+                          use_step_control=False, **kwargs)
+    return ahkab.run(cir, [ahkab.new_op(), tran])
+
+
+class TestTranSens:
+    def setUp(self):
+        self.steps = options.transient_sens_checkpoint_steps
+        # the backward pass solves again the steps between the checkpoints
+        options.transient_sens_checkpoint_steps = 7
+
+    def tearDown(self):
+        options.transient_sens_checkpoint_steps = self.steps
+
+    def _check(self, method, sens_type):
+        r = _run(_build(), method, sens_outputs=['V(out)'],
+                 sens_type=sens_type)['tran']
+        label = 'V(out)' if sens_type == 'final' else 'integ(V(out))'
+        assert r.sensitivities.outputs == [label]
+        for parameter, kwarg, value in (('R1', 'R1', 1e3), ('C1', 'C1', 1e-6),
+                                        ('L1', 'L1', 1e-3),
+                                        ('dm.IS', 'IS', 1e-14)):
+            functionals = []
+            for v in (value*(1 - 1e-4), value*(1 + 1e-4)):
+                res = _run(_build(**{kwarg: v}), method)
+                t = np.hstack(([0], res['tran']['T']))
+                vout = np.hstack((res['op']['Vout'][0], res['tran']['Vout']))
+                functionals.append(vout[-1] if sens_type == 'final' else
+                                   np.trapz(vout, t))
+            d = (functionals[1] - functionals[0])/(2e-4*value)
+            assert np.allclose(r.sensitivities['d%s/d%s' % (label, parameter)],
+                               d, rtol=1e-4)
+
+    def test_trap_final(self):
+        """Test the TRAN sensitivities of a final value with TRAP"""
+        self._check('TRAP', 'final')
+
+    def test_implicit_euler_integ(self):
+        """Test the TRAN sensitivities of an integral with IMPLICIT_EULER"""
+        self._check('IMPLICIT_EULER', 'integ')
+
+
+def test_tran_sens_netlist():
+    """Test the SENS and SENS_TYPE parameters of the .TRAN directive"""
+    an = netlist_parser.parse_single_analysis('.tran tstep=1n tstop=1u ' +
+                                              'sens=V(out) sens_type=integ')
+    assert an['sens_outputs'] == 'V(out)' and an['sens_type'] == 'integ'
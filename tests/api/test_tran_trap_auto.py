@@ -0,0 +1,64 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_trap_auto.py
+# Unit tests for the damping of TRAP ringing
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import numpy as np
+import ahkab
+from ahkab import time_functions, transient
+
+
+def _build_stiff_rc():
+    # tau = 1ns, much shorter than the time step
+    cir = ahkab.Circuit('Stiff RC')
+    pulse = time_functions.pulse(v1=0, v2=1, td=1e-6, tr=1e-9, pw=5e-6,
+                                 tf=1e-9, per=10e-6)
+    cir.add_vsource('V1', 'in', cir.gnd, dc_value=0, function=pulse)
+    cir.add_resistor('R1', 'in', 'out', 1e3)
+    cir.add_capacitor('C1', 'out', cir.gnd, 1e-12)
+    return cir
+
+
+def test_detect_ringing():
+    """Test transient.detect_ringing()"""
+    tol = np.array([[1e-3]])
+    ringing = [(3., np.array([[1.1]]), None), (2., np.array([[.9]]), None),
+               (1., np.array([[1.1]]), None)]
+    assert transient.detect_ringing(ringing, np.array([[.9]]), tol, 0*tol)
+    # below the tolerance
+    assert not transient.detect_ringing(ringing, np.array([[.9]]), 1e3*tol,
+                                        0*tol)
+    smooth = [(3., np.array([[.9]]), None), (2., np.array([[.8]]), None),
+              (1., np.array([[.6]]), None)]
+    assert not transient.detect_ringing(smooth, np.array([[.95]]), tol, 0*tol)
+    assert not transient.detect_ringing(smooth[:2], np.array([[.95]]), tol,
+                                        0*tol)
+
+
+def test_tran_trap_auto():
+    """Test TRAN with TRAP_AUTO and a fixed step longer than tau"""
+    res = {}
+    for method in ('TRAP', 'TRAP_AUTO'):
+        tran = ahkab.new_tran(0, 10e-6, 1e-7, x0=None, method=method,
+                              use_step_control=False)
+        r = ahkab.run(_build_stiff_rc(), tran)['tran']
+        # after the edge, Vout should have settled to 1V
+        settled = (r['T'] > 1.5e-6) & (r['T'] < 5.5e-6)
+        res[method] = np.max(np.abs(r['Vout'][settled] - 1.))
+    # plain TRAP keeps ringing
+    assert res['TRAP'] > 1e-2
+    assert res['TRAP_AUTO'] < 1e-3
@@ -0,0 +1,95 @@
+# -*- coding: iso-8859-1 -*-
+# test_tran_wr.py
+# Unit tests for the waveform relaxation transient analysis
+# Copyright 2015 Giuseppe Venturini
+# This file is part of the ahkab simulator.
+#
+# Ahkab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 2 of the License.
+#
+# Ahkab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License v2
+# along with ahkab. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals, print_function, division
+import os
+import tempfile
+import numpy as np
+import ahkab
+from ahkab import netlist_parser, options, wr
+
+NETLIST = """* rectifier stages, loosely coupled
+.model diode dmod is=1e-14
+.subckt stage in out
+r1 in n1 1k
+c1 n1 0 1n
+d1 n1 out dmod
+r2 out 0 10k
+c2 out 0 100p
+.ends
+v1 a 0 type=vdc vdc=0 type=sin vo=0 va=2 freq=100k
+x1 name=stage in=a out=o1
+rc o1 b 100k
+x2 name=stage in=b out=o2
+x3 name=stage in=a out=o3
+.end
+"""
+
+
+class TestWaveformRelaxation:
+    """Test TRAN with the WR method"""
+    def setUp(self):
+        fd, filename = tempfile.mkstemp(suffix='.ckt')
+        with os.fdopen(fd, 'w') as fp:
+            fp.write(NETLIST)
+        self.circ = netlist_parser.parse_circuit(filename)[0]
+        os.remove(filename)
+        self.old_workers = options.transient_wr_workers
+
+    def tearDown(self):
+        options.transient_wr_workers = self.old_workers
+
+    def test_partitions(self):
+        """Test wr.get_partitions()"""
+        names = self.circ.nodes_dict
+        nv = self.circ.get_nodes_number()
+        partitions = sorted(sorted(names[i + 1] if i < nv - 1 else 'I(V1)'
+                                   for i in p)
+                            for p in wr.get_partitions(self.circ))
+        # the ports go with their instance, unless shared
+        assert partitions == [['I(V1)', 'a'], ['b', 'o2', 'x2-stage-n1'],
+                              ['o1', 'x1-stage-n1'], ['o3', 'x3-stage-n1']]
+
+    def test_partitions_macromodel(self):
+        """Test wr.get_partitions() with a multiport element"""
+        names = self.circ.nodes_dict
+        n1 = self.circ.ext_node_to_int('x1-stage-n1')
+        state = self.circ.add_node('x1-stage-s1')
+        self.circ.append(ahkab.components.Macromodel(
+            'Y-x1-stage-m1', [n1], [state], np.eye(2), np.zeros((2, 2))))
+        partitions = [sorted(names[i + 1] for i in p
+                             if i < self.circ.get_nodes_number() - 1)
+                      for p in wr.get_partitions(self.circ)]
+        # its internal node is solved with the instance
+        assert ['o1', 'x1-stage-n1', 'x1-stage-s1'] in partitions
+
+    def test_tran_wr(self):
+        """Test TRAN with the WR method against fixed-step TRAP"""
+        op = ahkab.run(self.circ, ahkab.new_op())['op']
+        tran = ahkab.new_tran(0, 10e-6, 2e-8, x0=op, method='TRAP',
+                              use_step_control=False)
+        ref = ahkab.run(self.circ, tran)['tran']
+        for workers in (1, 2):
+            options.transient_wr_workers = workers
+            tran = ahkab.new_tran(0, 10e-6, 2e-8, x0=op, method='WR')
+            r = ahkab.run(self.circ, tran)['tran']
+            assert len(r['T']) == 500
+            # the fixed-step TRAP overshoots tstop by one step
+            assert np.allclose(r['T'], ref['T'][:500], rtol=1e-12, atol=0)
+            for v in ('Vo1', 'Vo2', 'Vo3', 'Vb'):
+                assert np.allclose(r[v], ref[v][:500], rtol=0, atol=1e-5)